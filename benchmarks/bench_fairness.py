@@ -0,0 +1,500 @@
+"""
+Benchmark suite for the fairness toolkit.
+
+Times the public metric, grouping and visualisation functions on synthetic
+evaluation data of increasing size, records peak memory, and stores the
+results as JSON so runs from different commits can be compared.
+
+Each benchmark case is run for every combination of row count and number
+of protected attributes. Metric functions are timed on both input forms:
+
+- "lists": plain Python lists, as in the README examples
+- "arrays": a prebuilt fairness.arrays.EvalArrays
+
+Timing uses the best of several repeats (time.perf_counter); peak memory is
+measured in a separate run under tracemalloc, so it does not distort the
+timings. A case is skipped for larger inputs once one run exceeds
+--max-seconds, and the list form is only run up to --list-max-rows.
+
+Usage
+-----
+Run from the repository root (the package must be importable, e.g. after
+`pip install -e .` or with PYTHONPATH=src):
+
+    python benchmarks/bench_fairness.py run --quick
+    python benchmarks/bench_fairness.py run --rows 1e3 1e5 1e7 --attributes 1 6
+    python benchmarks/bench_fairness.py compare OLD.json NEW.json
+
+Results are written to benchmarks/results/<commit>-<timestamp>.json unless
+--output is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+DEFAULT_ROWS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+QUICK_ROWS = (1_000, 10_000)
+DEFAULT_ATTRIBUTES = (1, 2, 4, 6)
+QUICK_ATTRIBUTES = (1, 3)
+
+# Cardinality of the j-th protected attribute.
+_CARDINALITIES = (2, 3, 4, 2, 5, 3)
+_RATES = ("acc", "fnr", "fpr", "for", "fdr")
+
+
+# ---------------------------------------------------------------------
+# Synthetic inputs
+# ---------------------------------------------------------------------
+
+
+@dataclass
+class Inputs:
+    """Evaluation data shared by all cases for one (rows, attributes)."""
+
+    protected_df: pd.DataFrame
+    labels: list
+    labels_dict: dict
+    y_true: list
+    y_pred: list
+    arrays: object
+    intersect_arrays: object
+
+
+def make_inputs(n_rows: int, n_attributes: int, seed: int = 0) -> Inputs:
+    """Synthetic cohort (fairness.synthetic) with n_attributes attributes."""
+    from fairness.arrays import EvalArrays
+    from fairness.groups import make_intersectional_labels
+    from fairness.synthetic import CohortSpec, make_cohort
+
+    cardinalities = {f"attr{j}": _CARDINALITIES[j % len(_CARDINALITIES)]
+                     for j in range(n_attributes)}
+    cohort = make_cohort(CohortSpec(n_rows=n_rows,
+                                    cardinalities=cardinalities,
+                                    base_fnr=0.2, base_fpr=0.2,
+                                    prevalence=0.5, include_scores=False,
+                                    seed=seed))
+    protected = list(cardinalities)
+    protected_df = cohort[protected].astype(object)
+    y_true = cohort["y_true"].to_numpy()
+    y_pred = cohort["y_pred"].to_numpy()
+    del cohort
+
+    labels = make_intersectional_labels(protected_df, protected)
+    labels_dict = {c: protected_df[c].tolist() for c in protected}
+    arrays = EvalArrays(y_true=y_true, y_pred=y_pred, subject_labels=labels)
+    intersect_arrays = EvalArrays(y_true=y_true, y_pred=y_pred,
+                                  subject_labels_dict=labels_dict)
+
+    return Inputs(protected_df=protected_df, labels=labels,
+                  labels_dict=labels_dict, y_true=y_true.tolist(),
+                  y_pred=y_pred.tolist(), arrays=arrays,
+                  intersect_arrays=intersect_arrays)
+
+
+# ---------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Case:
+    """
+    One benchmarked call.
+
+    setup receives (inputs, form) and returns a zero-argument callable;
+    forms lists the input forms the case supports.
+    """
+
+    name: str
+    module: str
+    setup: Callable[[Inputs, str], Callable[[], object]]
+    forms: tuple = ("lists", "arrays")
+
+
+def _two_groups(inputs: Inputs) -> tuple:
+    groups = list(dict.fromkeys(inputs.labels))
+    return groups[0], groups[-1]
+
+
+def _metric_cases() -> list:
+    from fairness import metrics
+
+    cases = []
+    for rate in _RATES:
+        group_fn = getattr(metrics, f"group_{rate}")
+        cases.append(Case(
+            f"group_{rate}", "metrics",
+            lambda inp, form, fn=group_fn: (
+                (lambda: fn(_two_groups(inp)[0], inp.labels, inp.y_pred,
+                            inp.y_true)) if form == "lists"
+                else (lambda: fn(_two_groups(inp)[0], inp.arrays))),
+        ))
+        for kind in ("diff", "ratio"):
+            pair_fn = getattr(metrics, f"group_{rate}_{kind}")
+            cases.append(Case(
+                f"group_{rate}_{kind}", "metrics",
+                lambda inp, form, fn=pair_fn: (
+                    (lambda: fn(*_two_groups(inp), inp.labels, inp.y_pred,
+                                inp.y_true)) if form == "lists"
+                    else (lambda: fn(*_two_groups(inp), inp.arrays))),
+            ))
+
+        for name in (f"all_intersect_{rate}s", f"max_intersect_{rate}_diff",
+                     f"max_intersect_{rate}_ratio"):
+            fn = getattr(metrics, name)
+            cases.append(Case(
+                name, "metrics",
+                lambda inp, form, fn=fn: (
+                    (lambda: fn(inp.labels_dict, inp.y_pred, inp.y_true))
+                    if form == "lists"
+                    else (lambda: fn(inp.intersect_arrays))),
+            ))
+
+    cases.append(Case(
+        "all_group_rates", "metrics",
+        lambda inp, form: (
+            (lambda: metrics.all_group_rates("fnr", inp.labels, inp.y_pred,
+                                             inp.y_true)) if form == "lists"
+            else (lambda: metrics.all_group_rates("fnr", inp.arrays))),
+    ))
+    return cases
+
+
+def _single_metric_cases() -> list:
+    from fairness import single_metrics as sm
+
+    def privileged(inp):
+        return inp.protected_df.iloc[0, 0]
+
+    def first_attr(inp):
+        return inp.protected_df.iloc[:, 0].tolist()
+
+    def arrays_for(inp):
+        from fairness.arrays import EvalArrays
+
+        return EvalArrays(y_true=inp.arrays.y_true, y_pred=inp.arrays.y_pred,
+                          subject_labels=first_attr(inp))
+
+    def fixed(inp, form, call_lists, call_arrays):
+        if form == "lists":
+            return lambda: call_lists(inp)
+        arrays = arrays_for(inp)
+        return lambda: call_arrays(arrays, privileged(inp))
+
+    return [
+        Case("calculate_TP_FN_FP_TN", "single_metrics",
+             lambda inp, form: fixed(
+                 inp, form,
+                 lambda i: sm.calculate_TP_FN_FP_TN(i.y_true, i.y_pred),
+                 lambda a, _: sm.calculate_TP_FN_FP_TN(a))),
+        Case("calculate_TPR_TNR_FPR_FNR", "single_metrics",
+             lambda inp, form: (
+                 lambda counts=sm.calculate_TP_FN_FP_TN(inp.y_true,
+                                                        inp.y_pred):
+                 sm.calculate_TPR_TNR_FPR_FNR(*counts)),
+             forms=("lists",)),
+        Case("calculate_EOD", "single_metrics",
+             lambda inp, form: fixed(
+                 inp, form,
+                 lambda i: sm.calculate_EOD(i.y_true, i.y_pred,
+                                            first_attr(i), privileged(i)),
+                 lambda a, p: sm.calculate_EOD(a, privileged_label=p))),
+        Case("calculate_AOD", "single_metrics",
+             lambda inp, form: fixed(
+                 inp, form,
+                 lambda i: sm.calculate_AOD(i.y_true, i.y_pred,
+                                            first_attr(i), privileged(i)),
+                 lambda a, p: sm.calculate_AOD(a, privileged_label=p))),
+        Case("calculate_DI", "single_metrics",
+             lambda inp, form: fixed(
+                 inp, form,
+                 lambda i: sm.calculate_DI(i.y_pred, first_attr(i),
+                                           privileged(i)),
+                 lambda a, p: sm.calculate_DI(a, privileged_label=p))),
+        Case("calculate_single_metrics_batch", "single_metrics",
+             lambda inp, form: (
+                 lambda: sm.calculate_single_metrics_batch(
+                     inp.arrays.y_true, inp.arrays.y_pred, inp.protected_df,
+                     dict(inp.protected_df.iloc[0]))),
+             forms=("arrays",)),
+    ]
+
+
+def _groups_cases() -> list:
+    from fairness.groups import make_intersectional_labels
+
+    return [
+        Case("make_intersectional_labels", "groups",
+             lambda inp, form: (
+                 lambda: make_intersectional_labels(
+                     inp.protected_df, list(inp.protected_df.columns))),
+             forms=("frame",)),
+    ]
+
+
+def _visualisation_cases() -> list:
+    import matplotlib
+
+    matplotlib.use("Agg", force=True)
+    import matplotlib.pyplot as plt
+
+    from fairness import metrics
+    from fairness import visualisation as vis
+
+    def closing(make_fig):
+        def run():
+            plt.close(make_fig())
+        return run
+
+    return [
+        Case("plot_group_metric", "visualisation",
+             lambda inp, form: closing(lambda: vis.plot_group_metric(
+                 metrics.group_fnr, inp.labels, inp.y_pred, inp.y_true)),
+             forms=("lists",)),
+        Case("plot_pairwise_group_metric", "visualisation",
+             lambda inp, form: closing(lambda: vis.plot_pairwise_group_metric(
+                 metrics.group_fnr_diff, inp.labels, inp.y_pred,
+                 inp.y_true)),
+             forms=("lists",)),
+        Case("pairwise_metric_matrix", "visualisation",
+             lambda inp, form: (lambda: vis.pairwise_metric_matrix(
+                 "fnr", inp.labels, inp.y_pred, inp.y_true)),
+             forms=("lists",)),
+        Case("plot_pairwise_heatmap", "visualisation",
+             lambda inp, form: closing(lambda: vis.plot_pairwise_heatmap(
+                 "fnr", inp.labels, inp.y_pred, inp.y_true)),
+             forms=("lists",)),
+        Case("plot_intersectional_metric", "visualisation",
+             lambda inp, form: closing(lambda: vis.plot_intersectional_metric(
+                 metrics.all_intersect_fnrs, inp.labels_dict, inp.y_pred,
+                 inp.y_true)),
+             forms=("lists",)),
+        Case("plot_single_metrics", "visualisation",
+             lambda inp, form: closing(lambda: vis.plot_single_metrics(
+                 inp.y_true, inp.y_pred, inp.protected_df.iloc[:, 0].tolist(),
+                 inp.protected_df.iloc[0, 0])),
+             forms=("lists",)),
+    ]
+
+
+def all_cases() -> list:
+    return (_groups_cases() + _metric_cases() + _single_metric_cases()
+            + _visualisation_cases())
+
+
+# ---------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------
+
+
+def _time(fn: Callable[[], object], repeats: int,
+          min_total: float) -> list:
+    """Run fn at least once and up to repeats times within min_total s."""
+    times = []
+    start_all = time.perf_counter()
+    while len(times) < repeats:
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+        if time.perf_counter() - start_all > min_total:
+            break
+    return times
+
+
+def _peak_bytes(fn: Callable[[], object]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return int(peak)
+
+
+def run_suite(rows, attributes, *, select=None, repeats=5,
+              max_seconds=10.0, list_max_rows=10_000, memory=True,
+              log=print) -> list:
+    """Run every selected case and return one record per measurement."""
+    cases = all_cases()
+    if select:
+        cases = [c for c in cases if any(s in c.name for s in select)]
+
+    # (case, form) pairs that already exceeded max_seconds
+    too_slow = set()
+    records = []
+    for n_attributes in attributes:
+        for n_rows in rows:
+            inputs = make_inputs(n_rows, n_attributes)
+            for case in cases:
+                for form in case.forms:
+                    key = (case.name, form, n_attributes)
+                    if key in too_slow:
+                        continue
+                    if form == "lists" and n_rows > list_max_rows \
+                            and case.module != "visualisation":
+                        continue
+                    if case.module == "visualisation" and \
+                            n_rows > list_max_rows:
+                        continue
+
+                    fn = case.setup(inputs, form)
+                    times = _time(fn, repeats, min_total=max_seconds)
+                    record = {
+                        "case": case.name,
+                        "module": case.module,
+                        "form": form,
+                        "rows": n_rows,
+                        "attributes": n_attributes,
+                        "seconds_min": min(times),
+                        "seconds_median": float(np.median(times)),
+                        "repeats": len(times),
+                        "peak_bytes": _peak_bytes(fn) if memory else None,
+                    }
+                    records.append(record)
+                    log(f"{case.name:<34} {form:<6} rows={n_rows:<9} "
+                        f"attrs={n_attributes} "
+                        f"{record['seconds_min'] * 1e3:10.2f} ms")
+                    if min(times) > max_seconds:
+                        too_slow.add(key)
+            del inputs
+    return records
+
+
+def _metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+            text=True, check=True, cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+
+    return {
+        "commit": commit,
+        "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(
+            timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def compare(old_path, new_path, *, threshold=1.2) -> pd.DataFrame:
+    """
+    Join two result files on (case, form, rows, attributes).
+
+    Returns a DataFrame with old/new best times, their ratio, and a
+    "regression" flag where new / old exceeds threshold.
+    """
+    keys = ["case", "form", "rows", "attributes"]
+    frames = []
+    for path in (old_path, new_path):
+        with open(path) as f:
+            frames.append(pd.DataFrame(json.load(f)["results"]))
+    old, new = frames
+
+    merged = old[keys + ["seconds_min", "peak_bytes"]].merge(
+        new[keys + ["seconds_min", "peak_bytes"]], on=keys,
+        suffixes=("_old", "_new"))
+    merged["ratio"] = merged["seconds_min_new"] / merged["seconds_min_old"]
+    merged["regression"] = merged["ratio"] > threshold
+    return merged.sort_values("ratio", ascending=False, ignore_index=True)
+
+
+# ---------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------
+
+
+def _parse_rows(values) -> list:
+    return [int(float(v)) for v in values]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run the benchmarks")
+    run.add_argument("--rows", nargs="+", default=None,
+                     help="row counts, e.g. 1e3 1e5 (default 1e3..1e7)")
+    run.add_argument("--attributes", nargs="+", type=int, default=None,
+                     help="numbers of protected attributes (default "
+                          "1 2 4 6)")
+    run.add_argument("--quick", action="store_true",
+                     help=f"rows {QUICK_ROWS}, attributes "
+                          f"{QUICK_ATTRIBUTES}")
+    run.add_argument("--select", nargs="+",
+                     help="only cases whose name contains one of these")
+    run.add_argument("--repeats", type=int, default=5)
+    run.add_argument("--max-seconds", type=float, default=10.0,
+                     help="skip larger inputs for a case after a run "
+                          "slower than this")
+    run.add_argument("--list-max-rows", type=float, default=1e4,
+                     help="largest input for list inputs and plots")
+    run.add_argument("--no-memory", action="store_true",
+                     help="skip the tracemalloc peak-memory run")
+    run.add_argument("--output", type=Path,
+                     help="result file (default benchmarks/results/...)")
+
+    cmp_ = sub.add_parser("compare", help="compare two result files")
+    cmp_.add_argument("old", type=Path)
+    cmp_.add_argument("new", type=Path)
+    cmp_.add_argument("--threshold", type=float, default=1.2,
+                      help="flag cases where new/old time exceeds this")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        table = compare(args.old, args.new, threshold=args.threshold)
+        with pd.option_context("display.max_rows", None,
+                               "display.width", 120):
+            print(table.to_string(index=False))
+        n_bad = int(table["regression"].sum())
+        print(f"\n{n_bad} regression(s) above {args.threshold:.2f}x")
+        return 1 if n_bad else 0
+
+    rows = _parse_rows(args.rows) if args.rows else \
+        list(QUICK_ROWS if args.quick else DEFAULT_ROWS)
+    attributes = args.attributes or \
+        list(QUICK_ATTRIBUTES if args.quick else DEFAULT_ATTRIBUTES)
+
+    metadata = _metadata()
+    records = run_suite(rows, attributes, select=args.select,
+                        repeats=args.repeats, max_seconds=args.max_seconds,
+                        list_max_rows=int(args.list_max_rows),
+                        memory=not args.no_memory)
+
+    output = args.output
+    if output is None:
+        stamp = metadata["timestamp"].replace(":", "").replace("+0000", "Z")
+        output = RESULTS_DIR / f"{metadata['commit']}-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"metadata": metadata, "results": records}, f, indent=1)
+    print(f"\nWrote {len(records)} results to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,2 +1,56 @@
-__version__ = "0.1.0"
-__author__ = "Raiet Bekriov, Nick Berry, Becky Griffiths, Kayla Yasmine"
\ No newline at end of file
+"""
+Intersectional fairness toolkit.
+
+Submodules are loaded lazily on first attribute access, so
+``import fairness`` is cheap and only the parts that are used (and their
+dependencies, e.g. scikit-learn or Matplotlib) get imported.
+"""
+
+import importlib
+
+__author__ = "Raiet Bekriov, Nick Berry, Becky Griffiths, Kayla Yasmine"
+
+_SUBMODULES = (
+    "adapters",
+    "arrays",
+    "cli",
+    "data",
+    "groups",
+    "metrics",
+    "preprocess",
+    "profiling",
+    "rates",
+    "single_metrics",
+    "subgroups",
+    "synthetic",
+    "utils",
+    "visualisation",
+)
+
+__all__ = list(_SUBMODULES)
+
+
+def _installed_version():
+    # pyproject.toml is the single source; read it from the installed
+    # metadata on first use, as importlib.metadata is slow to import
+    import importlib.metadata
+
+    try:
+        return importlib.metadata.version("intersectional-fairness-toolkit")
+    except importlib.metadata.PackageNotFoundError:
+        return "0+unknown"
+
+
+def __getattr__(name):
+    if name == "__version__":
+        globals()[name] = _installed_version()
+        return globals()[name]
+    if name in _SUBMODULES:
+        module = importlib.import_module(f"{__name__}.{name}")
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES) | {"__version__"})
@@ -0,0 +1,657 @@
+"""
+fairness.arrays
+===============
+
+Validated evaluation inputs shared by the metric modules.
+
+`EvalArrays` bundles predictions, true labels and (optionally) group labels
+as NumPy arrays. All validation happens once, at construction:
+
+- outcomes are checked to be binary (boolean dtypes are accepted without a
+  data scan)
+- all inputs are checked to have the same length
+- group labels are factorized into integer codes with a label -> code
+  lookup, so group membership is an O(1) dictionary lookup
+
+Functions in `fairness.metrics` and `fairness.single_metrics` accept an
+`EvalArrays` instance in place of their list inputs and then skip their own
+per-call checks.
+
+`IncrementalCounts` accumulates the same intersectional count table chunk
+by chunk, for predictions that are streamed rather than held in memory.
+`CountCube` holds the counts of the finest intersection so that every
+coarser grouping can be summed from it.
+
+Typical usage
+-------------
+>>> from fairness.arrays import EvalArrays
+>>> from fairness.metrics import group_fnr
+>>> arrays = EvalArrays(y_true=[1, 0, 1], y_pred=[1, 1, 0],
+...                     subject_labels=["A", "A", "B"])
+>>> group_fnr("B", arrays)
+1.0
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from itertools import product
+from typing import TYPE_CHECKING, Any, Mapping, Optional, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Column order of count tables, matching calculate_TP_FN_FP_TN.
+COUNT_COLUMNS = ("tp", "fn", "tn", "fp")
+
+# bincount over the cell code (2 * y_true + y_pred) yields tn, fp, fn, tp;
+# this reorders it to COUNT_COLUMNS.
+_CELL_ORDER = [3, 2, 0, 1]
+
+
+# Numerator and denominator of each rate in terms of confusion counts.
+RATE_FORMULAS = {
+    "acc": lambda tp, fn, tn, fp: (tp + tn, tp + fn + tn + fp),
+    "fnr": lambda tp, fn, tn, fp: (fn, tp + fn),
+    "fpr": lambda tp, fn, tn, fp: (fp, tn + fp),
+    "for": lambda tp, fn, tn, fp: (fn, fn + tn),
+    "fdr": lambda tp, fn, tn, fp: (fp, tp + fp),
+    "tpr": lambda tp, fn, tn, fp: (tp, tp + fn),
+    "tnr": lambda tp, fn, tn, fp: (tn, tn + fp),
+    "precision": lambda tp, fn, tn, fp: (tp, tp + fp),
+    "npv": lambda tp, fn, tn, fp: (tn, tn + fn),
+    "selection_rate": lambda tp, fn, tn, fp: (tp + fp, tp + fn + tn + fp),
+    "f1": lambda tp, fn, tn, fp: (2 * tp, 2 * tp + fn + fp),
+}
+
+
+def rate_from_counts(metric, counts):
+    """
+    Evaluate a rate from confusion counts.
+
+    Parameters
+    ----------
+    metric : str
+        Key of RATE_FORMULAS.
+    counts : array-like of shape (..., 4)
+        Counts in (tp, fn, tn, fp) order.
+
+    Returns
+    -------
+    np.ndarray
+        Rates with shape counts.shape[:-1]; np.nan where the denominator
+        is 0.
+    """
+    counts = np.asarray(counts, dtype=float)
+    num, den = RATE_FORMULAS[metric](*np.moveaxis(counts, -1, 0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / den, np.nan)
+
+
+def as_binary_array(values: Sequence, name: str) -> np.ndarray:
+    """
+    Convert values to an int8 array of 0/1 outcomes.
+
+    Parameters
+    ----------
+    values:
+        Binary outcomes (0/1 or booleans).
+    name:
+        Name used in error messages.
+
+    Returns
+    -------
+    np.ndarray
+        int8 array with values in {0, 1}.
+
+    Raises
+    ------
+    ValueError
+        If values contain anything other than 0 and 1.
+    """
+    values = np.asarray(values)
+
+    if values.dtype == bool:
+        return values.astype(np.int8)
+
+    if values.size:
+        if values.dtype.kind in "iu":
+            valid = values.min() >= 0 and values.max() <= 1
+        else:
+            valid = bool(np.isin(values, (0, 1)).all())
+        if not valid:
+            raise ValueError(
+                f"{name} must contain only {{0, 1}}, where 1 is the "
+                "positive outcome."
+            )
+
+    return values.astype(np.int8)
+
+
+def _as_label_array(values: Sequence) -> np.ndarray:
+    """
+    Convert group labels to an array without coercing mixed types.
+
+    np.asarray(["A", 1]) would turn 1 into "1"; going through pandas keeps
+    the original Python objects so label lookups still match.
+    """
+    if isinstance(values, np.ndarray):
+        return values
+
+    import pandas as pd
+
+    return pd.Series(list(values) if not hasattr(values, "__len__")
+                     else values).to_numpy()
+
+
+def _read_only(array: np.ndarray, source: Any = None) -> np.ndarray:
+    """
+    Flag array read-only, copying it first unless it was built from a
+    plain Python sequence (otherwise it may be the caller's own buffer).
+    """
+    if source is not None and not isinstance(source, (list, tuple)):
+        array = array.copy()
+    array.flags.writeable = False
+    return array
+
+
+def count_table(codes: np.ndarray, n_groups: int,
+                cells: np.ndarray) -> np.ndarray:
+    """
+    Confusion-matrix counts for every group in one pass.
+
+    Parameters
+    ----------
+    codes:
+        Integer group code per row (negative codes are ignored).
+    n_groups:
+        Number of groups (codes run from 0 to n_groups - 1).
+    cells:
+        Cell code per row: 2 * y_true + y_pred.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (n_groups, 4) with columns COUNT_COLUMNS.
+    """
+    keep = codes >= 0
+    if not keep.all():
+        codes, cells = codes[keep], cells[keep]
+
+    flat = np.bincount(codes.astype(np.intp) * 4 + cells,
+                       minlength=4 * n_groups)
+    return flat.reshape(n_groups, 4)[:, _CELL_ORDER]
+
+
+@dataclass(frozen=True, eq=False)
+class EvalArrays:
+    """
+    Validated, array-backed evaluation inputs.
+
+    All arrays are read-only, so results derived from an instance (e.g.
+    its result-cache token) stay valid for its lifetime.
+
+    Attributes
+    ----------
+    y_true, y_pred:
+        int8 arrays of 0/1 outcomes.
+    subject_labels:
+        Optional group label per row (e.g. intersectional labels or a single
+        protected attribute).
+    subject_labels_dict:
+        Optional mapping from category name to labels per row, as used by
+        the intersect_* functions.
+    """
+
+    y_true: np.ndarray
+    y_pred: np.ndarray
+    subject_labels: Optional[np.ndarray] = None
+    subject_labels_dict: Optional[Mapping[str, np.ndarray]] = None
+
+    cells: np.ndarray = field(init=False, repr=False)
+    label_codes: Optional[np.ndarray] = field(init=False, repr=False)
+    label_index: Optional[dict] = field(init=False, repr=False)
+    category_codes: dict = field(init=False, repr=False)
+    category_levels: dict = field(init=False, repr=False)
+    category_index: dict = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # pandas is only needed once labels are factorized, so importing
+        # fairness.metrics stays cheap for list-only callers.
+        import pandas as pd
+
+        y_true = as_binary_array(self.y_true, "y_true")
+        y_pred = as_binary_array(self.y_pred, "y_pred")
+
+        n = len(y_true)
+        if len(y_pred) != n:
+            raise ValueError("y_true and y_pred must have the same length.")
+
+        set_ = object.__setattr__
+        set_(self, "cells", _read_only(2 * y_true + y_pred))
+        set_(self, "y_true", _read_only(y_true))
+        set_(self, "y_pred", _read_only(y_pred))
+
+        label_codes = label_index = None
+        if self.subject_labels is not None:
+            labels = _as_label_array(self.subject_labels)
+            if len(labels) != n:
+                raise ValueError(
+                    "subject_labels must have the same length as y_true."
+                )
+            label_codes, uniques = pd.factorize(labels, sort=False)
+            label_codes = _read_only(label_codes)
+            label_index = {u: i for i, u in enumerate(uniques.tolist())}
+            set_(self, "subject_labels",
+                 _read_only(labels, self.subject_labels))
+        set_(self, "label_codes", label_codes)
+        set_(self, "label_index", label_index)
+
+        category_codes, category_levels, category_index = {}, {}, {}
+        if self.subject_labels_dict is not None:
+            labels_dict = {}
+            for category in sorted(self.subject_labels_dict):
+                values = _as_label_array(
+                    self.subject_labels_dict[category])
+                if len(values) != n:
+                    raise ValueError(
+                        f"subject_labels_dict['{category}'] must have the "
+                        "same length as y_true."
+                    )
+                codes, uniques = pd.factorize(values, sort=True)
+                labels_dict[category] = _read_only(
+                    values, self.subject_labels_dict[category])
+                category_codes[category] = _read_only(codes)
+                category_levels[category] = uniques.tolist()
+                category_index[category] = {u: i for i, u
+                                            in enumerate(uniques.tolist())}
+            set_(self, "subject_labels_dict", labels_dict)
+        set_(self, "category_codes", category_codes)
+        set_(self, "category_levels", category_levels)
+        set_(self, "category_index", category_index)
+
+    def __len__(self) -> int:
+        return len(self.y_true)
+
+    @classmethod
+    def from_eval_df(
+        cls,
+        eval_df: pd.DataFrame,
+        *,
+        label_col: str = "subject_label",
+        protected_df: Optional[pd.DataFrame] = None,
+        protected: Optional[Sequence[str]] = None,
+    ) -> "EvalArrays":
+        """
+        Build EvalArrays from an eval_df produced by
+        `fairness.groups.make_eval_df`.
+
+        Parameters
+        ----------
+        eval_df:
+            DataFrame with columns label_col, y_pred and y_true.
+        label_col:
+            Column holding the (intersectional) subject labels.
+        protected_df:
+            Optional DataFrame row-aligned with eval_df whose columns fill
+            subject_labels_dict.
+        protected:
+            Columns of protected_df to use. Defaults to all columns.
+
+        Returns
+        -------
+        EvalArrays
+        """
+        labels_dict = None
+        if protected_df is not None:
+            cols = list(protected) if protected is not None \
+                else list(protected_df.columns)
+            labels_dict = {c: protected_df[c].to_numpy() for c in cols}
+
+        return cls(
+            y_true=eval_df["y_true"].to_numpy(),
+            y_pred=eval_df["y_pred"].to_numpy(),
+            subject_labels=eval_df[label_col].to_numpy(),
+            subject_labels_dict=labels_dict,
+        )
+
+    # -----------------------------------------------------------------
+    # Group membership
+    # -----------------------------------------------------------------
+
+    def has_label(self, group_label) -> bool:
+        """Return True if group_label occurs in subject_labels."""
+        self._require_labels()
+        return group_label in self.label_index
+
+    def group_mask(self, group_label) -> np.ndarray:
+        """
+        Boolean mask of rows whose subject label equals group_label.
+
+        Returns an all-False mask if the label does not occur.
+        """
+        self._require_labels()
+        code = self.label_index.get(group_label)
+        if code is None:
+            return np.zeros(len(self), dtype=bool)
+        return self.label_codes == code
+
+    def intersect_mask(self, group_labels_dict: Mapping) -> np.ndarray:
+        """
+        Boolean mask of rows belonging to an intersectional group.
+
+        Parameters
+        ----------
+        group_labels_dict:
+            Mapping from category name to the required label
+            (e.g. {'age': 'Older', 'gender': 'Female'}).
+        """
+        if not self.category_codes:
+            raise ValueError("EvalArrays was built without "
+                             "subject_labels_dict.")
+
+        mask = np.ones(len(self), dtype=bool)
+        for category, group in group_labels_dict.items():
+            code = self.category_index[category].get(group)
+            if code is None:
+                return np.zeros(len(self), dtype=bool)
+            mask &= self.category_codes[category] == code
+        return mask
+
+    # -----------------------------------------------------------------
+    # Confusion-matrix counts
+    # -----------------------------------------------------------------
+
+    def counts(self, mask: Optional[np.ndarray] = None) -> tuple:
+        """
+        Confusion-matrix counts (tp, fn, tn, fp), optionally for a subset.
+
+        Parameters
+        ----------
+        mask:
+            Optional boolean row mask.
+
+        Returns
+        -------
+        tuple[int, int, int, int]
+            Plain Python ints (tp, fn, tn, fp).
+        """
+        cells = self.cells if mask is None else self.cells[mask]
+        tn, fp, fn, tp = np.bincount(cells, minlength=4)
+        return int(tp), int(fn), int(tn), int(fp)
+
+    def group_count_table(self) -> tuple[list, np.ndarray]:
+        """
+        Counts for every subject label, in first-seen order.
+
+        Returns
+        -------
+        (groups, counts):
+            groups is the list of labels, counts an array of shape
+            (n_groups, 4) with columns COUNT_COLUMNS.
+        """
+        self._require_labels()
+        groups = list(self.label_index)
+        return groups, count_table(self.label_codes, len(groups), self.cells)
+
+    def intersect_count_table(self) -> tuple[list, np.ndarray]:
+        """
+        Counts for every combination of category levels.
+
+        Combinations follow the order used by the all_intersect_* functions
+        (categories sorted by name, levels sorted within each category), and
+        include empty combinations with zero counts.
+
+        Returns
+        -------
+        (combinations, counts):
+            combinations is a list of tuples of levels, counts an array of
+            shape (n_combinations, 4) with columns COUNT_COLUMNS.
+        """
+        if not self.category_codes:
+            raise ValueError("EvalArrays was built without "
+                             "subject_labels_dict.")
+
+        categories = list(self.category_codes)
+        shape = tuple(len(self.category_levels[c]) for c in categories)
+        codes = [self.category_codes[c] for c in categories]
+
+        valid = np.logical_and.reduce([c >= 0 for c in codes])
+        flat = np.full(len(self), -1, dtype=np.intp)
+        flat[valid] = np.ravel_multi_index([c[valid] for c in codes], shape)
+
+        n_groups = int(np.prod(shape))
+        combinations = list(np.ndindex(*shape))
+        combinations = [
+            tuple(self.category_levels[cat][i]
+                  for cat, i in zip(categories, combo))
+            for combo in combinations
+        ]
+        return combinations, count_table(flat, n_groups, self.cells)
+
+    def count_cube(self) -> "CountCube":
+        """
+        Confusion counts at the finest intersection, for rollups.
+
+        One pass over the rows; every coarser grouping is then derived from
+        the cube by CountCube.rollup without touching the rows again.
+        """
+        if not self.category_codes:
+            raise ValueError("EvalArrays was built without "
+                             "subject_labels_dict.")
+
+        categories = list(self.category_codes)
+        # missing labels (code -1) get their own slot at the end of each
+        # axis, so rollups over other attributes still count those rows
+        shape = tuple(len(self.category_levels[c]) + 1 for c in categories)
+        codes = [np.where(self.category_codes[c] < 0, size - 1,
+                          self.category_codes[c])
+                 for c, size in zip(categories, shape)]
+        flat = np.ravel_multi_index(codes, shape)
+        counts = count_table(flat, int(np.prod(shape)), self.cells)
+        return CountCube(
+            categories=tuple(categories),
+            levels={c: list(self.category_levels[c]) for c in categories},
+            counts=counts.reshape(*shape, 4),
+        )
+
+    def _require_labels(self) -> None:
+        if self.label_codes is None:
+            raise ValueError("EvalArrays was built without subject_labels.")
+
+
+@dataclass(frozen=True)
+class CountCube:
+    """
+    Confusion counts for every combination of category levels.
+
+    Built by EvalArrays.count_cube. Coarser groupings (any subset of the
+    categories) are sums over the other axes, so all 2^K subsets of K
+    categories come from one pass over the data.
+
+    Attributes
+    ----------
+    categories:
+        Category names, sorted (one cube axis each).
+    levels:
+        Sorted levels of each category.
+    counts:
+        Array of shape (len(levels[c]) + 1 for c in categories) + (4,)
+        with columns COUNT_COLUMNS. The last index of each category axis
+        holds rows whose label is missing.
+    """
+
+    categories: tuple
+    levels: dict
+    counts: np.ndarray
+
+    def rollup(self, categories: Sequence[str]) -> tuple[list, np.ndarray]:
+        """
+        Counts for every combination of levels of a subset of categories.
+
+        Parameters
+        ----------
+        categories:
+            Subset of self.categories (any order; the result follows
+            self.categories). An empty subset gives the overall counts.
+
+        Returns
+        -------
+        (combinations, counts):
+            Same layout as EvalArrays.intersect_count_table for a
+            subject_labels_dict restricted to these categories: tuples of
+            levels and an array of shape (n_combinations, 4). Rows with a
+            missing label in one of these categories are left out.
+        """
+        unknown = [c for c in categories if c not in self.categories]
+        if unknown:
+            raise ValueError(f"Unknown categories {unknown}. "
+                             f"Available: {list(self.categories)}")
+
+        keep = [c for c in self.categories if c in categories]
+        axes = tuple(i for i, c in enumerate(self.categories)
+                     if c not in keep)
+        counts = self.counts.sum(axis=axes) if axes else self.counts
+        # drop the missing-label slot of every kept axis
+        counts = counts[(slice(-1),) * len(keep)]
+
+        combinations = list(product(*(self.levels[c] for c in keep)))
+        return combinations, counts.reshape(-1, 4)
+
+
+class IncrementalCounts:
+    """
+    Intersectional confusion counts accumulated chunk by chunk.
+
+    Lets predictions be evaluated as they are produced (e.g. by batched
+    inference) without keeping an eval_df or the full prediction arrays.
+    After all chunks are added, intersect_count_table and rates match
+    EvalArrays.intersect_count_table and the all_intersect_* functions on
+    the concatenated data.
+
+    Parameters
+    ----------
+    categories:
+        Names of the protected categories (keys of the labels dicts passed
+        to update).
+
+    Attributes
+    ----------
+    n_rows:
+        Number of rows added so far.
+    """
+
+    def __init__(self, categories: Sequence[str]):
+        if not categories:
+            raise ValueError("categories must not be empty.")
+        self.categories = sorted(categories)
+        self.n_rows = 0
+        self._levels = {c: set() for c in self.categories}
+        self._counts: dict = {}
+
+    def update(self, y_true: Sequence, y_pred: Sequence,
+               labels_dict: Mapping[str, Sequence]) -> None:
+        """
+        Add one chunk of rows.
+
+        Parameters
+        ----------
+        y_true, y_pred:
+            Binary outcomes of the chunk.
+        labels_dict:
+            Mapping from each category to the chunk's labels. Rows with a
+            missing label are not counted.
+
+        Raises
+        ------
+        ValueError
+            If outcomes are not binary or lengths differ.
+        """
+        import pandas as pd
+
+        y_true = as_binary_array(y_true, "y_true")
+        y_pred = as_binary_array(y_pred, "y_pred")
+        n = len(y_true)
+        if len(y_pred) != n:
+            raise ValueError("y_true and y_pred must have the same length.")
+
+        codes, uniques = [], []
+        for category in self.categories:
+            values = _as_label_array(labels_dict[category])
+            if len(values) != n:
+                raise ValueError(f"labels_dict['{category}'] must have the "
+                                 "same length as y_true.")
+            c, u = pd.factorize(values, sort=False)
+            codes.append(c)
+            uniques.append(u.tolist())
+            self._levels[category].update(uniques[-1])
+
+        shape = tuple(len(u) for u in uniques)
+        valid = np.logical_and.reduce([c >= 0 for c in codes])
+        flat = np.full(n, -1, dtype=np.intp)
+        if valid.any():
+            flat[valid] = np.ravel_multi_index([c[valid] for c in codes],
+                                               shape)
+        table = count_table(flat, int(np.prod(shape)), 2 * y_true + y_pred)
+
+        for i in np.flatnonzero(table.sum(axis=1)):
+            combo = tuple(u[j] for u, j
+                          in zip(uniques, np.unravel_index(i, shape)))
+            if combo in self._counts:
+                self._counts[combo] += table[i]
+            else:
+                self._counts[combo] = table[i].astype(np.int64)
+        self.n_rows += n
+
+    def intersect_count_table(self) -> tuple[list, np.ndarray]:
+        """
+        Counts for every combination of observed category levels.
+
+        Same layout as EvalArrays.intersect_count_table: categories sorted
+        by name, levels sorted, empty combinations included.
+        """
+        levels = [sorted(self._levels[c]) for c in self.categories]
+        combinations = list(product(*levels))
+        counts = np.zeros((len(combinations), 4), dtype=np.int64)
+        for i, combo in enumerate(combinations):
+            if combo in self._counts:
+                counts[i] = self._counts[combo]
+        return combinations, counts
+
+    def rates(self, metric: str) -> dict:
+        """
+        Rate of every intersectional group, as all_intersect_<metric>s.
+
+        Parameters
+        ----------
+        metric:
+            Key of RATE_FORMULAS, e.g. 'fnr' or 'f1'.
+        """
+        if metric not in RATE_FORMULAS:
+            raise ValueError(f"Unknown metric '{metric}'. "
+                             f"Supported: {sorted(RATE_FORMULAS)}")
+        combinations, counts = self.intersect_count_table()
+        values = rate_from_counts(metric, counts)
+        return {" + ".join(str(g) for g in combo): float(value)
+                for combo, value in zip(combinations, values)}
+
+    def max_diff(self, metric: str) -> float:
+        """
+        Max minus min rate across groups, as max_intersect_<metric>_diff
+        (np.nan if any group's rate is undefined).
+        """
+        values = np.array(list(self.rates(metric).values()))
+        if np.isnan(values).any():
+            return np.nan
+        return float(values.max() - values.min())
+
+    def to_frame(self) -> pd.DataFrame:
+        """Count table as a DataFrame indexed by intersectional group."""
+        import pandas as pd
+
+        combinations, counts = self.intersect_count_table()
+        index = pd.Index([" + ".join(str(g) for g in combo)
+                          for combo in combinations], name="group")
+        return pd.DataFrame(counts, index=index, columns=list(COUNT_COLUMNS))
@@ -0,0 +1,463 @@
+"""
+fairness.cli
+============
+
+`fairness-audit`: batch fairness audit of a scored file.
+
+Reads a CSV or Parquet file holding one row per subject with the protected
+attributes, the model's prediction and the true outcome, and computes
+
+- per-attribute group rates (one table row per level of each attribute)
+- intersectional rates (one row per combination of levels), if more than
+  one protected column is given
+- single-attribute metrics (EOD, AOD, DI) against a privileged level per
+  attribute (the most frequent level unless --privileged says otherwise)
+- a summary with the max difference and log ratio of every rate across
+  the groups of each attribute and across the intersections
+
+The tables are computed in parallel worker processes (--workers) and
+written as one JSON report or as one Parquet file per table. Only the
+columns the audit needs are read from the input file.
+
+Typical usage
+-------------
+$ fairness-audit scored.parquet --protected Sex age_group \\
+      --pred y_pred --truth y_true --workers 4 \\
+      --format both --output-dir reports/2024-06-01
+
+$ fairness-audit scored.csv --protected Sex --pred risk --threshold 0.5 \\
+      --truth HeartDisease --privileged Sex=M
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from fairness.arrays import RATE_FORMULAS, EvalArrays
+from fairness.rates import disparity_table, rate_table
+from fairness.single_metrics import calculate_single_metrics_batch
+
+
+@dataclass(frozen=True)
+class AuditReport:
+    """
+    Result tables of an audit.
+
+    Attributes
+    ----------
+    groups:
+        One row per (attribute, group) with the group size n and one column
+        per rate. Group labels are strings so attributes of different types
+        share the column.
+    intersections:
+        One row per combination of levels (one column per protected
+        attribute, sorted by name) with n and the rates. Empty with fewer
+        than two protected columns.
+    single:
+        Indexed by attribute, with the privileged level and EOD, AOD, DI.
+    summary:
+        One row per (scope, metric), where scope is an attribute name or
+        "intersection", with max_diff and log_ratio as returned by the
+        max_intersect_<metric>_diff / _ratio functions, and the groups
+        with the lowest and highest rate (min_group, max_group).
+    info:
+        Input path, row count, protected columns, metrics.
+    """
+
+    groups: pd.DataFrame
+    intersections: pd.DataFrame
+    single: pd.DataFrame
+    summary: pd.DataFrame
+    info: dict
+
+    def to_dict(self) -> dict:
+        """Report as plain JSON-serializable data (NaN becomes None)."""
+        return {
+            **self.info,
+            "summary": _records(self.summary),
+            "groups": _records(self.groups),
+            "intersections": _records(self.intersections),
+            "single": _records(self.single.reset_index()),
+        }
+
+    def to_json(self, path: os.PathLike) -> None:
+        """Write the whole report to one JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def to_parquet(self, directory: os.PathLike) -> None:
+        """
+        Write groups, intersections, single and summary as
+        <directory>/<table>.parquet (requires pyarrow).
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ("groups", "intersections", "summary"):
+            getattr(self, name).to_parquet(directory / f"{name}.parquet",
+                                           index=False)
+        self.single.to_parquet(directory / "single.parquet")
+
+
+def _records(frame: pd.DataFrame) -> list:
+    def clean(value):
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float) and math.isnan(value):
+            return None
+        return value
+
+    return [{k: clean(v) for k, v in row.items()}
+            for row in frame.to_dict(orient="records")]
+
+
+# ---------------------------------------------------------------------
+# Reading input
+# ---------------------------------------------------------------------
+
+def read_scored(path: os.PathLike, columns: Sequence[str]) -> pd.DataFrame:
+    """
+    Read the given columns of a CSV or Parquet file.
+
+    Files ending in .parquet or .pq are read with pandas.read_parquet
+    (pyarrow), anything else as CSV. Protected attributes are usually
+    categorical, so all columns are read as they are stored.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist.
+    ValueError
+        If a requested column is missing or the file is empty.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Input not found: {path}")
+
+    columns = list(dict.fromkeys(columns))
+    if path.suffix.lower() in {".parquet", ".pq"}:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError(
+                "Reading Parquet needs pyarrow; install it with "
+                "`pip install intersectional-fairness-toolkit[parquet]`."
+            ) from exc
+        available = pq.read_schema(path).names
+        missing = [c for c in columns if c not in available]
+        if missing:
+            raise ValueError(f"Columns not found in {path}: {missing}")
+        df = pd.read_parquet(path, columns=columns)
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        missing = [c for c in columns if c not in header]
+        if missing:
+            raise ValueError(f"Columns not found in {path}: {missing}")
+        df = pd.read_csv(path, usecols=columns)
+
+    if df.empty:
+        raise ValueError(f"Input is empty: {path}")
+    return df[columns]
+
+
+# ---------------------------------------------------------------------
+# Audit
+# ---------------------------------------------------------------------
+
+# Set once per worker process by _init_audit_worker.
+_AUDIT_STATE: dict = {}
+
+
+def _init_audit_worker(y_true, y_pred, labels, metrics, privileged) -> None:
+    _AUDIT_STATE.update(y_true=y_true, y_pred=y_pred, labels=labels,
+                        metrics=metrics, privileged=privileged)
+
+
+def _summary_rows(scope: str, arrays: EvalArrays,
+                  metrics: Sequence[str]) -> list:
+    table = disparity_table(arrays, metrics).rename(
+        columns={"max_ratio": "log_ratio"})
+    return [{"scope": scope, "metric": metric, **row}
+            for metric, row in table.to_dict(orient="index").items()]
+
+
+def _run_audit_task(task: tuple) -> tuple:
+    """Compute one table of the audit from the worker state."""
+    state = _AUDIT_STATE
+    kind, columns = task
+    metrics = state["metrics"]
+
+    if kind == "single":
+        protected_df = pd.DataFrame({c: state["labels"][c] for c in columns})
+        privileged = {c: state["privileged"][c] for c in columns}
+        single = calculate_single_metrics_batch(
+            state["y_true"], state["y_pred"], protected_df, privileged)
+        single.insert(0, "privileged", pd.Series(
+            {c: str(v) for c, v in privileged.items()}, dtype=object))
+        return single, []
+
+    arrays = EvalArrays(
+        y_true=state["y_true"], y_pred=state["y_pred"],
+        subject_labels_dict={c: state["labels"][c] for c in columns})
+    frame = rate_table(arrays, metrics)
+    if kind == "group":
+        (column,) = columns
+        frame.insert(0, "attribute", column)
+        frame = frame.rename(columns={column: "group"})
+        frame["group"] = frame["group"].astype(str).astype(object)
+        return frame, _summary_rows(column, arrays, metrics)
+    return frame, _summary_rows("intersection", arrays, metrics)
+
+
+def _resolve_privileged(labels: Mapping[str, np.ndarray],
+                        privileged: Mapping[str, object]) -> dict:
+    """
+    Privileged level per attribute: the given one (matched by value or by
+    its string form, as command-line values are strings) or else the most
+    frequent level.
+    """
+    unknown = [c for c in privileged if c not in labels]
+    if unknown:
+        raise ValueError(f"--privileged names non-protected columns: "
+                         f"{unknown}")
+
+    resolved = {}
+    for column, values in labels.items():
+        counts = pd.Series(values).value_counts(sort=True)
+        if counts.empty:
+            raise ValueError(f"Protected column '{column}' has no values.")
+        if column not in privileged:
+            resolved[column] = counts.index[0]
+            continue
+
+        wanted = privileged[column]
+        by_text = {str(level): level for level in counts.index}
+        if wanted in counts.index:
+            resolved[column] = wanted
+        elif str(wanted) in by_text:
+            resolved[column] = by_text[str(wanted)]
+        else:
+            raise ValueError(
+                f"Privileged label '{wanted}' not found in column "
+                f"'{column}'. Available labels: {sorted(by_text)}")
+    return resolved
+
+
+def audit(
+    df: pd.DataFrame,
+    *,
+    protected: Sequence[str],
+    pred_col: str,
+    truth_col: str,
+    metrics: Optional[Sequence[str]] = None,
+    privileged: Optional[Mapping[str, object]] = None,
+    threshold: Optional[float] = None,
+    n_jobs: Optional[int] = 1,
+    source: Optional[str] = None,
+) -> AuditReport:
+    """
+    Compute group, intersectional and single-attribute metrics.
+
+    Parameters
+    ----------
+    df:
+        Scored data with the protected, prediction and truth columns.
+    protected:
+        Protected attribute columns.
+    pred_col, truth_col:
+        Prediction and true outcome columns (binary 0/1 or boolean).
+    metrics:
+        Rates to report (keys of RATE_FORMULAS, see fairness.rates).
+        Defaults to every registered rate.
+    privileged:
+        Optional privileged level per protected column for the single
+        metrics; unlisted columns use their most frequent level.
+    threshold:
+        If given, pred_col holds scores and predictions are
+        score >= threshold.
+    n_jobs:
+        Number of worker processes. The audit is split into one task per
+        protected column, one for the intersections and one for the single
+        metrics. None uses os.cpu_count(); 1 runs in the current process.
+    source:
+        Input description recorded in the report info.
+
+    Returns
+    -------
+    AuditReport
+
+    Raises
+    ------
+    ValueError
+        If a column is missing, a metric is unknown, outcomes are not
+        binary or a privileged label is not present.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    protected = list(protected)
+    metrics = list(RATE_FORMULAS) if metrics is None else list(metrics)
+    if not protected:
+        raise ValueError("At least one protected column is required.")
+    unknown = [m for m in metrics if m not in RATE_FORMULAS]
+    if unknown:
+        raise ValueError(f"Unknown metrics {unknown}. "
+                         f"Supported: {sorted(RATE_FORMULAS)}")
+    missing = [c for c in [*protected, pred_col, truth_col]
+               if c not in df.columns]
+    if missing:
+        raise ValueError(f"Columns not found: {missing}")
+
+    y_pred = df[pred_col].to_numpy()
+    if threshold is not None:
+        y_pred = (y_pred >= threshold).astype(np.int8)
+    # validates once here rather than in every task
+    checked = EvalArrays(y_true=df[truth_col].to_numpy(), y_pred=y_pred)
+    y_true, y_pred = checked.y_true, checked.y_pred
+
+    labels = {c: df[c].to_numpy() for c in protected}
+    privileged = _resolve_privileged(labels, privileged or {})
+
+    tasks = [("group", (c,)) for c in protected]
+    if len(protected) > 1:
+        tasks.append(("intersection", tuple(sorted(protected))))
+    tasks.append(("single", tuple(protected)))
+
+    initargs = (y_true, y_pred, labels, metrics, privileged)
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, len(tasks)))
+
+    if n_jobs == 1:
+        _init_audit_worker(*initargs)
+        try:
+            results = [_run_audit_task(t) for t in tasks]
+        finally:
+            _AUDIT_STATE.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs,
+                                 initializer=_init_audit_worker,
+                                 initargs=initargs) as pool:
+            results = list(pool.map(_run_audit_task, tasks))
+
+    kinds = [kind for kind, _ in tasks]
+    groups = pd.concat([r[0] for k, r in zip(kinds, results)
+                        if k == "group"], ignore_index=True)
+    intersections = next((r[0] for k, r in zip(kinds, results)
+                          if k == "intersection"), pd.DataFrame())
+    single = results[-1][0]
+    summary = pd.DataFrame([row for _, rows in results for row in rows],
+                           columns=["scope", "metric", "max_diff",
+                                    "log_ratio", "min_group", "max_group"])
+
+    info = {"source": source, "n_rows": int(len(df)),
+            "protected": protected, "pred_col": pred_col,
+            "truth_col": truth_col, "threshold": threshold,
+            "metrics": metrics}
+    return AuditReport(groups=groups, intersections=intersections,
+                       single=single, summary=summary, info=info)
+
+
+# ---------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------
+
+def _parse_privileged(items: Sequence[str]) -> dict:
+    privileged = {}
+    for item in items:
+        column, sep, level = item.partition("=")
+        if not sep or not column:
+            raise ValueError(f"--privileged expects COLUMN=LEVEL, "
+                             f"got '{item}'")
+        privileged[column] = level
+    return privileged
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser of the fairness-audit command."""
+    parser = argparse.ArgumentParser(
+        prog="fairness-audit",
+        description="Group, intersectional and single-attribute fairness "
+                    "audit of a scored CSV or Parquet file.",
+    )
+    parser.add_argument("input", help="scored CSV or Parquet file")
+    parser.add_argument("--protected", nargs="+", required=True,
+                        metavar="COLUMN", help="protected attribute columns")
+    parser.add_argument("--pred", required=True, metavar="COLUMN",
+                        help="prediction column (0/1, or scores with "
+                             "--threshold)")
+    parser.add_argument("--truth", required=True, metavar="COLUMN",
+                        help="true outcome column (0/1)")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="classify scores in --pred as score >= "
+                             "THRESHOLD")
+    parser.add_argument("--metrics", nargs="+", default=None,
+                        choices=sorted(RATE_FORMULAS), metavar="METRIC",
+                        help="rates to report, any of "
+                             f"{', '.join(sorted(RATE_FORMULAS))} "
+                             "(default: all)")
+    parser.add_argument("--privileged", nargs="+", default=[],
+                        metavar="COLUMN=LEVEL",
+                        help="privileged level for single-attribute "
+                             "metrics (default: most frequent level)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument("--format", choices=("json", "parquet", "both"),
+                        default="json", help="report format "
+                                             "(default: json)")
+    parser.add_argument("--output-dir", default=".",
+                        help="directory for audit.json and/or the "
+                             "<table>.parquet files (default: .)")
+    parser.add_argument("--quiet", action="store_true",
+                        help="do not print the summary table")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Entry point of fairness-audit.
+
+    Returns 0 on success; invalid arguments or inputs exit with status 2
+    and a message on stderr.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be >= 1")
+
+    try:
+        privileged = _parse_privileged(args.privileged)
+        df = read_scored(args.input, [*args.protected, args.pred,
+                                      args.truth])
+        report = audit(df, protected=args.protected, pred_col=args.pred,
+                       truth_col=args.truth, metrics=args.metrics,
+                       privileged=privileged, threshold=args.threshold,
+                       n_jobs=args.workers, source=str(args.input))
+    except (FileNotFoundError, ImportError, ValueError) as exc:
+        parser.error(str(exc))
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if args.format in ("json", "both"):
+        report.to_json(output_dir / "audit.json")
+    if args.format in ("parquet", "both"):
+        try:
+            report.to_parquet(output_dir)
+        except ImportError as exc:
+            parser.error(f"Writing Parquet needs pyarrow: {exc}")
+
+    if not args.quiet:
+        print(report.summary.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,9 +13,13 @@ Primary output: a tidy DataFrame with columns:
 
 from __future__ import annotations
 
-from typing import Sequence
+from typing import Optional, Sequence
+
+import numpy as np
 import pandas as pd
 
+from fairness.profiling import instrument_module
+
 
 def make_intersectional_labels(
     df: pd.DataFrame,
@@ -74,6 +78,7 @@ def make_eval_df(
     y_pred: Sequence,
     y_true: Sequence,
     label_col: str = "subject_label",
+    positions: Optional[Sequence[int]] = None,
 ) -> pd.DataFrame:
     """
     Build an evaluation DataFrame for group-based metric functions.
@@ -97,12 +102,24 @@ def make_eval_df(
         True labels aligned to df_test rows.
     label_col:
         Name of the intersectional label column.
+    positions:
+        Optional integer row positions (e.g. SplitIndices.test_pos). If
+        given, df_test is the full dataset and only the protected columns
+        are gathered at these positions, instead of the caller first
+        copying every column with df.loc[...].
 
     Returns
     -------
     pd.DataFrame
         Columns: subject_label, y_pred, y_true (index preserved).
     """
+    if positions is not None:
+        missing_cols = [c for c in protected if c not in df_test.columns]
+        if missing_cols:
+            raise ValueError(f"Protected columns not found: {missing_cols}")
+        cols = df_test.columns.get_indexer(list(protected))
+        df_test = df_test.iloc[np.asarray(positions), cols]
+
     n = len(df_test)
     if len(y_pred) != n or len(y_true) != n:
         raise ValueError("df_test, y_pred, and y_true must have the same"
@@ -118,3 +135,7 @@ def make_eval_df(
         },
         index=df_test.index,
     )
+
+
+# instrument the public functions above (no-op unless profiling is enabled)
+instrument_module(globals())
@@ -5,8 +5,11 @@ fairness.preprocess
 Preprocessing utilities for tabular datasets used in fairness analysis.
 
 This module includes:
-- feature engineering (e.g., binning age into age_group)
-- converting raw tabular data into numeric features suitable for ML
+- feature engineering (e.g., binning age into age_group), including
+  column-level transforms that chain without full-frame copies
+- converting raw tabular data into numeric features suitable for ML,
+  either statelessly (preprocess_tabular) or with a fitted, reusable
+  encoder (TabularEncoder)
 - producing reproducible train/test splits while preserving indices
 
 Design notes
@@ -14,6 +17,8 @@ Design notes
 - The toolkit is model-agnostic: these functions do not require sklearn
   pipelines,
   but they produce outputs compatible with sklearn and similar libraries.
+- scikit-learn is only imported when a split is made, so the feature
+  engineering helpers can be used without loading it.
 - Protected attributes may be used for fairness analysis even if they are
   excluded from model training. Derived protected attributes (e.g. age_group)
   are excluded from model inputs.
@@ -32,11 +37,12 @@ Typical usage
 
 from __future__ import annotations
 
+import functools
 from dataclasses import dataclass
-from typing import Callable, Mapping, Sequence
+from typing import Any, Callable, Iterator, Mapping, Sequence, Union
 
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
 
 
 @dataclass(frozen=True)
@@ -47,17 +53,218 @@ class SplitData:
     Attributes
     ----------
     X_train, X_test:
-        Feature matrices for training and testing.
+        Feature matrices for training and testing (SparseFeatures when the
+        split was made from sparse features).
     y_train, y_test:
         Target vectors for training and testing.
     """
 
-    X_train: pd.DataFrame
-    X_test: pd.DataFrame
+    X_train: Union[pd.DataFrame, SparseFeatures]
+    X_test: Union[pd.DataFrame, SparseFeatures]
     y_train: pd.Series
     y_test: pd.Series
 
 
+@dataclass(frozen=True)
+class SparseFeatures:
+    """
+    Sparse feature matrix with column names and row index.
+
+    Produced by preprocess_tabular(..., sparse=True) and
+    TabularEncoder.transform(..., sparse=True), and carried through
+    make_train_test_split. Pass `.matrix` to sparse-aware estimators
+    (e.g. LogisticRegression).
+
+    Attributes
+    ----------
+    matrix:
+        SciPy CSR matrix of shape (n_rows, n_features).
+    feature_names:
+        Column name of each matrix column.
+    index:
+        Row labels aligned with the matrix rows (as in the source
+        DataFrame).
+    """
+
+    matrix: Any
+    feature_names: list
+    index: pd.Index
+
+    @property
+    def shape(self) -> tuple:
+        return self.matrix.shape
+
+    @property
+    def columns(self) -> pd.Index:
+        return pd.Index(self.feature_names)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    @functools.cached_property
+    def column_index(self) -> dict:
+        """Column name -> matrix column position (built once)."""
+        return {name: j for j, name in enumerate(self.feature_names)}
+
+    def column(self, name: str) -> pd.Series:
+        """Return one column as a dense Series."""
+        j = self.column_index[name]
+        values = self.matrix[:, j].toarray().ravel()
+        return pd.Series(values, index=self.index, name=name)
+
+    def target(self, name: str) -> pd.Series:
+        """
+        Return the target column as a dense Series.
+
+        The matrix stores floats, so a target whose values are all whole
+        numbers (e.g. 0/1 labels) is cast back to int64.
+        """
+        y = self.column(name)
+        if np.array_equal(y, np.round(y)):
+            y = y.astype(np.int64)
+        return y
+
+    def select(self, columns: Sequence[str]) -> "SparseFeatures":
+        """Return the given columns, in that order (raises if missing)."""
+        index = self.column_index
+        missing = [c for c in columns if c not in index]
+        if missing:
+            raise KeyError(f"{missing} not found in feature_names")
+        return SparseFeatures(matrix=self.matrix[:, [index[c]
+                                                     for c in columns]],
+                              feature_names=list(columns),
+                              index=self.index)
+
+    def drop(self, columns: Sequence[str]) -> "SparseFeatures":
+        """Return a copy without the given columns (raises if missing)."""
+        missing = [c for c in columns if c not in self.column_index]
+        if missing:
+            raise KeyError(f"{missing} not found in feature_names")
+        drop = set(columns)
+        return self.select([c for c in self.feature_names if c not in drop])
+
+    def take(self, positions: Sequence[int]) -> "SparseFeatures":
+        """Return the rows at the given integer positions."""
+        positions = np.asarray(positions)
+        return SparseFeatures(matrix=self.matrix[positions],
+                              feature_names=self.feature_names,
+                              index=self.index[positions])
+
+    def to_frame(self) -> pd.DataFrame:
+        """Convert to a DataFrame with pandas sparse columns."""
+        return pd.DataFrame.sparse.from_spmatrix(
+            self.matrix, index=self.index, columns=self.feature_names)
+
+
+@dataclass(frozen=True)
+class SplitIndices:
+    """
+    Index-only train/test split.
+
+    Holds the preprocessed data by reference plus the row positions of each
+    part. The X_train/X_test/y_train/y_test properties mirror SplitData but
+    are built on access (nothing is cached), and the *_array methods return
+    NumPy feature matrices for one part only.
+
+    Attributes
+    ----------
+    data:
+        Preprocessed dataset the split was made from (DataFrame or
+        SparseFeatures), not copied.
+    feature_cols:
+        Columns used as model features.
+    target_col:
+        Target column.
+    train_pos, test_pos:
+        Integer row positions of the training and test rows in data.
+    """
+
+    data: Union[pd.DataFrame, SparseFeatures]
+    feature_cols: list
+    target_col: str
+    train_pos: np.ndarray
+    test_pos: np.ndarray
+
+    @property
+    def train_index(self) -> pd.Index:
+        return self.data.index[self.train_pos]
+
+    @property
+    def test_index(self) -> pd.Index:
+        return self.data.index[self.test_pos]
+
+    @property
+    def X_train(self) -> Union[pd.DataFrame, SparseFeatures]:
+        return self._features(self.train_pos)
+
+    @property
+    def X_test(self) -> Union[pd.DataFrame, SparseFeatures]:
+        return self._features(self.test_pos)
+
+    @property
+    def y_train(self) -> pd.Series:
+        return self._target(self.train_pos)
+
+    @property
+    def y_test(self) -> pd.Series:
+        return self._target(self.test_pos)
+
+    def X_train_array(self, dtype=None):
+        """Training features as a NumPy array (CSR matrix if sparse)."""
+        return self._feature_array(self.train_pos, dtype)
+
+    def X_test_array(self, dtype=None):
+        """Test features as a NumPy array (CSR matrix if sparse)."""
+        return self._feature_array(self.test_pos, dtype)
+
+    def iter_test_batches(self, batch_size: int):
+        """
+        Yield the test rows in order, batch_size rows at a time.
+
+        Yields
+        ------
+        (positions, X, y):
+            Row positions of the batch in data, its features (DataFrame or
+            SparseFeatures) and its target Series.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        y_test = self.y_test
+        for start in range(0, len(self.test_pos), batch_size):
+            stop = start + batch_size
+            positions = self.test_pos[start:stop]
+            yield positions, self._features(positions), \
+                y_test.iloc[start:stop]
+
+    @functools.cached_property
+    def _feature_positions(self) -> np.ndarray:
+        # looked up once per split, not once per batch
+        if isinstance(self.data, SparseFeatures):
+            index = self.data.column_index
+            return np.array([index[c] for c in self.feature_cols],
+                            dtype=np.intp)
+        return self.data.columns.get_indexer(self.feature_cols)
+
+    def _features(self, positions):
+        if isinstance(self.data, SparseFeatures):
+            return SparseFeatures(
+                matrix=self.data.matrix[positions][:, self._feature_positions],
+                feature_names=list(self.feature_cols),
+                index=self.data.index[positions])
+        return self.data.iloc[positions, self._feature_positions]
+
+    def _feature_array(self, positions, dtype):
+        if isinstance(self.data, SparseFeatures):
+            matrix = self.data.matrix[positions][:, self._feature_positions]
+            return matrix.astype(dtype) if dtype is not None else matrix
+        return self._features(positions).to_numpy(dtype=dtype)
+
+    def _target(self, positions):
+        if isinstance(self.data, SparseFeatures):
+            return self.data.target(self.target_col).iloc[positions]
+        return self.data[self.target_col].iloc[positions]
+
+
 # ---------------------------------------------------------------------
 # Feature engineering helpers
 # ---------------------------------------------------------------------
@@ -93,7 +300,8 @@ def add_age_group(
     Returns
     -------
     pd.DataFrame
-        Copy of df with the new categorical column added.
+        New DataFrame with the categorical column added; df is not
+        modified. Existing columns are shared rather than copied.
 
     Raises
     ------
@@ -103,15 +311,23 @@ def add_age_group(
     if age_col not in df.columns:
         raise ValueError(f"Expected column '{age_col}' to create {new_col}")
 
-    out = df.copy()
-    out[new_col] = pd.cut(out[age_col], bins=list(bins), labels=list(labels))
+    # shallow copy: column assignment never writes into df's arrays
+    out = df.copy(deep=False)
+    out[new_col] = _bin_ages(out[age_col], age_col=age_col, new_col=new_col,
+                             bins=bins, labels=labels)
+    return out
 
-    if out[new_col].isna().any():
+
+def _bin_ages(ages, *, age_col, new_col, bins, labels):
+    """Bin an age Series, raising if any value falls outside the bins."""
+    binned = pd.cut(ages, bins=list(bins), labels=list(labels))
+
+    if binned.isna().any():
         raise ValueError(
             f"{new_col} contains NaNs after binning; check '{age_col}' values"
             + "and bins"
         )
-    return out
+    return binned
 
 
 def map_binary_column(
@@ -140,7 +356,8 @@ def map_binary_column(
     Returns
     -------
     pd.DataFrame
-        Copy of df with mapped column.
+        New DataFrame with the mapped column; df is not modified. Other
+        columns are shared rather than copied.
 
     Raises
     ------
@@ -150,14 +367,138 @@ def map_binary_column(
     if col not in df.columns:
         raise ValueError(f"Column '{col}' not found")
 
-    out = df.copy()
-    out[col] = out[col].map(mapping)
+    out = df.copy(deep=False)
+    out[col] = _map_values(out[col], col=col, mapping=mapping, strict=strict)
+    return out
 
-    if strict and out[col].isna().any():
+
+def _map_values(values, *, col, mapping, strict):
+    """Map a Series, raising on unmapped values if strict."""
+    mapped = values.map(mapping)
+
+    if strict and mapped.isna().any():
         raise ValueError(f"Unmapped values found in '{col}' using"
                          + f"mapping={mapping}")
 
-    return out
+    return mapped
+
+
+@dataclass(frozen=True)
+class ColumnTransform:
+    """
+    A transform that declares which columns it reads and writes.
+
+    Instead of returning a whole new DataFrame, fn receives only the
+    columns it reads and returns the columns it writes. A chain of column
+    transforms can then run against one output frame with column-level
+    assignment, so N transforms cost no full-frame copies.
+
+    ColumnTransform objects are also plain DataFrame -> DataFrame callables,
+    so they can be mixed with ordinary transforms in apply_transforms and
+    run_demo_pipeline(fairness_transforms=...).
+
+    Attributes
+    ----------
+    fn:
+        Callable mapping {column: Series} for the reads to
+        {column: values} for the writes.
+    reads:
+        Columns fn reads.
+    writes:
+        Columns fn writes (new or replaced).
+    name:
+        Label used in reports.
+    """
+
+    fn: Callable[[Mapping[str, pd.Series]], Mapping[str, object]]
+    reads: tuple
+    writes: tuple
+    name: str = "transform"
+
+    def __call__(self, df: pd.DataFrame) -> pd.DataFrame:
+        out = df.copy(deep=False)
+        _apply_column_transform(out, self)
+        return out
+
+
+def age_group_transform(
+    age_col: str = "Age",
+    new_col: str = "age_group",
+    bins: Sequence[float] = (0, 55, 120),
+    labels: Sequence[str] = ("young", "older"),
+) -> ColumnTransform:
+    """
+    Column-level equivalent of add_age_group.
+
+    Returns
+    -------
+    ColumnTransform
+        Reads age_col and writes new_col.
+    """
+    def fn(cols):
+        return {new_col: _bin_ages(cols[age_col], age_col=age_col,
+                                   new_col=new_col, bins=bins,
+                                   labels=labels)}
+
+    return ColumnTransform(fn=fn, reads=(age_col,), writes=(new_col,),
+                           name=f"age_group({age_col})")
+
+
+def binary_map_transform(
+    col: str,
+    mapping: Mapping[object, object],
+    *,
+    strict: bool = True,
+) -> ColumnTransform:
+    """
+    Column-level equivalent of map_binary_column.
+
+    Returns
+    -------
+    ColumnTransform
+        Reads and writes col.
+    """
+    def fn(cols):
+        return {col: _map_values(cols[col], col=col, mapping=mapping,
+                                 strict=strict)}
+
+    return ColumnTransform(fn=fn, reads=(col,), writes=(col,),
+                           name=f"map({col})")
+
+
+def _apply_column_transform(out: pd.DataFrame,
+                            transform: ColumnTransform) -> None:
+    """Run one ColumnTransform, assigning its outputs into out."""
+    missing = [c for c in transform.reads if c not in out.columns]
+    if missing:
+        raise ValueError(f"{transform.name}: columns not found: {missing}")
+
+    result = transform.fn({c: out[c] for c in transform.reads})
+
+    not_written = [c for c in transform.writes if c not in result]
+    if not_written:
+        raise ValueError(
+            f"{transform.name}: declared writes not returned: {not_written}"
+        )
+
+    for col in transform.writes:
+        out[col] = result[col]
+
+
+def _check_transform_plan(columns, transforms) -> None:
+    """
+    Check, before running anything, that every column a ColumnTransform
+    reads exists in the input or is written by an earlier step.
+    """
+    available = set(columns)
+    for fn in transforms:
+        if not isinstance(fn, ColumnTransform):
+            # opaque transform: any column may appear afterwards
+            return
+        missing = [c for c in fn.reads if c not in available]
+        if missing:
+            raise ValueError(f"{fn.name}: columns not found: {missing}")
+        available.update(fn.writes)
 
 
 def apply_transforms(
@@ -167,22 +508,121 @@ def apply_transforms(
     """
     Apply a sequence of DataFrame -> DataFrame transforms in order.
 
+    Consecutive ColumnTransform steps are fused: they share one shallow
+    copy of the frame and assign their columns into it, so chaining them
+    never copies the full dataset.
+
     Parameters
     ----------
     df:
-        Input dataset.
+        Input dataset (never modified).
     transforms:
-        Sequence of callables each returning a modified DataFrame.
+        Sequence of callables each returning a modified DataFrame, and/or
+        ColumnTransform objects.
 
     Returns
     -------
     pd.DataFrame
         Transformed DataFrame.
     """
-    out = df
-    for fn in transforms:
-        out = fn(out)
-    return out
+    return run_transforms(df, transforms, track_memory=False).frame
+
+
+@dataclass(frozen=True)
+class TransformResult:
+    """
+    Output of run_transforms.
+
+    Attributes
+    ----------
+    frame:
+        Transformed DataFrame.
+    report:
+        One row per step with columns step, reads, writes, seconds and
+        peak_bytes (peak traced allocation during the step, or NaN if
+        memory was not tracked).
+    peak_bytes:
+        Largest per-step peak.
+    """
+
+    frame: pd.DataFrame
+    report: pd.DataFrame
+    peak_bytes: float
+
+
+def run_transforms(
+    df: pd.DataFrame,
+    transforms: Sequence[Callable[[pd.DataFrame], pd.DataFrame]],
+    *,
+    track_memory: bool = True,
+) -> TransformResult:
+    """
+    Apply transforms like apply_transforms and report time and memory.
+
+    Parameters
+    ----------
+    df:
+        Input dataset (never modified).
+    transforms:
+        DataFrame -> DataFrame callables and/or ColumnTransform objects.
+    track_memory:
+        If True, measure each step's peak allocation with tracemalloc
+        (which slows execution down; use for diagnostics).
+
+    Returns
+    -------
+    TransformResult
+        The transformed frame and a per-step report.
+
+    Raises
+    ------
+    ValueError
+        If a ColumnTransform reads a column that is not available.
+    """
+    import time
+    import tracemalloc
+
+    _check_transform_plan(df.columns, transforms)
+
+    started_tracing = track_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    rows = []
+    out, owned = df, False
+    try:
+        for fn in transforms:
+            if track_memory:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+
+            if isinstance(fn, ColumnTransform):
+                if not owned:
+                    out, owned = out.copy(deep=False), True
+                _apply_column_transform(out, fn)
+                name, reads, writes = fn.name, fn.reads, fn.writes
+            else:
+                out, owned = fn(out), False
+                name = getattr(fn, "__name__", repr(fn))
+                reads = writes = None
+
+            rows.append({
+                "step": name,
+                "reads": reads,
+                "writes": writes,
+                "seconds": time.perf_counter() - start,
+                "peak_bytes": (tracemalloc.get_traced_memory()[1] - baseline
+                               if track_memory else float("nan")),
+            })
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    report = pd.DataFrame(rows, columns=["step", "reads", "writes",
+                                         "seconds", "peak_bytes"])
+    peak = float(report["peak_bytes"].max()) if rows else 0.0
+    return TransformResult(frame=out, report=report, peak_bytes=peak)
 
 
 # ---------------------------------------------------------------------
@@ -196,7 +636,8 @@ def preprocess_tabular(
     drop_cols: Sequence[str] = (),
     one_hot: bool = True,
     drop_first: bool = True,
-) -> pd.DataFrame:
+    sparse: bool = False,
+) -> Union[pd.DataFrame, SparseFeatures]:
     """
     Convert a tabular DataFrame into numeric ML-ready features.
 
@@ -214,16 +655,29 @@ def preprocess_tabular(
     drop_first:
         If one_hot=True, drop the first level for each categorical variable to
         avoid perfect multicollinearity in logistic regression models.
+    sparse:
+        If True, return a SparseFeatures (SciPy CSR matrix with feature
+        names) instead of a dense DataFrame. Useful for high-cardinality
+        categoricals such as diagnosis codes. Requires SciPy.
 
     Returns
     -------
-    pd.DataFrame
-        A numeric DataFrame compatible with scikit-learn.
+    pd.DataFrame or SparseFeatures
+        Numeric features compatible with scikit-learn.
 
     """
-    out = df.copy()
+    # drop already returns a new frame; otherwise a shallow copy suffices
+    # because get_dummies never modifies its input
     if drop_cols:
-        out = out.drop(columns=list(drop_cols), errors="raise")
+        out = df.drop(columns=list(drop_cols), errors="raise")
+    else:
+        out = df.copy(deep=False)
+
+    if sparse:
+        if not one_hot:
+            raise ValueError("sparse=True requires one_hot=True")
+        encoder = TabularEncoder(drop_first=drop_first)
+        return encoder.fit_transform(out, sparse=True)
 
     if one_hot:
         out = pd.get_dummies(out, drop_first=drop_first)
@@ -231,27 +685,267 @@ def preprocess_tabular(
     return out
 
 
+class TabularEncoder:
+    """
+    Fitted one-hot encoder with a stable column layout.
+
+    `preprocess_tabular` re-runs pd.get_dummies on whatever frame it is
+    given, so its columns depend on the levels present in that batch. A
+    TabularEncoder instead learns the category vocabulary of each
+    categorical column once (fit) and then maps any batch onto the same
+    columns (transform), which makes scoring new data a vectorized lookup.
+
+    The output layout matches preprocess_tabular on the fitting data:
+    numeric columns first (in their original order), followed by one
+    boolean column per category level named "<col>_<level>".
+
+    Parameters
+    ----------
+    drop_cols:
+        Columns to exclude from the encoded output (e.g. the target or
+        derived protected attributes). Missing drop_cols are ignored at
+        transform time so scoring data need not contain the target.
+    drop_first:
+        Drop the first level of each categorical column, as in
+        preprocess_tabular.
+    handle_unknown:
+        "ignore" encodes unseen levels as all-zero dummy columns; "error"
+        raises a ValueError.
+    chunk_size:
+        Number of rows encoded at a time, bounding temporary memory on very
+        large inputs.
+
+    Attributes
+    ----------
+    numeric_cols_:
+        Numeric (passed-through) columns seen during fit.
+    categories_:
+        Mapping of categorical column -> list of levels learned during fit.
+    feature_names_:
+        Output column names in order.
+    """
+
+    def __init__(
+        self,
+        *,
+        drop_cols: Sequence[str] = (),
+        drop_first: bool = True,
+        handle_unknown: str = "ignore",
+        chunk_size: int = 100_000,
+    ):
+        if handle_unknown not in ("ignore", "error"):
+            raise ValueError("handle_unknown must be 'ignore' or 'error'")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+
+        self.drop_cols = tuple(drop_cols)
+        self.drop_first = drop_first
+        self.handle_unknown = handle_unknown
+        self.chunk_size = chunk_size
+
+    def fit(self, df: pd.DataFrame) -> "TabularEncoder":
+        """
+        Learn numeric columns and category vocabularies from df.
+
+        Parameters
+        ----------
+        df:
+            Training data.
+
+        Returns
+        -------
+        TabularEncoder
+            The fitted encoder (self).
+        """
+        out = df.drop(columns=list(self.drop_cols), errors="raise")
+        categorical = out.select_dtypes(
+            include=["object", "string", "category"]).columns
+
+        self.numeric_cols_ = [c for c in out.columns if c not in categorical]
+        self.categories_ = {
+            col: list(pd.Categorical(out[col]).categories)
+            for col in categorical
+        }
+
+        self._indexers = {col: pd.Index(levels)
+                          for col, levels in self.categories_.items()}
+        self._first = 1 if self.drop_first else 0
+
+        names = list(self.numeric_cols_)
+        for col, levels in self.categories_.items():
+            names.extend(f"{col}_{level}" for level in levels[self._first:])
+        self.feature_names_ = names
+        return self
+
+    def transform(
+        self,
+        df: pd.DataFrame,
+        *,
+        sparse: bool = False,
+    ) -> Union[pd.DataFrame, "SparseFeatures"]:
+        """
+        Encode df onto the fitted column layout.
+
+        Parameters
+        ----------
+        df:
+            Data to encode. Must contain every column seen during fit;
+            additional columns are ignored.
+        sparse:
+            If True, return a SparseFeatures (SciPy CSR matrix plus feature
+            names and index) instead of a dense DataFrame. The dummy columns
+            are built directly in CSR form, so high-cardinality columns
+            never materialize as dense blocks.
+
+        Returns
+        -------
+        pd.DataFrame or SparseFeatures
+            Encoded data with columns feature_names_ and df's index.
+
+        Raises
+        ------
+        ValueError
+            If the encoder is not fitted, columns are missing, or
+            handle_unknown="error" and an unseen level occurs.
+        """
+        self._check_fitted()
+        if sparse:
+            return self._transform_sparse(df)
+
+        n = len(df)
+        data = {col: df[col].to_numpy() for col in self.numeric_cols_}
+        for col, codes, width in self._encode_codes(df):
+            block = np.zeros((n, width), dtype=bool)
+            rows = np.flatnonzero(codes >= 0)
+            block[rows, codes[rows]] = True
+
+            names = self.categories_[col][self._first:]
+            for j, level in enumerate(names):
+                data[f"{col}_{level}"] = block[:, j]
+
+        return pd.DataFrame(data, index=df.index, columns=self.feature_names_)
+
+    def fit_transform(
+        self,
+        df: pd.DataFrame,
+        *,
+        sparse: bool = False,
+    ) -> Union[pd.DataFrame, "SparseFeatures"]:
+        """Fit on df and return its encoding."""
+        return self.fit(df).transform(df, sparse=sparse)
+
+    def iter_transform(
+        self,
+        df: pd.DataFrame,
+        *,
+        sparse: bool = False,
+    ) -> Iterator[Union[pd.DataFrame, "SparseFeatures"]]:
+        """
+        Encode df chunk by chunk.
+
+        Yields encoded chunks of at most chunk_size rows, so batch inference
+        on very large inputs never holds the full encoded matrix.
+        """
+        self._check_fitted()
+        for start in range(0, len(df), self.chunk_size):
+            yield self.transform(df.iloc[start:start + self.chunk_size],
+                                 sparse=sparse)
+
+    def _transform_sparse(self, df: pd.DataFrame) -> "SparseFeatures":
+        """Build the CSR encoding block by block and stack it."""
+        from scipy import sparse as sp
+
+        n = len(df)
+        blocks = []
+        if self.numeric_cols_:
+            numeric = df[self.numeric_cols_].to_numpy(dtype=float)
+            blocks.append(sp.csr_matrix(numeric))
+
+        for _, codes, width in self._encode_codes(df):
+            present = codes >= 0
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(present, out=indptr[1:])
+            blocks.append(sp.csr_matrix(
+                (np.ones(int(indptr[-1])), codes[present], indptr),
+                shape=(n, width),
+            ))
+
+        if blocks:
+            matrix = sp.hstack(blocks, format="csr")
+        else:
+            matrix = sp.csr_matrix((n, 0))
+
+        return SparseFeatures(matrix=matrix,
+                              feature_names=list(self.feature_names_),
+                              index=df.index)
+
+    def _encode_codes(self, df):
+        """
+        Yield (column, codes, width) for each categorical column.
+
+        codes holds the output column (0..width-1) of each row within that
+        column's dummy block, or -1 for missing, unseen or dropped-first
+        levels. Lookups run chunk_size rows at a time.
+        """
+        missing = [c for c in [*self.numeric_cols_, *self.categories_]
+                   if c not in df.columns]
+        if missing:
+            raise ValueError(f"Columns seen during fit are missing: "
+                             f"{missing}")
+
+        n = len(df)
+        for col, index in self._indexers.items():
+            values = df[col]
+            codes = np.empty(n, dtype=np.intp)
+
+            for lo in range(0, n, self.chunk_size):
+                hi = min(lo + self.chunk_size, n)
+                chunk = values.iloc[lo:hi]
+                chunk_codes = index.get_indexer(chunk)
+
+                if self.handle_unknown == "error":
+                    unknown = (chunk_codes < 0) & chunk.notna().to_numpy()
+                    if unknown.any():
+                        levels = sorted(set(chunk[unknown].astype(str)))
+                        raise ValueError(
+                            f"Unknown levels in '{col}': {levels}"
+                        )
+
+                codes[lo:hi] = chunk_codes
+
+            codes -= self._first
+            codes[codes < 0] = -1
+            yield col, codes, max(len(index) - self._first, 0)
+
+    def _check_fitted(self):
+        if not hasattr(self, "feature_names_"):
+            raise ValueError("TabularEncoder is not fitted; call fit first")
+
+
 # ---------------------------------------------------------------------
 # Train/test split helpers
 # ---------------------------------------------------------------------
 
 
 def make_train_test_split(
-    df: pd.DataFrame,
+    df: Union[pd.DataFrame, SparseFeatures],
     *,
     target_col: str,
     drop_cols: Sequence[str] = (),
     test_size: float = 0.3,
     random_state: int = 42,
     stratify: bool = True,
-) -> SplitData:
+    return_indices: bool = False,
+) -> Union[SplitData, SplitIndices]:
     """
     Create a reproducible train/test split for modelling.
 
     Parameters
     ----------
     df:
-        Preprocessed dataset containing features and target.
+        Preprocessed dataset containing features and target, either a
+        DataFrame or SparseFeatures (then X_train/X_test are SparseFeatures
+        too).
     target_col:
         Name of the target column.
     drop_cols:
@@ -263,10 +957,14 @@ def make_train_test_split(
         Random seed for reproducibility.
     stratify:
         If True, stratify split by the target to preserve class balance.
+    return_indices:
+        If True, return a SplitIndices holding only the row positions of
+        each part, with X_train/X_test/y_train/y_test built lazily on
+        access. The partition is identical to the default mode.
 
     Returns
     -------
-    SplitData
+    SplitData or SplitIndices
         Container holding X_train, X_test, y_train, y_test.
 
     Raises
@@ -274,23 +972,44 @@ def make_train_test_split(
     ValueError
         If target_col is missing or df is empty.
     """
-    if df.empty:
+    if len(df) == 0 or len(df.columns) == 0:
         raise ValueError("Input DataFrame is empty")
     if target_col not in df.columns:
         raise ValueError(f"Target column '{target_col}' not found")
 
-    y = df[target_col]
-    X = df.drop(columns=[target_col, *drop_cols], errors="raise")
+    # imported here so that importing fairness.preprocess does not load
+    # scikit-learn
+    from sklearn.model_selection import train_test_split
 
-    strat = y if stratify else None
+    # Index.drop raises its own KeyError for unknown drop_cols
+    feature_cols = list(df.columns.drop(
+        list(dict.fromkeys([target_col, *drop_cols]))))
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X,
-        y,
+    if isinstance(df, SparseFeatures):
+        y = df.target(target_col)
+    else:
+        y = df[target_col]
+
+    # split row positions; the same partition sklearn would produce when
+    # splitting X and y directly
+    train_pos, test_pos = train_test_split(
+        np.arange(len(df)),
         test_size=test_size,
         random_state=random_state,
-        stratify=strat,
+        stratify=y if stratify else None,
     )
 
-    return SplitData(X_train=X_train, X_test=X_test,
-                     y_train=y_train, y_test=y_test)
+    if return_indices:
+        return SplitIndices(data=df, feature_cols=feature_cols,
+                            target_col=target_col,
+                            train_pos=train_pos, test_pos=test_pos)
+
+    if isinstance(df, SparseFeatures):
+        X = df.select(feature_cols)
+        return SplitData(X_train=X.take(train_pos), X_test=X.take(test_pos),
+                         y_train=y.iloc[train_pos], y_test=y.iloc[test_pos])
+
+    X = df[feature_cols]
+
+    return SplitData(X_train=X.iloc[train_pos], X_test=X.iloc[test_pos],
+                     y_train=y.iloc[train_pos], y_test=y.iloc[test_pos])
@@ -0,0 +1,414 @@
+"""
+fairness.profiling
+==================
+
+Opt-in instrumentation of the toolkit's hot paths.
+
+The public functions of `fairness.metrics`, `fairness.groups`,
+`fairness.single_metrics` and `fairness.visualisation`, and the stages of
+`run_demo_pipeline`, report to this module. Nothing is recorded unless a
+`profile()` block is active; outside one, an instrumented call costs one
+global lookup on top of the plain call.
+
+For every call inside a `profile()` block the profiler records:
+
+- wall time, and self time (excluding instrumented calls made inside it)
+- rows processed (the length of the first sized argument: a list,
+  array, DataFrame, EvalArrays or dict of per-row labels)
+- allocated bytes (peak traced allocation during the call), if
+  track_memory=True; this uses tracemalloc and slows execution down
+
+Results can be summarised per function with `Profiler.table()` or written
+as a Chrome trace (chrome://tracing or https://ui.perfetto.dev) with
+`Profiler.to_chrome_trace()`.
+
+Typical usage
+-------------
+>>> from fairness import profiling
+>>> with profiling.profile(track_memory=True) as prof:
+...     result = run_demo_pipeline(...)
+...     metrics.max_intersect_fnr_diff(labels_dict, y_pred, y_true)
+>>> prof.table()
+>>> prof.to_chrome_trace("audit_trace.json")
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+from typing import Callable, Mapping, Optional
+
+# The profiler currently collecting records, or None when disabled.
+_ACTIVE: Optional["Profiler"] = None
+
+
+def _count_rows(args: tuple, kwargs: Mapping) -> Optional[int]:
+    """
+    Rows processed by a call: the length of its first sized argument.
+
+    Strings are skipped, and a mapping counts as per-row data only if its
+    first value is itself sized (e.g. subject_labels_dict), so mappings of
+    single labels such as group_labels_dict are skipped.
+    """
+    for value in (*args, *kwargs.values()):
+        if isinstance(value, (str, bytes)):
+            continue
+        if isinstance(value, Mapping):
+            first = next(iter(value.values()), None)
+            if first is not None and hasattr(first, "__len__") \
+                    and not isinstance(first, (str, bytes)):
+                return len(first)
+            continue
+        if hasattr(value, "__len__"):
+            try:
+                return len(value)
+            except TypeError:
+                continue
+    return None
+
+
+class _Frame:
+    __slots__ = ("name", "start", "rows", "child_seconds", "mem_start",
+                 "mem_peak")
+
+    def __init__(self, name: str, rows: Optional[int]):
+        self.name = name
+        self.rows = rows
+        self.child_seconds = 0.0
+        self.mem_start = 0
+        self.mem_peak = 0
+        self.start = time.perf_counter()
+
+
+class Profiler:
+    """
+    Collects one record per instrumented call.
+
+    Create through `profile()` rather than directly.
+
+    Attributes
+    ----------
+    records:
+        List of dicts with keys name, start (seconds since the profiler
+        started), seconds, self_seconds, rows, alloc_bytes (None without
+        track_memory), depth and thread.
+    """
+
+    def __init__(self, track_memory: bool = False):
+        self.track_memory = track_memory
+        self.records: list = []
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    # -----------------------------------------------------------------
+    # Recording
+    # -----------------------------------------------------------------
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self, name: str, rows: Optional[int]) -> _Frame:
+        frame = _Frame(name, rows)
+        if self.track_memory:
+            import tracemalloc
+
+            current, peak = tracemalloc.get_traced_memory()
+            stack = self._stack()
+            if stack:
+                # reset_peak below forgets the parent's peak so far
+                stack[-1].mem_peak = max(stack[-1].mem_peak, peak)
+            tracemalloc.reset_peak()
+            frame.mem_start = current
+        self._stack().append(frame)
+        frame.start = time.perf_counter()
+        return frame
+
+    def _exit(self, frame: _Frame) -> None:
+        end = time.perf_counter()
+        stack = self._stack()
+        stack.pop()
+        seconds = end - frame.start
+
+        alloc = None
+        if self.track_memory:
+            import tracemalloc
+
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(peak, frame.mem_peak)
+            alloc = max(0, peak - frame.mem_start)
+            if stack:
+                stack[-1].mem_peak = max(stack[-1].mem_peak, peak)
+
+        if stack:
+            stack[-1].child_seconds += seconds
+
+        record = {
+            "name": frame.name,
+            "start": frame.start - self._origin,
+            "seconds": seconds,
+            "self_seconds": seconds - frame.child_seconds,
+            "rows": frame.rows,
+            "alloc_bytes": alloc,
+            "depth": len(stack),
+            "thread": threading.get_ident(),
+        }
+        with self._lock:
+            self.records.append(record)
+
+    # -----------------------------------------------------------------
+    # Export
+    # -----------------------------------------------------------------
+
+    def table(self):
+        """
+        Per-function summary, slowest total time first.
+
+        Returns
+        -------
+        pd.DataFrame
+            Indexed by name, with columns calls, seconds (total),
+            self_seconds, mean_seconds, max_seconds, rows (total) and
+            peak_alloc_bytes (max over calls; NaN without track_memory).
+        """
+        import pandas as pd
+
+        columns = ["calls", "seconds", "self_seconds", "mean_seconds",
+                   "max_seconds", "rows", "peak_alloc_bytes"]
+        if not self.records:
+            return pd.DataFrame(columns=columns,
+                                index=pd.Index([], name="name"))
+
+        frame = pd.DataFrame(self.records)
+        table = frame.groupby("name").agg(
+            calls=("seconds", "size"),
+            seconds=("seconds", "sum"),
+            self_seconds=("self_seconds", "sum"),
+            mean_seconds=("seconds", "mean"),
+            max_seconds=("seconds", "max"),
+            rows=("rows", "sum"),
+            peak_alloc_bytes=("alloc_bytes", "max"),
+        )
+        return table.sort_values("seconds", ascending=False)[columns]
+
+    def to_chrome_trace(self, path: Optional[str] = None) -> dict:
+        """
+        Records in Chrome trace event format.
+
+        Parameters
+        ----------
+        path:
+            Optional file to write the JSON to.
+
+        Returns
+        -------
+        dict
+            {"traceEvents": [...]} with one complete ("X") event per call,
+            timestamps in microseconds.
+        """
+        pid = os.getpid()
+        events = []
+        for record in self.records:
+            args = {"rows": record["rows"]}
+            if record["alloc_bytes"] is not None:
+                args["alloc_bytes"] = record["alloc_bytes"]
+            module, _, _ = record["name"].rpartition(".")
+            events.append({
+                "name": record["name"],
+                "cat": module or "fairness",
+                "ph": "X",
+                "ts": record["start"] * 1e6,
+                "dur": record["seconds"] * 1e6,
+                "pid": pid,
+                "tid": record["thread"],
+                "args": args,
+            })
+
+        trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+        if path is not None:
+            with open(path, "w") as f:
+                json.dump(trace, f)
+        return trace
+
+
+class _Span:
+    """Context manager recording one named block on a profiler."""
+
+    __slots__ = ("profiler", "name", "rows", "frame")
+
+    def __init__(self, profiler: Profiler, name: str, rows: Optional[int]):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self.frame = self.profiler._enter(self.name, self.rows)
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._exit(self.frame)
+        return False
+
+    def set_rows(self, rows: Optional[int]) -> None:
+        """Set the row count once it is known (e.g. after loading)."""
+        self.frame.rows = rows
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set_rows(self, rows: Optional[int]) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class profile:
+    """
+    Context manager enabling instrumentation for its block.
+
+    Parameters
+    ----------
+    track_memory:
+        Also record allocated bytes per call with tracemalloc (started for
+        the block if not already running). Adds noticeable overhead.
+
+    Yields
+    ------
+    Profiler
+        Holds the records once the block exits (and while it runs).
+
+    Notes
+    -----
+    Blocks may be nested; the inner profiler collects the calls made
+    inside it and the outer one resumes afterwards.
+    """
+
+    def __init__(self, *, track_memory: bool = False):
+        self.profiler = Profiler(track_memory=track_memory)
+        self._previous = None
+        self._started_tracemalloc = False
+
+    def __enter__(self) -> Profiler:
+        global _ACTIVE
+
+        if self.profiler.track_memory:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+
+        self._previous = _ACTIVE
+        _ACTIVE = self.profiler
+        return self.profiler
+
+    def __exit__(self, *exc) -> bool:
+        global _ACTIVE
+
+        _ACTIVE = self._previous
+        if self._started_tracemalloc:
+            import tracemalloc
+
+            tracemalloc.stop()
+        return False
+
+
+def is_enabled() -> bool:
+    """Return True inside a profile() block."""
+    return _ACTIVE is not None
+
+
+def span(name: str, rows: Optional[int] = None):
+    """
+    Context manager recording a named block (e.g. a pipeline stage).
+
+    The object it yields has set_rows(n) for row counts known only inside
+    the block. Returns a shared no-op object when profiling is disabled.
+    """
+    profiler = _ACTIVE
+    if profiler is None:
+        return _NULL_SPAN
+    return _Span(profiler, name, rows)
+
+
+def instrument(fn: Optional[Callable] = None, *,
+               name: Optional[str] = None,
+               count_rows: bool = True) -> Callable:
+    """
+    Decorator recording each call of fn while profiling is enabled.
+
+    Parameters
+    ----------
+    fn:
+        Function to wrap (the decorator can be used with or without
+        arguments).
+    name:
+        Record name. Defaults to "<module>.<function>" with the leading
+        "fairness." removed, e.g. "metrics.group_fnr".
+    count_rows:
+        Record the length of the first sized argument as the row count.
+        Turn off for functions whose sized arguments are not rows.
+
+    Returns
+    -------
+    Callable
+        Wrapper with fn's name, docstring and signature.
+    """
+    if fn is None:
+        return functools.partial(instrument, name=name,
+                                 count_rows=count_rows)
+
+    if name is None:
+        module = fn.__module__.removeprefix("fairness.")
+        name = f"{module}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        profiler = _ACTIVE
+        if profiler is None:
+            return fn(*args, **kwargs)
+
+        rows = _count_rows(args, kwargs) if count_rows else None
+        frame = profiler._enter(name, rows)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler._exit(frame)
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def instrument_module(namespace: dict) -> None:
+    """
+    Wrap every public function defined in a module with instrument.
+
+    Call at the end of a module as instrument_module(globals()). Functions
+    imported from elsewhere, private names and already wrapped functions
+    are left alone. Calls between the module's own functions go through
+    the wrappers too, so nested calls appear in traces.
+    """
+    module = namespace["__name__"]
+    for attr, value in list(namespace.items()):
+        if attr.startswith("_") or not callable(value) \
+                or isinstance(value, type):
+            continue
+        if getattr(value, "__module__", None) != module:
+            continue
+        if getattr(value, "__instrumented__", False):
+            continue
+        namespace[attr] = instrument(value)
@@ -0,0 +1,847 @@
+"""
+fairness.rates
+==============
+
+Metrics declared as formulas over confusion counts.
+
+Every rate in `fairness.arrays.RATE_FORMULAS` is a function of the
+(tp, fn, tn, fp) counts of a group returning a numerator and denominator.
+This module builds everything else from that one declaration:
+
+- `make_metric_family` generates the group_x, group_x_diff, group_x_ratio,
+  intersect_x, all_intersect_xs, max_intersect_x_diff,
+  max_intersect_x_ratio and max_intersect_x_diff_bootstrap functions;
+  every family in `fairness.metrics` is generated this way
+- `rate_table`, `disparity_table` and `bootstrap_rates` evaluate any number
+  of rates from a single count table, so each extra metric costs no extra
+  pass over the data
+- `rollup_table` evaluates them for every subset of the protected
+  categories (each attribute, each pair, ..., the full intersection),
+  summing coarser groupings from one count cube instead of rescanning
+
+Bootstrap replicates resample the count table itself: drawing n rows with
+replacement is a multinomial draw over the (group, cell) counts, so no
+row-level data is touched after the table is built.
+
+Typical usage
+-------------
+>>> from fairness.arrays import EvalArrays
+>>> from fairness.rates import register_rate, rate_table
+>>> register_rate("fomr", lambda tp, fn, tn, fp: (fn, fn + tn),
+...               "false omission rate (alias)")
+>>> arrays = EvalArrays(y_true=y_true, y_pred=y_pred,
+...                     subject_labels_dict={"sex": sex, "age": age})
+>>> rate_table(arrays, ["precision", "f1", "selection_rate"])
+"""
+
+from __future__ import annotations
+
+import itertools
+import warnings
+from dataclasses import dataclass
+from typing import Callable, Optional, Sequence, Union
+
+import numpy as np
+
+from fairness.arrays import (RATE_FORMULAS, CountCube, EvalArrays,
+                             rate_from_counts)
+
+# Plain-language name of each rate, used in generated docstrings.
+RATE_DESCRIPTIONS = {
+    "acc": "accuracy",
+    "fnr": "false negative rate",
+    "fpr": "false positive rate",
+    "for": "false omission rate",
+    "fdr": "false discovery rate",
+    "tpr": "true positive rate",
+    "tnr": "true negative rate",
+    "precision": "precision",
+    "npv": "negative predictive value",
+    "selection_rate": "selection rate",
+    "f1": "F1 score",
+}
+
+_LEVELS = ("group", "intersection")
+
+
+def register_rate(
+    name: str,
+    formula: Callable,
+    description: str,
+) -> None:
+    """
+    Add a rate to RATE_FORMULAS.
+
+    Once registered the rate is accepted wherever a metric name is, e.g.
+    all_group_rates, rate_table, IncrementalCounts and
+    cross_validate_fairness.
+
+    Parameters
+    ----------
+    name:
+        Identifier of the rate (used in function and column names).
+    formula:
+        Function of (tp, fn, tn, fp) returning (numerator, denominator).
+        It receives NumPy arrays, so use arithmetic only.
+    description:
+        Plain-language name, e.g. "balanced accuracy".
+
+    Raises
+    ------
+    ValueError
+        If name is not an identifier or is already registered, or formula
+        is not callable.
+    """
+    if not name.isidentifier():
+        raise ValueError(f"Rate name must be an identifier, got {name!r}")
+    if name in RATE_FORMULAS:
+        raise ValueError(f"Rate '{name}' is already registered.")
+    if not callable(formula):
+        raise ValueError("formula must be callable.")
+
+    RATE_FORMULAS[name] = formula
+    RATE_DESCRIPTIONS[name] = description
+
+
+def _check_metrics(metrics: Optional[Sequence[str]]) -> list:
+    metrics = list(RATE_FORMULAS) if metrics is None else list(metrics)
+    unknown = [m for m in metrics if m not in RATE_FORMULAS]
+    if unknown:
+        raise ValueError(f"Unknown metrics {unknown}. "
+                         f"Supported: {sorted(RATE_FORMULAS)}")
+    return metrics
+
+
+def _table(arrays: EvalArrays, level: str) -> tuple[list, list, np.ndarray]:
+    """(column names, group keys, counts) for a level of arrays."""
+    if level == "group":
+        groups, counts = arrays.group_count_table()
+        return ["group"], [(g,) for g in groups], counts
+    if level == "intersection":
+        combinations, counts = arrays.intersect_count_table()
+        return list(arrays.category_codes), combinations, counts
+    raise ValueError(f"level must be one of {_LEVELS}, got {level!r}")
+
+
+def _max_diff(values: np.ndarray) -> np.ndarray:
+    """Max minus min over the last axis; NaN if any value is NaN."""
+    return values.max(axis=-1) - values.min(axis=-1)
+
+
+def _max_ratio(values: np.ndarray, natural_log: bool) -> np.ndarray:
+    """Max over min over the last axis; NaN if any value is NaN or 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where((values == 0).any(axis=-1), np.nan,
+                         values.max(axis=-1) / values.min(axis=-1))
+        return np.log(ratio) if natural_log else ratio
+
+
+@dataclass(frozen=True)
+class IntersectDisparity:
+    """
+    Max difference or ratio of a rate across intersectional groups, with
+    the groups that produce it.
+
+    Returned by the max_intersect_*_diff / _ratio functions when called
+    with return_details=True. float(result) gives the value.
+
+    Attributes
+    ----------
+    metric:
+        Rate name, e.g. 'fnr'.
+    kind:
+        'diff' or 'ratio'.
+    value:
+        The max difference, or the (log) max ratio.
+    max_group, min_group:
+        Names (as in all_intersect_*) of the groups with the highest and
+        lowest defined rate; None if no rate is defined.
+    max_rate, min_rate:
+        Their rates.
+    max_n, min_n:
+        Their sizes (rows).
+    n_groups:
+        Number of intersectional groups.
+    undefined_groups:
+        Groups whose rate is undefined (NaN), e.g. empty combinations.
+    """
+
+    metric: str
+    kind: str
+    value: float
+    max_group: Optional[str]
+    max_rate: float
+    max_n: int
+    min_group: Optional[str]
+    min_rate: float
+    min_n: int
+    n_groups: int
+    undefined_groups: tuple
+
+    def __float__(self) -> float:
+        return float(self.value)
+
+
+def intersect_disparity(
+    metric: str,
+    kind: str,
+    subject_labels_dict,
+    predictions=None,
+    true_statuses=None,
+    *,
+    natural_log: bool = True,
+    ignore_nan: bool = False,
+) -> IntersectDisparity:
+    """
+    Max difference or ratio of a rate plus the extreme groups, from one
+    count table.
+
+    Parameters
+    ----------
+    metric:
+        Key of RATE_FORMULAS.
+    kind:
+        'diff' or 'ratio'.
+    subject_labels_dict, predictions, true_statuses:
+        As for all_intersect_* (a dict of label lists, or EvalArrays).
+    natural_log:
+        Log of the ratio (kind='ratio' only). Default True.
+    ignore_nan:
+        Leave groups with an undefined rate out instead of returning NaN.
+        The ratio is still NaN if a remaining rate is 0.
+
+    Returns
+    -------
+    IntersectDisparity
+        The extreme groups are reported from the defined rates even when
+        value is NaN, so the offending groups can be found either way.
+    """
+    _check_metrics([metric])
+    if kind not in ("diff", "ratio"):
+        raise ValueError(f"kind must be 'diff' or 'ratio', got {kind!r}")
+
+    arrays = _intersect_arrays(subject_labels_dict, predictions,
+                               true_statuses)
+    groups, counts = arrays.intersect_count_table()
+    values = rate_from_counts(metric, counts)
+    sizes = counts.sum(axis=1)
+    undefined = np.isnan(values)
+
+    if undefined.all():
+        high = low = None
+    else:
+        high, low = int(np.nanargmax(values)), int(np.nanargmin(values))
+
+    if high is None or (undefined.any() and not ignore_nan):
+        value = np.nan
+    elif kind == "diff":
+        value = values[high] - values[low]
+    else:
+        value = float(_max_ratio(values[[high, low]], natural_log))
+
+    def name(i):
+        return None if i is None else " + ".join(str(g) for g in groups[i])
+
+    return IntersectDisparity(
+        metric=metric,
+        kind=kind,
+        value=float(value),
+        max_group=name(high),
+        max_rate=np.nan if high is None else float(values[high]),
+        max_n=0 if high is None else int(sizes[high]),
+        min_group=name(low),
+        min_rate=np.nan if low is None else float(values[low]),
+        min_n=0 if low is None else int(sizes[low]),
+        n_groups=len(groups),
+        undefined_groups=tuple(name(i) for i in np.flatnonzero(undefined)),
+    )
+
+
+def rate_table(
+    arrays: EvalArrays,
+    metrics: Optional[Sequence[str]] = None,
+    *,
+    level: str = "intersection",
+):
+    """
+    Several rates for every group, from one count table.
+
+    Parameters
+    ----------
+    arrays:
+        EvalArrays with subject_labels (level='group') or
+        subject_labels_dict (level='intersection').
+    metrics:
+        Rate names. Defaults to every registered rate.
+    level:
+        'group' (one row per subject label, first-seen order) or
+        'intersection' (one row per combination of levels, as
+        all_intersect_*).
+
+    Returns
+    -------
+    pd.DataFrame
+        Group column(s), the group size n and one column per rate
+        (np.nan where a denominator is 0).
+    """
+    import pandas as pd
+
+    metrics = _check_metrics(metrics)
+    columns, groups, counts = _table(arrays, level)
+
+    out = pd.DataFrame(groups, columns=columns, dtype=object)
+    out["n"] = counts.sum(axis=1)
+    for metric in metrics:
+        out[metric] = rate_from_counts(metric, counts)
+    return out
+
+
+def disparity_table(
+    arrays: EvalArrays,
+    metrics: Optional[Sequence[str]] = None,
+    *,
+    level: str = "intersection",
+    natural_log: bool = True,
+):
+    """
+    Max difference and max ratio of several rates, from one count table.
+
+    Parameters
+    ----------
+    arrays, metrics, level:
+        As for rate_table.
+    natural_log:
+        Report the log of the max ratio. Default True.
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by metric, with columns max_diff and max_ratio (following
+        max_intersect_*_diff / _ratio: NaN if any group's rate is undefined,
+        and for the ratio also if any rate is 0), min_group and max_group
+        (the groups with the lowest and highest defined rate).
+    """
+    import pandas as pd
+
+    metrics = _check_metrics(metrics)
+    _, groups, counts = _table(arrays, level)
+    names = [" + ".join(str(g) for g in group) for group in groups]
+
+    rows = {}
+    for metric in metrics:
+        values = rate_from_counts(metric, counts)
+        defined = ~np.isnan(values)
+        low = high = None
+        if defined.any():
+            idx = np.flatnonzero(defined)
+            low = names[idx[np.argmin(values[defined])]]
+            high = names[idx[np.argmax(values[defined])]]
+        rows[metric] = {
+            "max_diff": float(_max_diff(values)),
+            "max_ratio": float(_max_ratio(values, natural_log)),
+            "min_group": low,
+            "max_group": high,
+        }
+
+    out = pd.DataFrame.from_dict(rows, orient="index")
+    out.index.name = "metric"
+    return out
+
+
+def rollup_table(
+    data: Union[EvalArrays, CountCube],
+    metrics: Optional[Sequence[str]] = None,
+    *,
+    min_size: int = 1,
+    max_size: Optional[int] = None,
+):
+    """
+    Rates for every group of every subset of the protected categories.
+
+    The data is counted once at the finest intersection (a CountCube);
+    each coarser grouping - every single attribute, every pair, ... up to
+    the full intersection - is summed from the cube.
+
+    Parameters
+    ----------
+    data:
+        EvalArrays with subject_labels_dict, or a CountCube built from one.
+    metrics:
+        Rate names. Defaults to every registered rate.
+    min_size, max_size:
+        Range of subset sizes to include. 0 adds an overall row; max_size
+        defaults to the number of categories.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (subset, group), ordered by subset size, then subset,
+        then levels. Columns: size, attributes (category names joined by
+        ' + '), group (levels joined by ' + ', as in all_intersect_*), one
+        column per category (None where rolled up), n and one column per
+        rate. The rows of a subset match all_intersect_* called with
+        subject_labels_dict restricted to that subset.
+    """
+    import pandas as pd
+
+    metrics = _check_metrics(metrics)
+    cube = data.count_cube() if isinstance(data, EvalArrays) else data
+    categories = cube.categories
+    if max_size is None:
+        max_size = len(categories)
+    if not 0 <= min_size <= max_size:
+        raise ValueError("Need 0 <= min_size <= max_size.")
+
+    frames = []
+    for size in range(min_size, min(max_size, len(categories)) + 1):
+        for subset in itertools.combinations(categories, size):
+            groups, counts = cube.rollup(subset)
+            frame = pd.DataFrame({
+                "size": size,
+                "attributes": " + ".join(subset),
+                "group": [" + ".join(str(g) for g in group)
+                          for group in groups],
+            })
+            for category in categories:
+                if category in subset:
+                    i = subset.index(category)
+                    frame[category] = pd.Series([g[i] for g in groups],
+                                                dtype=object)
+                else:
+                    frame[category] = None
+            frame["n"] = counts.sum(axis=1)
+            for metric in metrics:
+                frame[metric] = rate_from_counts(metric, counts)
+            frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _bootstrap_counts(counts: np.ndarray, n_boot: int,
+                      random_state) -> np.ndarray:
+    """Multinomial resamples of a (groups, 4) count table."""
+    flat = counts.ravel()
+    n = int(flat.sum())
+    if n == 0:
+        raise ValueError("Cannot bootstrap an empty count table.")
+    rng = np.random.default_rng(random_state)
+    samples = rng.multinomial(n, flat / n, size=n_boot)
+    return samples.reshape(n_boot, *counts.shape)
+
+
+def _interval(samples: np.ndarray, ci: float) -> tuple:
+    """Percentile interval over axis 0, ignoring undefined replicates."""
+    tail = 100 * (1 - ci) / 2
+    with warnings.catch_warnings():
+        # all-NaN columns (e.g. a group never drawn) give NaN bounds
+        warnings.simplefilter("ignore", RuntimeWarning)
+        low, high = np.nanpercentile(samples, [tail, 100 - tail], axis=0)
+    return low, high
+
+
+def bootstrap_rates(
+    arrays: EvalArrays,
+    metrics: Optional[Sequence[str]] = None,
+    *,
+    level: str = "intersection",
+    n_boot: int = 1000,
+    ci: float = 0.95,
+    random_state: Optional[int] = None,
+):
+    """
+    Bootstrap percentile intervals for rates and their max differences.
+
+    Parameters
+    ----------
+    arrays, metrics, level:
+        As for rate_table.
+    n_boot:
+        Number of bootstrap replicates.
+    ci:
+        Interval coverage, e.g. 0.95.
+    random_state:
+        Seed for the resampling.
+
+    Returns
+    -------
+    pd.DataFrame
+        Long format with columns group, metric, estimate, low and high.
+        Rows with group '<max_diff>' hold the max difference of each
+        metric. Replicates in which a rate is undefined (e.g. a small group
+        drew no positives) are left out of that rate's interval.
+
+    Raises
+    ------
+    ValueError
+        If n_boot < 1, ci is not in (0, 1) or the table is empty.
+    """
+    import pandas as pd
+
+    if n_boot < 1:
+        raise ValueError("n_boot must be >= 1")
+    if not 0 < ci < 1:
+        raise ValueError("ci must be between 0 and 1")
+
+    metrics = _check_metrics(metrics)
+    _, groups, counts = _table(arrays, level)
+    names = [" + ".join(str(g) for g in group) for group in groups]
+    samples = _bootstrap_counts(counts, n_boot, random_state)
+
+    frames = []
+    for metric in metrics:
+        estimate = rate_from_counts(metric, counts)
+        replicates = rate_from_counts(metric, samples)
+        low, high = _interval(replicates, ci)
+
+        diffs = _max_diff(replicates)
+        diff_low, diff_high = _interval(diffs[:, None], ci)
+        frames.append(pd.DataFrame({
+            "group": [*names, "<max_diff>"],
+            "metric": metric,
+            "estimate": [*estimate, _max_diff(estimate)],
+            "low": [*low, diff_low[0]],
+            "high": [*high, diff_high[0]],
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+# ---------------------------------------------------------------------
+# Generated metric families
+# ---------------------------------------------------------------------
+
+def _group_arrays(subject_labels, predictions, true_statuses):
+    if isinstance(subject_labels, EvalArrays):
+        return subject_labels
+    return EvalArrays(y_true=true_statuses, y_pred=predictions,
+                      subject_labels=subject_labels)
+
+
+def _intersect_arrays(subject_labels_dict, predictions, true_statuses):
+    if isinstance(subject_labels_dict, EvalArrays):
+        return subject_labels_dict
+    return EvalArrays(y_true=true_statuses, y_pred=predictions,
+                      subject_labels_dict=subject_labels_dict)
+
+
+def _plural(name: str) -> str:
+    return name if name.endswith("s") else f"{name}s"
+
+
+_DATA_PARAMS = """\
+    predictions : list[bool]
+        A list of predicted diagnoses for each observation in the
+        evaluation dataset.
+    true_statuses : list[bool]
+        A list of true diagnoses for each observation in the
+        evaluation dataset."""
+
+_DOCS = {
+    "group": """
+    Find the {desc} of a group with a specific label.
+
+    Parameters
+    ----------
+    group_label : str or int
+        The label of the group to evaluate.
+    subject_labels : list or EvalArrays
+        Subject labels for every observation in the evaluation dataset.
+{data}
+
+    Returns
+    -------
+    float
+        The {desc} of the model in the specified group. Returns np.nan if
+        its denominator is 0 (e.g. the group has no observations).
+    """,
+    "group_diff": """
+    Calculate the absolute difference in {desc} between two groups.
+
+    Parameters
+    ----------
+    group_a_label : str or int
+        The label of the first group.
+    group_b_label : str or int
+        The label of the second group.
+    subject_labels : list or EvalArrays
+        Subject labels for every observation in the evaluation dataset.
+{data}
+
+    Returns
+    -------
+    float
+        The absolute difference in {desc} between the two groups. Returns
+        np.nan if either rate is undefined.
+    """,
+    "group_ratio": """
+    Calculate the ratio of {desc}s between two groups.
+
+    The larger rate is divided by the smaller, so the ratio is >= 1.
+
+    Parameters
+    ----------
+    group_a_label : str or int
+        The label of the first group.
+    group_b_label : str or int
+        The label of the second group.
+    subject_labels : list or EvalArrays
+        Subject labels for every observation in the evaluation dataset.
+{data}
+    natural_log : bool, optional
+        If True, return the natural logarithm of the ratio. Default is True.
+
+    Returns
+    -------
+    float
+        The (log) ratio of {desc}s between the two groups. Returns np.nan if
+        either rate is undefined or 0.
+    """,
+    "intersect": """
+    Calculate the {desc} for an intersectional group.
+
+    Parameters
+    ----------
+    group_labels_dict : dict
+        Dictionary mapping category names to the group labels that define
+        the intersectional group (e.g., {{'age': 'Older', 'gender': 'F'}}).
+    subject_labels_dict : dict or EvalArrays
+        Dictionary mapping category names to lists of labels for each
+        observation in the evaluation dataset.
+{data}
+
+    Returns
+    -------
+    float
+        The {desc} of the model in the intersectional group. Returns np.nan
+        if its denominator is 0.
+    """,
+    "all_intersect": """
+    Calculate the {desc} for all possible intersectional groups.
+
+    Parameters
+    ----------
+    subject_labels_dict : dict or EvalArrays
+        Dictionary mapping category names to lists of labels for each
+        observation in the evaluation dataset.
+{data}
+
+    Returns
+    -------
+    dict
+        Dictionary mapping intersectional group names (as strings with
+        ' + ' separating categories) to their {desc}.
+    """,
+    "max_diff": """
+    Calculate the maximum difference in {desc} across all intersectional
+    groups.
+
+    Parameters
+    ----------
+    subject_labels_dict : dict or EvalArrays
+        Dictionary mapping category names to lists of labels for each
+        observation in the evaluation dataset.
+{data}
+    ignore_nan : bool, optional
+        If True, leave out groups whose {desc} is undefined instead of
+        returning np.nan. Default is False.
+    return_details : bool, optional
+        If True, return an IntersectDisparity holding the value and the
+        groups with the highest and lowest {desc}, with their sizes.
+        Default is False.
+
+    Returns
+    -------
+    float or IntersectDisparity
+        The difference between the maximum and minimum {desc} across all
+        intersectional groups. Returns np.nan if any rate is undefined.
+    """,
+    "max_ratio": """
+    Calculate the ratio of the maximum to minimum {desc} across all
+    intersectional groups.
+
+    Parameters
+    ----------
+    subject_labels_dict : dict or EvalArrays
+        Dictionary mapping category names to lists of labels for each
+        observation in the evaluation dataset.
+{data}
+    natural_log : bool, optional
+        If True, return the natural logarithm of the ratio. Default is True.
+    ignore_nan : bool, optional
+        If True, leave out groups whose {desc} is undefined instead of
+        returning np.nan. Default is False.
+    return_details : bool, optional
+        If True, return an IntersectDisparity holding the value and the
+        groups with the highest and lowest {desc}, with their sizes.
+        Default is False.
+
+    Returns
+    -------
+    float or IntersectDisparity
+        The (log) ratio of the maximum to minimum {desc}. Returns np.nan if
+        any rate is undefined or 0.
+    """,
+    "max_diff_bootstrap": """
+    Bootstrap interval for the maximum difference in {desc} across all
+    intersectional groups.
+
+    Parameters
+    ----------
+    subject_labels_dict : dict or EvalArrays
+        Dictionary mapping category names to lists of labels for each
+        observation in the evaluation dataset.
+{data}
+    n_boot : int, optional
+        Number of bootstrap replicates. Default is 1000.
+    ci : float, optional
+        Interval coverage. Default is 0.95.
+    random_state : int, optional
+        Seed for the resampling.
+
+    Returns
+    -------
+    tuple[float, float, float]
+        (estimate, low, high), where estimate is max_intersect_*_diff.
+    """,
+}
+
+
+def make_metric_family(metric: str, *,
+                       module: str = "fairness.metrics") -> dict:
+    """
+    Generate the metric functions of one registered rate.
+
+    Parameters
+    ----------
+    metric:
+        Key of RATE_FORMULAS.
+    module:
+        Module the functions are placed in (sets their __module__ so they
+        pickle and are cached and instrumented by that module).
+
+    Returns
+    -------
+    dict
+        Function name -> function, for group_<m>, group_<m>_diff,
+        group_<m>_ratio, intersect_<m>, all_intersect_<m>s,
+        max_intersect_<m>_diff, max_intersect_<m>_ratio and
+        max_intersect_<m>_diff_bootstrap.
+    """
+    _check_metrics([metric])
+    desc = RATE_DESCRIPTIONS.get(metric, metric)
+
+    def rate_of(arrays, mask):
+        return float(rate_from_counts(metric, arrays.counts(mask)))
+
+    def pair(group_a_label, group_b_label, subject_labels, predictions,
+             true_statuses):
+        arrays = _group_arrays(subject_labels, predictions, true_statuses)
+        return np.array([rate_of(arrays, arrays.group_mask(group_a_label)),
+                         rate_of(arrays, arrays.group_mask(group_b_label))])
+
+    def intersect_values(subject_labels_dict, predictions, true_statuses):
+        arrays = _intersect_arrays(subject_labels_dict, predictions,
+                                   true_statuses)
+        _, counts = arrays.intersect_count_table()
+        return arrays, counts, rate_from_counts(metric, counts)
+
+    def group(group_label, subject_labels, predictions=None,
+              true_statuses=None):
+        arrays = _group_arrays(subject_labels, predictions, true_statuses)
+        return rate_of(arrays, arrays.group_mask(group_label))
+
+    def group_diff(group_a_label, group_b_label, subject_labels,
+                   predictions=None, true_statuses=None):
+        values = pair(group_a_label, group_b_label, subject_labels,
+                      predictions, true_statuses)
+        return float(_max_diff(values))
+
+    def group_ratio(group_a_label, group_b_label, subject_labels,
+                    predictions=None, true_statuses=None, natural_log=True):
+        values = pair(group_a_label, group_b_label, subject_labels,
+                      predictions, true_statuses)
+        return float(_max_ratio(values, natural_log))
+
+    def intersect(group_labels_dict, subject_labels_dict, predictions=None,
+                  true_statuses=None):
+        arrays = _intersect_arrays(subject_labels_dict, predictions,
+                                   true_statuses)
+        return rate_of(arrays, arrays.intersect_mask(group_labels_dict))
+
+    def all_intersect(subject_labels_dict, predictions=None,
+                      true_statuses=None):
+        arrays, counts, values = intersect_values(
+            subject_labels_dict, predictions, true_statuses)
+        combinations, _ = arrays.intersect_count_table()
+        return {" + ".join(str(g) for g in combination): float(value)
+                for combination, value in zip(combinations, values)}
+
+    # value and extreme groups always come from the same count table
+    def max_diff(subject_labels_dict, predictions=None, true_statuses=None,
+                 *, ignore_nan=False, return_details=False):
+        result = intersect_disparity(
+            metric, "diff", subject_labels_dict, predictions, true_statuses,
+            ignore_nan=ignore_nan)
+        return result if return_details else result.value
+
+    def max_ratio(subject_labels_dict, predictions=None, true_statuses=None,
+                  natural_log=True, *, ignore_nan=False,
+                  return_details=False):
+        result = intersect_disparity(
+            metric, "ratio", subject_labels_dict, predictions, true_statuses,
+            natural_log=natural_log, ignore_nan=ignore_nan)
+        return result if return_details else result.value
+
+    def max_diff_bootstrap(subject_labels_dict, predictions=None,
+                           true_statuses=None, n_boot=1000, ci=0.95,
+                           random_state=None):
+        _, counts, values = intersect_values(subject_labels_dict,
+                                             predictions, true_statuses)
+        samples = _bootstrap_counts(counts, n_boot, random_state)
+        diffs = _max_diff(rate_from_counts(metric, samples))
+        low, high = _interval(diffs[:, None], ci)
+        return float(_max_diff(values)), float(low[0]), float(high[0])
+
+    functions = {
+        f"group_{metric}": (group, "group"),
+        f"group_{metric}_diff": (group_diff, "group_diff"),
+        f"group_{metric}_ratio": (group_ratio, "group_ratio"),
+        f"intersect_{metric}": (intersect, "intersect"),
+        f"all_intersect_{_plural(metric)}": (all_intersect,
+                                             "all_intersect"),
+        f"max_intersect_{metric}_diff": (max_diff, "max_diff"),
+        f"max_intersect_{metric}_ratio": (max_ratio, "max_ratio"),
+        f"max_intersect_{metric}_diff_bootstrap": (max_diff_bootstrap,
+                                                   "max_diff_bootstrap"),
+    }
+
+    family = {}
+    for name, (fn, doc) in functions.items():
+        fn.__name__ = fn.__qualname__ = name
+        fn.__module__ = module
+        fn.__doc__ = _DOCS[doc].format(desc=desc, data=_DATA_PARAMS)
+        family[name] = fn
+    return family
+
+
+def add_metric_families(namespace: dict, metrics: Sequence[str], *,
+                        kinds: Optional[Sequence[str]] = None) -> None:
+    """
+    Add the generated families of several rates to a module namespace.
+
+    Call as add_metric_families(globals(), [...]) before the module's
+    functions are cached and instrumented.
+
+    Parameters
+    ----------
+    namespace:
+        Module globals().
+    metrics:
+        Keys of RATE_FORMULAS.
+    kinds:
+        Optional name suffixes to keep, e.g. ["_diff_bootstrap"] to add
+        only the bootstrap variants. Defaults to the whole family.
+    """
+    for metric in metrics:
+        family = make_metric_family(metric, module=namespace["__name__"])
+        namespace.update({name: fn for name, fn in family.items()
+                          if kinds is None
+                          or any(name.endswith(k) for k in kinds)})
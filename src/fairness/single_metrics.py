@@ -1,79 +1,86 @@
 import numpy as np
+import pandas as pd
+
+from fairness.arrays import EvalArrays, as_binary_array
+from fairness.profiling import instrument_module
+from fairness.utils.cache import cache_module
 
 
 def group_to_binary(labels, privileged_label):
     """
     Adapts single fairness functions to the intersectional
     ones
-    labels: list of group labels (e.g. 'Male', 'Female')
+    labels: list of group labels (e.g. 'Male', 'Female'), or an
+        EvalArrays instance whose subject_labels are used
     privileged_label: label considered privileged
     returns: numpy array (1 = privileged, 0 = unprivileged)
     """
+    if isinstance(labels, EvalArrays):
+        if not labels.has_label(privileged_label):
+            raise ValueError(
+                f"Privileged label'{privileged_label}'not found in group "
+                f"labels. Available labels: {list(labels.label_index)}"
+            )
+        return labels.group_mask(privileged_label).astype(int)
+
     labels = np.array(labels)
+    privileged = labels == privileged_label
 
-    if privileged_label not in labels:
+    if not privileged.any():
         raise ValueError(
             f"Privileged label'{privileged_label}'not found in group labels. "
             f"Available labels: {np.unique(labels)}"
         )
 
-    return (labels == privileged_label).astype(int)
+    return privileged.astype(int)
 
 
-def calculate_TP_FN_FP_TN(y_test, y_pred):
+def calculate_TP_FN_FP_TN(y_test, y_pred=None):
     """
     Computes the confusion matrix components: True Positives (TP),
     False Negatives (FN), True Negatives (TN), and False Positives (FP).
 
+    y_test may also be an EvalArrays instance (with y_pred omitted), in
+    which case the already-validated arrays are counted directly.
+
     Notes
     -----
     - Binary classification is assumed.
     - Label 1 denotes the positive outcome.
     - Label 0 denotes the negative outcome.
     """
+    if isinstance(y_test, EvalArrays):
+        arrays = y_test
+    else:
+        if len(y_test) != len(y_pred):
+            raise ValueError("y_test and y_pred must have the same length.")
+        try:
+            arrays = EvalArrays(y_true=y_test, y_pred=y_pred)
+        except ValueError as err:
+            raise ValueError(str(err).replace("y_true", "y_test")) from None
 
-    y_test = np.array(y_test)
-    y_pred = np.array(y_pred)
-
-    if len(y_test) != len(y_pred):
-        raise ValueError("y_test and y_pred must have the same length.")
+    return _checked_counts(arrays)
 
-    valid_values = {0, 1}
-
-    if not set(np.unique(y_test)).issubset(valid_values):
-        raise ValueError(
-            "y_test must contain only {0, 1}, where 1 is the positive outcome."
-        )
 
-    if not set(np.unique(y_pred)).issubset(valid_values):
-        raise ValueError(
-            "y_pred must contain only {0, 1}, where 1 is the positive outcome."
-        )
+def _checked_counts(arrays, mask=None):
+    """
+    Count (tp, fn, tn, fp) for validated arrays and check both classes of
+    y_test are present, using the counts rather than rescanning the data.
+    """
+    tp, fn, tn, fp = arrays.counts(mask)
 
-    if 1 not in y_test:
+    if tp + fn == 0:
         raise ValueError(
             "y_test contains no positive samples (label=1). "
             "TPR-based metrics are undefined."
         )
 
-    if 0 not in y_test:
+    if tn + fp == 0:
         raise ValueError(
             "y_test contains no negative samples (label=0). "
             "FPR-based metrics are undefined."
         )
 
-    tp = fp = tn = fn = 0
-
-    for a, b in zip(y_test, y_pred):
-        if a == 1 and b == 1:
-            tp += 1
-        elif a == 1 and b == 0:
-            fn += 1
-        elif a == 0 and b == 1:
-            fp += 1
-        elif a == 0 and b == 0:
-            tn += 1
-
     return tp, fn, tn, fp
 
 
@@ -89,12 +96,20 @@ def calculate_TPR_TNR_FPR_FNR(tp, fn, tn, fp):
 
     # Type check
     for name, value in zip(["tp", "fn", "tn", "fp"], [tp, fn, tn, fp]):
-        if not isinstance(value, (int,)):
+        if not isinstance(value, (int, np.integer)):
             raise TypeError(f"{name} must be an integer. Got {type(value)}.")
 
         if value < 0:
             raise ValueError(f"{name} must be non-negative. Got {value}.")
 
+    return _rates(tp, fn, tn, fp)
+
+
+def _rates(tp, fn, tn, fp):
+    """
+    Rates from counts already known to be non-negative integers, e.g. those
+    produced from EvalArrays.
+    """
     # Denominator checks (critical for fairness metrics)
     if tp + fn == 0:
         raise ZeroDivisionError(
@@ -116,7 +131,66 @@ def calculate_TPR_TNR_FPR_FNR(tp, fn, tn, fp):
     return TPR, TNR, FPR, FNR
 
 
-def calculate_EOD(y_test, y_pred, group_labels, privileged_label):
+def _require(**args):
+    """
+    Raise a ValueError naming the first argument left as None. Arguments
+    that only EvalArrays inputs may omit default to None, so a missing one
+    is reported here rather than as a TypeError deeper down.
+    """
+    for name, value in args.items():
+        if value is None:
+            raise ValueError(f"{name} is required.")
+
+
+def _as_group_arrays(y_test, y_pred, group_labels):
+    """
+    Validate inputs of the two-group metrics once, returning EvalArrays
+    with group_labels as subject_labels. EvalArrays inputs pass through.
+    """
+    if isinstance(y_test, EvalArrays):
+        if y_test.label_codes is None:
+            raise ValueError("EvalArrays passed as y_test must have "
+                             "subject_labels (the group labels).")
+        return y_test
+
+    _require(y_pred=y_pred, group_labels=group_labels)
+
+    if not (len(y_test) == len(y_pred) == len(group_labels)):
+        raise ValueError(
+            "y_test, y_pred, and group_labels must have the same length."
+        )
+
+    try:
+        return EvalArrays(y_true=y_test, y_pred=y_pred,
+                          subject_labels=group_labels)
+    except ValueError as err:
+        raise ValueError(str(err).replace("y_true", "y_test")) from None
+
+
+def _privileged_rates(arrays, privileged_label):
+    """
+    (TPR, TNR, FPR, FNR) of the privileged and underprivileged groups.
+    """
+    _require(privileged_label=privileged_label)
+    if not arrays.has_label(privileged_label):
+        raise ValueError(
+            f"Privileged label '{privileged_label}' not found in group_labels."
+            f"Available labels: {list(arrays.label_index)}"
+        )
+
+    mask_priv = arrays.group_mask(privileged_label)
+
+    # Privileged group
+    rates_p = _rates(*_checked_counts(arrays, mask_priv))
+
+    # Underprivileged group
+    rates_u = _rates(*_checked_counts(arrays, ~mask_priv))
+
+    return rates_p, rates_u
+
+
+def calculate_EOD(y_test, y_pred=None, group_labels=None,
+                  privileged_label=None):
     """
     Compute the Equal Opportunity Difference (EOD) between demographic groups.
 
@@ -127,9 +201,12 @@ def calculate_EOD(y_test, y_pred, group_labels, privileged_label):
 
     Parameters
     ----------
-    y_test : array-like of shape (n_samples,)
+    y_test : array-like of shape (n_samples,) or EvalArrays
         Ground-truth binary labels.
         Expected values: 0 (negative outcome) or 1 (positive outcome).
+        An EvalArrays instance (with subject_labels holding the group
+        labels) may be passed instead, leaving y_pred and group_labels as
+        None; its inputs are then trusted without re-validation.
 
     y_pred : array-like of shape (n_samples,)
         Predicted binary labels from a classifier.
@@ -157,42 +234,9 @@ def calculate_EOD(y_test, y_pred, group_labels, privileged_label):
     -----
     - EOD focuses exclusively on the positive class (y = 1).
     """
-    group_labels = np.array(group_labels)
-    y_test = np.array(y_test)
-    y_pred = np.array(y_pred)
-
-    if not (len(y_test) == len(y_pred) == len(group_labels)):
-        raise ValueError(
-            "y_test, y_pred, and group_labels must have the same length."
-        )
-
-    if privileged_label not in group_labels:
-        raise ValueError(
-            f"Privileged label '{privileged_label}' not found in group_labels."
-            f"Available labels: {np.unique(group_labels)}"
-        )
-
-    privileged_group = group_to_binary(group_labels, privileged_label)
-    # Masks
-
-    mask_priv = privileged_group == 1
-    mask_unpriv = privileged_group == 0
-
-    # Privileged group
-    tp_p, fn_p, fp_p, tn_p = calculate_TP_FN_FP_TN(
-        y_test[mask_priv], y_pred[mask_priv]
-    )
-    TPR_p, TNR_p, FPR_p, FNR_p = calculate_TPR_TNR_FPR_FNR(
-        tp_p, fn_p, tn_p, fp_p
-    )
-
-    # Underprivileged group
-    tp_u, fn_u, fp_u, tn_u = calculate_TP_FN_FP_TN(
-        y_test[mask_unpriv], y_pred[mask_unpriv]
-    )
-    TPR_u, TNR_u, FPR_u, FNR_u = calculate_TPR_TNR_FPR_FNR(
-        tp_u, fn_u, tn_u, fp_u
-    )
+    arrays = _as_group_arrays(y_test, y_pred, group_labels)
+    (TPR_p, TNR_p, FPR_p, FNR_p), (TPR_u, TNR_u, FPR_u, FNR_u) = \
+        _privileged_rates(arrays, privileged_label)
 
     # Equal Opportunity Difference
     EOD = abs(TPR_u - TPR_p)
@@ -200,7 +244,8 @@ def calculate_EOD(y_test, y_pred, group_labels, privileged_label):
     return EOD
 
 
-def calculate_AOD(y_test, y_pred, group_labels, privileged_label):
+def calculate_AOD(y_test, y_pred=None, group_labels=None,
+                  privileged_label=None):
     """
     Compute the Average Odds Difference (AOD) between demographic groups.
 
@@ -211,9 +256,12 @@ def calculate_AOD(y_test, y_pred, group_labels, privileged_label):
 
     Parameters
     ----------
-    y_test : array-like of shape (n_samples,)
+    y_test : array-like of shape (n_samples,) or EvalArrays
         Ground-truth binary labels.
         Expected values: 0 (negative outcome) or 1 (positive outcome).
+        An EvalArrays instance (with subject_labels holding the group
+        labels) may be passed instead, leaving y_pred and group_labels as
+        None; its inputs are then trusted without re-validation.
 
     y_pred : array-like of shape (n_samples,)
         Predicted binary labels from a classifier.
@@ -238,43 +286,9 @@ def calculate_AOD(y_test, y_pred, group_labels, privileged_label):
 
         Values closer to 0 indicate better fairness.
     """
-    # Masks
-    group_labels = np.array(group_labels)
-    y_test = np.array(y_test)
-    y_pred = np.array(y_pred)
-
-    if not (len(y_test) == len(y_pred) == len(group_labels)):
-        raise ValueError(
-            "y_test, y_pred, and group_labels must have the same length."
-        )
-
-    if privileged_label not in group_labels:
-        raise ValueError(
-            f"Privileged label '{privileged_label}' not found in group_labels."
-            f"Available labels: {np.unique(group_labels)}"
-        )
-
-    privileged_group = group_to_binary(group_labels, privileged_label)
-    # Masks
-
-    mask_priv = privileged_group == 1
-    mask_unpriv = privileged_group == 0
-
-    # Privileged group
-    tp_p, fn_p, fp_p, tn_p = calculate_TP_FN_FP_TN(
-        y_test[mask_priv], y_pred[mask_priv]
-    )
-    TPR_p, TNR_p, FPR_p, FNR_p = calculate_TPR_TNR_FPR_FNR(
-        tp_p, fn_p, tn_p, fp_p
-    )
-
-    # Underprivileged group
-    tp_u, fn_u, fp_u, tn_u = calculate_TP_FN_FP_TN(
-        y_test[mask_unpriv], y_pred[mask_unpriv]
-    )
-    TPR_u, TNR_u, FPR_u, FNR_u = calculate_TPR_TNR_FPR_FNR(
-        tp_u, fn_u, tn_u, fp_u
-    )
+    arrays = _as_group_arrays(y_test, y_pred, group_labels)
+    (TPR_p, TNR_p, FPR_p, FNR_p), (TPR_u, TNR_u, FPR_u, FNR_u) = \
+        _privileged_rates(arrays, privileged_label)
 
     # Average Odds Difference
     AOD = ((FPR_u - FPR_p) + (TPR_u - TPR_p)) / 2
@@ -282,7 +296,7 @@ def calculate_AOD(y_test, y_pred, group_labels, privileged_label):
     return AOD
 
 
-def calculate_DI(y_pred, group_labels, privileged_label):
+def calculate_DI(y_pred, group_labels=None, privileged_label=None):
     """
     Compute Disparate Impact (DI) between demographic groups.
 
@@ -293,9 +307,11 @@ def calculate_DI(y_pred, group_labels, privileged_label):
 
     Parameters
     ----------
-    y_pred : array-like of shape (n_samples,)
+    y_pred : array-like of shape (n_samples,) or EvalArrays
         Predicted binary labels from a classifier.
         Expected values: 0 (negative outcome) or 1 (positive outcome).
+        An EvalArrays instance (with subject_labels holding the group
+        labels) may be passed instead, leaving group_labels as None.
 
     group_labels: categorical group membership
     labels for a protected attribute.
@@ -317,9 +333,16 @@ def calculate_DI(y_pred, group_labels, privileged_label):
         for the specified group.
 
     """
-    group_labels = np.array(group_labels)
-    y_pred = np.array(y_pred)
-    privileged_group = group_to_binary(group_labels, privileged_label)
+    _require(privileged_label=privileged_label)
+    if isinstance(y_pred, EvalArrays):
+        arrays = y_pred
+        y_pred = arrays.y_pred
+        privileged_group = group_to_binary(arrays, privileged_label)
+    else:
+        _require(group_labels=group_labels)
+        group_labels = np.array(group_labels)
+        y_pred = np.array(y_pred)
+        privileged_group = group_to_binary(group_labels, privileged_label)
     mask_priv = privileged_group == 1
     mask_unpriv = privileged_group == 0
 
@@ -335,3 +358,118 @@ def calculate_DI(y_pred, group_labels, privileged_label):
     DI = P_unpriv / P_priv
 
     return float(DI)
+
+
+SINGLE_METRIC_NAMES = ("EOD", "AOD", "DI")
+
+
+def calculate_single_metrics_batch(y_test, y_pred, protected_df,
+                                   privileged_labels, metrics=None):
+    """
+    Compute single-attribute fairness metrics for several protected
+    attributes in one sweep.
+
+    The outcome arrays are validated and encoded once, then each protected
+    attribute only needs a single ``np.bincount`` over a combined
+    (privileged, y_test, y_pred) code to obtain the confusion-matrix counts
+    of both the privileged and the underprivileged group.
+
+    Parameters
+    ----------
+    y_test : array-like of shape (n_samples,) or EvalArrays
+        Ground-truth binary labels (0/1). If EvalArrays, its y_true and
+        y_pred are used and y_pred should be None.
+    y_pred : array-like of shape (n_samples,) or None
+        Predicted binary labels (0/1).
+    protected_df : pandas.DataFrame
+        One column per protected attribute, row-aligned with y_test and
+        y_pred.
+    privileged_labels : Mapping[str, object]
+        Maps each protected column to its privileged label
+        (e.g. {'Sex': 'M', 'age_group': 'older'}). Only the columns listed
+        here are evaluated.
+    metrics : Sequence[str] or None, optional
+        Subset of {"EOD", "AOD", "DI"} to compute. Defaults to all.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Indexed by protected attribute, with one column per metric.
+        Metrics that are undefined for an attribute (e.g. a group with no
+        positive samples) are reported as np.nan rather than raising, so
+        one degenerate attribute does not abort the whole batch.
+
+    Raises
+    ------
+    ValueError
+        If lengths differ, outcomes are not binary, a column is missing,
+        a privileged label is not present, or an unknown metric is
+        requested.
+    """
+    if metrics is None:
+        metrics = SINGLE_METRIC_NAMES
+    metrics = list(metrics)
+
+    unknown = [m for m in metrics if m not in SINGLE_METRIC_NAMES]
+    if unknown:
+        raise ValueError(
+            f"Unknown metrics {unknown}. "
+            f"Supported: {list(SINGLE_METRIC_NAMES)}"
+        )
+
+    if isinstance(y_test, EvalArrays):
+        y_test, y_pred = y_test.y_true, y_test.y_pred
+    else:
+        y_test = as_binary_array(y_test, "y_test")
+        y_pred = as_binary_array(y_pred, "y_pred")
+
+    if not (len(y_test) == len(y_pred) == len(protected_df)):
+        raise ValueError(
+            "y_test, y_pred, and protected_df must have the same length."
+        )
+
+    missing_cols = [c for c in privileged_labels
+                    if c not in protected_df.columns]
+    if missing_cols:
+        raise ValueError(f"Protected columns not found: {missing_cols}")
+
+    # cell code: 0 = TN, 1 = FP, 2 = FN, 3 = TP
+    cells = 2 * y_test + y_pred
+
+    rows = {}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for col, privileged_label in privileged_labels.items():
+            labels = protected_df[col].to_numpy()
+            privileged = labels == privileged_label
+
+            if not privileged.any():
+                raise ValueError(
+                    f"Privileged label '{privileged_label}' not found in "
+                    f"column '{col}'. Available labels: {np.unique(labels)}"
+                )
+
+            # one pass: counts[0] = underprivileged, counts[1] = privileged
+            counts = np.bincount(4 * privileged + cells,
+                                 minlength=8).reshape(2, 4).astype(float)
+            tn, fp, fn, tp = counts.T
+
+            tpr = tp / (tp + fn)
+            fpr = fp / (fp + tn)
+            ppr = (tp + fp) / counts.sum(axis=1)
+
+            values = {
+                "EOD": abs(tpr[0] - tpr[1]),
+                "AOD": ((fpr[0] - fpr[1]) + (tpr[0] - tpr[1])) / 2,
+                "DI": ppr[0] / ppr[1] if ppr[1] > 0 else np.nan,
+            }
+            rows[col] = {m: float(values[m]) for m in metrics}
+
+    out = pd.DataFrame.from_dict(rows, orient="index", columns=metrics)
+    out.index.name = "attribute"
+    return out
+
+
+# cache and instrument the public functions above (no-ops unless a result
+# cache is set or profiling is enabled)
+cache_module(globals())
+instrument_module(globals())
@@ -0,0 +1,400 @@
+"""
+fairness.subgroups
+==================
+
+Search for the subgroups on which a model performs worst.
+
+`all_intersect_*` evaluates every combination of levels of the given
+categories, which is infeasible once there are many attributes. Instead,
+`find_subgroups` searches conjunctions of attribute=value conditions
+(numeric features are cut into quantile bins) for the top-k subgroups whose
+rate differs most from the population rate:
+
+- every condition is a bitset over the rows (64 rows per machine word), so
+  a conjunction is a bitwise AND and its confusion counts are popcounts
+- beam search extends the best beam_width subgroups of each depth with one
+  more condition on an attribute not used yet
+- min_support (rows in the subgroup) and min_denominator (rows in the
+  rate's denominator, e.g. true positives + false negatives for FNR) only
+  shrink as conditions are added, so failing subgroups are not extended
+- an optimistic estimate bounds the best score any refinement of a
+  subgroup could reach; subgroups whose bound cannot beat the current
+  k-th best score are not extended
+
+Typical usage
+-------------
+>>> from fairness.subgroups import find_subgroups
+>>> result = find_subgroups(y_true, y_pred, features_df, metric="fnr",
+...                         k=10, max_depth=3, min_support=0.01)
+>>> result.subgroups[["subgroup", "n", "fnr", "gap"]]
+"""
+
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from fairness.arrays import COUNT_COLUMNS, RATE_FORMULAS, as_binary_array
+
+# Rates for which a lower value is worse; the remaining built-in error
+# rates are worse when higher.
+_LOWER_IS_WORSE = {"acc", "tpr", "tnr", "precision", "npv", "f1"}
+_HIGHER_IS_WORSE = {"fnr", "fpr", "for", "fdr"}
+_DIRECTIONS = ("higher", "lower", "both")
+
+
+@dataclass(frozen=True)
+class SubgroupResult:
+    """
+    Top subgroups found by find_subgroups.
+
+    Attributes
+    ----------
+    subgroups:
+        One row per subgroup, best first, with columns subgroup
+        (conditions joined by ' & '), conditions (tuple of (column,
+        description) pairs), depth, n, support (fraction of rows), the
+        metric, gap (subgroup minus population rate), score (gap oriented
+        so that larger is worse) and the counts tp, fn, tn, fp.
+    metric:
+        Name of the rate searched.
+    population_rate:
+        The rate over all rows.
+    n_evaluated:
+        Number of candidate subgroups whose counts were computed.
+    """
+
+    subgroups: pd.DataFrame
+    metric: str
+    population_rate: float
+    n_evaluated: int
+
+
+# ---------------------------------------------------------------------
+# Bitsets
+# ---------------------------------------------------------------------
+
+def _pack(mask: np.ndarray) -> np.ndarray:
+    """Boolean mask -> uint64 words, 64 rows per word."""
+    packed = np.packbits(mask, bitorder="little")
+    pad = (-len(packed)) % 8
+    if pad:
+        packed = np.concatenate([packed, np.zeros(pad, dtype=np.uint8)])
+    return packed.view(np.uint64)
+
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(words: np.ndarray) -> int:
+        return int(np.bitwise_count(words).sum())
+else:  # NumPy < 2.0
+    _BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)],
+                            dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> int:
+        return int(_BYTE_COUNTS[words.view(np.uint8)].sum())
+
+
+# ---------------------------------------------------------------------
+# Conditions
+# ---------------------------------------------------------------------
+
+def _conditions(features: pd.DataFrame, n_bins: int) -> list:
+    """
+    (column, description, mask) for every attribute=value condition.
+
+    Numeric columns with more than n_bins distinct values are cut into
+    n_bins quantile bins; other columns use one condition per level.
+    Missing values satisfy no condition of their column.
+    """
+    out = []
+    for column in features.columns:
+        values = features[column]
+        numeric = pd.api.types.is_numeric_dtype(values) and \
+            not pd.api.types.is_bool_dtype(values)
+
+        if numeric and values.nunique() > n_bins:
+            data = values.to_numpy(dtype=float)
+            present = ~np.isnan(data)
+            edges = np.unique(np.quantile(data[present],
+                                          np.linspace(0, 1, n_bins + 1)))
+            # bin i holds edges[i] <= x < edges[i + 1]; the last bin is
+            # closed on the right
+            bins = np.clip(np.searchsorted(edges, data, side="right") - 1,
+                           0, len(edges) - 2)
+            for i in range(len(edges) - 1):
+                close = "]" if i == len(edges) - 2 else ")"
+                out.append((column,
+                            f"{column} in [{edges[i]:g}, {edges[i + 1]:g}"
+                            f"{close}",
+                            present & (bins == i)))
+            continue
+
+        codes, levels = pd.factorize(values, sort=True)
+        for i, level in enumerate(levels.tolist()):
+            out.append((column, f"{column}={level}", codes == i))
+    return out
+
+
+# ---------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------
+
+def _linear_coefficients(metric: str) -> Optional[tuple]:
+    """
+    Per-cell numerator and denominator weights of a rate, if its formula
+    is linear in the counts (all built-in rates are); else None.
+    """
+    formula = RATE_FORMULAS[metric]
+    eye = np.eye(4)
+    num, den = (np.array(v, dtype=float) for v in formula(*eye))
+
+    rng = np.random.default_rng(0)
+    sample = rng.integers(1, 1000, size=(4, 8)).astype(float)
+    got_num, got_den = formula(*sample)
+    if not (np.allclose(got_num, num @ sample)
+            and np.allclose(got_den, den @ sample)):
+        return None
+    return num, den
+
+
+def _rate(num: np.ndarray, den: np.ndarray, counts: np.ndarray) -> tuple:
+    top, bottom = float(num @ counts), float(den @ counts)
+    return (top / bottom if bottom > 0 else np.nan), bottom
+
+
+def _extreme_rate(num, den, counts, min_den: float, highest: bool):
+    """
+    Highest (or lowest) rate over all sub-multisets of the rows described
+    by counts whose denominator is at least min_den.
+
+    A rate is a weighted average of the per-cell ratios num/den, so the
+    extreme is reached by taking the most extreme cells first, stopping as
+    soon as the denominator reaches min_den.
+    """
+    if np.any((num > 0) & (den == 0)):
+        return np.inf if highest else -np.inf
+
+    cells = [j for j in range(4) if den[j] > 0 and counts[j] > 0]
+    cells.sort(key=lambda j: num[j] / den[j], reverse=highest)
+
+    top = bottom = 0.0
+    for j in cells:
+        if bottom + den[j] * counts[j] >= min_den:
+            take = max(min_den - bottom, 0.0) / den[j]
+            return (top + num[j] * take) / (bottom + den[j] * take)
+        top += num[j] * counts[j]
+        bottom += den[j] * counts[j]
+    return np.nan  # no refinement has enough denominator rows
+
+
+def _score(rate: float, population: float, direction: str) -> float:
+    gap = rate - population
+    if direction == "higher":
+        return gap
+    if direction == "lower":
+        return -gap
+    return abs(gap)
+
+
+def _optimistic(coefs, counts, min_den, population, direction) -> float:
+    """Upper bound on the score of any refinement of a subgroup."""
+    if coefs is None:
+        return np.inf
+    num, den = coefs
+    bounds = []
+    if direction in ("higher", "both"):
+        bounds.append(_extreme_rate(num, den, counts, min_den, True)
+                      - population)
+    if direction in ("lower", "both"):
+        bounds.append(population
+                      - _extreme_rate(num, den, counts, min_den, False))
+    bounds = [b for b in bounds if not np.isnan(b)]
+    return max(bounds) if bounds else -np.inf
+
+
+# ---------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------
+
+def find_subgroups(
+    y_true: Sequence,
+    y_pred: Sequence,
+    features: pd.DataFrame,
+    *,
+    metric: str = "fnr",
+    k: int = 10,
+    max_depth: int = 3,
+    beam_width: int = 20,
+    min_support: Union[int, float] = 0.01,
+    min_denominator: int = 20,
+    n_bins: int = 4,
+    direction: Optional[str] = None,
+) -> SubgroupResult:
+    """
+    Find the k subgroups with the largest rate gap to the population.
+
+    Parameters
+    ----------
+    y_true, y_pred:
+        Binary outcomes (0/1) and predictions.
+    features:
+        One column per attribute to condition on (protected or not),
+        row-aligned with y_true. Numeric columns are binned.
+    metric:
+        Rate to compare (a key of RATE_FORMULAS, e.g. 'fnr', 'fpr', 'acc').
+    k:
+        Number of subgroups to return.
+    max_depth:
+        Maximum number of conditions per subgroup.
+    beam_width:
+        Number of subgroups extended at each depth.
+    min_support:
+        Minimum subgroup size, as a row count (int) or a fraction of the
+        rows (float < 1).
+    min_denominator:
+        Minimum number of rows in the rate's denominator (e.g. positives
+        for FNR), so that reported rates are not noise.
+    n_bins:
+        Number of quantile bins for numeric columns.
+    direction:
+        'higher' (a higher rate is worse), 'lower' or 'both'. Defaults to
+        'higher' for fnr, fpr, for, fdr, 'lower' for acc, tpr, tnr,
+        precision, npv, f1 and 'both' otherwise.
+
+    Returns
+    -------
+    SubgroupResult
+
+    Raises
+    ------
+    ValueError
+        If the metric or direction is unknown, lengths differ, or a
+        parameter is out of range.
+    """
+    if metric not in RATE_FORMULAS:
+        raise ValueError(f"Unknown metric '{metric}'. "
+                         f"Supported: {sorted(RATE_FORMULAS)}")
+    if direction is None:
+        direction = "lower" if metric in _LOWER_IS_WORSE else \
+            "higher" if metric in _HIGHER_IS_WORSE else "both"
+    if direction not in _DIRECTIONS:
+        raise ValueError(f"direction must be one of {_DIRECTIONS}")
+    if k < 1 or max_depth < 1 or beam_width < 1 or n_bins < 1:
+        raise ValueError("k, max_depth, beam_width and n_bins must be >= 1")
+
+    y_true = as_binary_array(y_true, "y_true")
+    y_pred = as_binary_array(y_pred, "y_pred")
+    n_rows = len(y_true)
+    if not (len(y_pred) == n_rows == len(features)):
+        raise ValueError("y_true, y_pred and features must have the same "
+                         "length.")
+
+    min_count = min_support if isinstance(min_support, (int, np.integer)) \
+        else int(np.ceil(min_support * n_rows))
+    min_count = max(min_count, 1)
+    min_den = max(min_denominator, 1)
+
+    coefs = _linear_coefficients(metric)
+    formula = RATE_FORMULAS[metric]
+
+    def rate_of(counts):
+        if coefs is not None:
+            return _rate(*coefs, counts)
+        top, bottom = formula(*counts.astype(float))
+        return (top / bottom if bottom > 0 else np.nan), float(bottom)
+
+    # cells in COUNT_COLUMNS order: tp, fn, tn, fp
+    cells = 2 * y_true + y_pred
+    cell_words = [_pack(cells == code) for code in (3, 2, 1)]  # tp, fn, fp
+
+    def counts_of(words: np.ndarray, n: int) -> np.ndarray:
+        tp, fn, fp = (_popcount(words & w) for w in cell_words)
+        return np.array([tp, fn, n - tp - fn - fp, fp], dtype=float)
+
+    all_words = _pack(np.ones(n_rows, dtype=bool))
+    population, _ = rate_of(counts_of(all_words, n_rows))
+
+    conditions = []
+    for column, description, mask in _conditions(features, n_bins):
+        words = _pack(mask)
+        n = _popcount(words)
+        if n >= min_count:
+            conditions.append((column, description, words, n))
+
+    results: list = []  # min-heap of (score, tiebreak, row)
+    n_evaluated = 0
+    beam = [((), all_words)]
+    seen = set()
+
+    for depth in range(1, max_depth + 1):
+        candidates = []
+        for used, parent_words in beam:
+            used_columns = {conditions[i][0] for i in used}
+            for i, (column, description, words, _) in enumerate(conditions):
+                if column in used_columns:
+                    continue
+                key = frozenset((*used, i))
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                child = parent_words & words
+                n = _popcount(child)
+                n_evaluated += 1
+                if n < min_count:
+                    continue
+                counts = counts_of(child, n)
+                rate, bottom = rate_of(counts)
+                if bottom < min_den:
+                    continue
+
+                score = _score(rate, population, direction)
+                idx = tuple(sorted(key))
+                row = {
+                    "subgroup": " & ".join(conditions[j][1] for j in idx),
+                    "conditions": tuple((conditions[j][0], conditions[j][1])
+                                        for j in idx),
+                    "depth": depth,
+                    "n": n,
+                    "support": n / n_rows,
+                    metric: rate,
+                    "gap": rate - population,
+                    "score": score,
+                    **dict(zip(COUNT_COLUMNS, counts.astype(int).tolist())),
+                }
+                entry = (score, -n_evaluated, row)
+                if len(results) < k:
+                    heapq.heappush(results, entry)
+                elif score > results[0][0]:
+                    heapq.heapreplace(results, entry)
+
+                if depth < max_depth:
+                    bound = _optimistic(coefs, counts, min_den, population,
+                                        direction)
+                    # bitsets are rebuilt for the few survivors below,
+                    # not kept for every candidate
+                    candidates.append((score, bound, idx))
+
+        threshold = results[0][0] if len(results) >= k else -np.inf
+        promising = [c for c in candidates if c[1] > threshold]
+        promising.sort(key=lambda c: c[0], reverse=True)
+        beam = [(idx, np.bitwise_and.reduce(
+                    [all_words, *(conditions[j][2] for j in idx)]))
+                for _, _, idx in promising[:beam_width]]
+        if not beam:
+            break
+
+    rows = [row for _, _, row in sorted(results, key=lambda e: e[:2],
+                                        reverse=True)]
+    columns = ["subgroup", "conditions", "depth", "n", "support", metric,
+               "gap", "score", *COUNT_COLUMNS]
+    return SubgroupResult(
+        subgroups=pd.DataFrame(rows, columns=columns),
+        metric=metric,
+        population_rate=float(population),
+        n_evaluated=n_evaluated,
+    )
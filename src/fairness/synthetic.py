@@ -0,0 +1,446 @@
+"""
+fairness.synthetic
+==================
+
+Synthetic evaluation cohorts with known, injected disparities.
+
+The bundled heart dataset has under a thousand rows, too few to exercise
+scaling behaviour or to check that a metric recovers a disparity of known
+size. This module generates eval DataFrames shaped like the output of
+`fairness.groups.make_eval_df`:
+
+- one column per protected attribute (categorical)
+- subject_label  (intersectional label, e.g. "sex=F|age=older")
+- y_pred, y_true (0/1)
+- y_score        (optional model score consistent with y_pred)
+
+Group sizes, outcome prevalence, each intersection's false negative
+and false positive rates and the spread of its scores are set by a
+`CohortSpec`. Rows are generated in
+vectorized chunks, so `write_cohort_parquet` can stream cohorts of
+hundreds of millions of rows to disk with memory bounded by the chunk
+size.
+
+Typical usage
+-------------
+>>> from fairness.synthetic import CohortSpec, make_cohort
+>>> spec = CohortSpec(n_rows=100_000, cardinalities={"sex": 2, "age": 3},
+...                   fnr_shifts={"sex": {"g1": 0.15}})
+>>> eval_df = make_cohort(spec)
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from typing import Iterator, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+_DEFAULT_CHUNK_SIZE = 1_000_000
+
+
+@dataclass(frozen=True)
+class CohortSpec:
+    """
+    Description of a synthetic cohort.
+
+    Attributes
+    ----------
+    n_rows:
+        Number of rows.
+    cardinalities:
+        Mapping from protected attribute name to its number of levels.
+        Levels are named "g0", "g1", ... unless given in levels.
+    levels:
+        Optional mapping from attribute name to level names, overriding
+        the default names.
+    imbalance:
+        Skew of group sizes. Level k of every attribute is drawn with
+        probability proportional to (k + 1) ** -imbalance, so 0 gives
+        equal-sized groups and larger values make later levels rarer.
+    prevalence:
+        Probability that y_true = 1.
+    base_fnr, base_fpr:
+        False negative and false positive rates before any shift.
+    fnr_shifts, fpr_shifts:
+        Additive shifts per attribute level, e.g.
+        {"sex": {"g1": 0.1}} raises the FNR of every sex=g1 row by 0.1.
+        The rate of an intersection is the base plus the shifts of its
+        levels, clipped to [0, 1].
+    intersection_shifts:
+        Extra (fnr_shift, fpr_shift) for specific intersections, keyed by
+        a tuple of levels in attribute order. Use this to inject a
+        disparity that only appears at an intersection.
+    score_separation:
+        Shape of y_score: scores of predicted positives are drawn from
+        0.5 + 0.5 * Beta(score_separation, 1) and predicted negatives
+        mirror this below 0.5, so 1 gives uniform scores and larger values
+        push scores towards 0 and 1. Thresholding y_score at 0.5 gives
+        y_pred.
+    score_shifts:
+        Additive shifts of score_separation per attribute level, in the
+        same form as fnr_shifts. The separation of an intersection is
+        score_separation plus the shifts of its levels and must stay > 0.
+    include_scores:
+        Whether to add the y_score column.
+    sep, kv_sep:
+        Separators of subject_label, as in make_intersectional_labels.
+    seed:
+        Seed of the random generator.
+    """
+
+    n_rows: int
+    cardinalities: Mapping[str, int] = field(
+        default_factory=lambda: {"attr0": 2, "attr1": 3})
+    levels: Optional[Mapping[str, Sequence[str]]] = None
+    imbalance: float = 0.0
+    prevalence: float = 0.3
+    base_fnr: float = 0.1
+    base_fpr: float = 0.1
+    fnr_shifts: Mapping[str, Mapping[str, float]] = field(
+        default_factory=dict)
+    fpr_shifts: Mapping[str, Mapping[str, float]] = field(
+        default_factory=dict)
+    intersection_shifts: Mapping[tuple, tuple] = field(default_factory=dict)
+    score_separation: float = 4.0
+    score_shifts: Mapping[str, Mapping[str, float]] = field(
+        default_factory=dict)
+    include_scores: bool = True
+    sep: str = "|"
+    kv_sep: str = "="
+    seed: int = 0
+
+    def __post_init__(self):
+        if self.n_rows < 0:
+            raise ValueError("n_rows must be >= 0")
+        if not self.cardinalities:
+            raise ValueError("cardinalities must name at least one "
+                             "protected attribute")
+        if any(int(k) < 1 for k in self.cardinalities.values()):
+            raise ValueError("every cardinality must be >= 1")
+        for name, value in (("prevalence", self.prevalence),
+                            ("base_fnr", self.base_fnr),
+                            ("base_fpr", self.base_fpr)):
+            if not 0 <= value <= 1:
+                raise ValueError(f"{name} must be in [0, 1]")
+        if self.imbalance < 0:
+            raise ValueError("imbalance must be >= 0")
+        if self.score_separation <= 0:
+            raise ValueError("score_separation must be > 0")
+
+        for name, names in self.attribute_levels().items():
+            if len(names) != int(self.cardinalities[name]):
+                raise ValueError(f"levels['{name}'] must have "
+                                 f"{self.cardinalities[name]} names")
+        for shifts in (self.fnr_shifts, self.fpr_shifts, self.score_shifts):
+            for attribute, by_level in shifts.items():
+                if attribute not in self.cardinalities:
+                    raise ValueError(f"Unknown attribute '{attribute}' in "
+                                     "shifts")
+                unknown = set(by_level) - set(
+                    self.attribute_levels()[attribute])
+                if unknown:
+                    raise ValueError(f"Unknown levels {sorted(unknown)} for "
+                                     f"'{attribute}'")
+
+        levels = self.attribute_levels()
+        for combo, shift in self.intersection_shifts.items():
+            if not isinstance(combo, tuple) or \
+                    len(combo) != len(self.cardinalities):
+                raise ValueError(
+                    f"intersection_shifts key {combo!r} must be a tuple of "
+                    f"{len(self.cardinalities)} levels, one per attribute "
+                    f"in the order {self.attributes}")
+            for attribute, level in zip(self.attributes, combo):
+                if level not in levels[attribute]:
+                    raise ValueError(
+                        f"Unknown level {level!r} for '{attribute}' in "
+                        f"intersection_shifts key {combo!r}")
+            if not isinstance(shift, tuple) or len(shift) != 2:
+                raise ValueError(
+                    f"intersection_shifts[{combo!r}] must be a "
+                    "(fnr_shift, fpr_shift) tuple")
+
+        if (_score_table(self) <= 0).any():
+            raise ValueError("score_separation plus score_shifts must be "
+                             "> 0 for every intersection")
+
+    @property
+    def attributes(self) -> list:
+        return list(self.cardinalities)
+
+    def attribute_levels(self) -> dict:
+        """Level names of every attribute."""
+        custom = self.levels or {}
+        return {
+            name: list(custom.get(name,
+                                  [f"g{k}" for k in range(int(card))]))
+            for name, card in self.cardinalities.items()
+        }
+
+    def level_probabilities(self) -> dict:
+        """Sampling probabilities of the levels of every attribute."""
+        probs = {}
+        for name, card in self.cardinalities.items():
+            weights = np.arange(1, int(card) + 1, dtype=float) \
+                ** -self.imbalance
+            probs[name] = weights / weights.sum()
+        return probs
+
+
+def _shape(spec: CohortSpec) -> tuple:
+    return tuple(int(spec.cardinalities[a]) for a in spec.attributes)
+
+
+def _shifted_table(spec: CohortSpec, base: float,
+                   shifts: Mapping[str, Mapping[str, float]]) -> np.ndarray:
+    """base plus the level shifts of every intersection, of shape _shape."""
+    shape = _shape(spec)
+    levels = spec.attribute_levels()
+    table = np.full(shape, base, dtype=float)
+
+    for axis, attribute in enumerate(spec.attributes):
+        by_level = shifts.get(attribute, {})
+        delta = np.array([by_level.get(level, 0.0)
+                          for level in levels[attribute]])
+        view = [1] * len(shape)
+        view[axis] = len(delta)
+        table += delta.reshape(view)
+
+    return table
+
+
+def _rate_tables(spec: CohortSpec) -> tuple[np.ndarray, np.ndarray]:
+    """FNR and FPR of every intersection, as arrays of shape _shape."""
+    levels = spec.attribute_levels()
+    fnr = _shifted_table(spec, spec.base_fnr, spec.fnr_shifts)
+    fpr = _shifted_table(spec, spec.base_fpr, spec.fpr_shifts)
+
+    for combo, (d_fnr, d_fpr) in spec.intersection_shifts.items():
+        index = tuple(levels[a].index(level)
+                      for a, level in zip(spec.attributes, combo))
+        fnr[index] += d_fnr
+        fpr[index] += d_fpr
+
+    return np.clip(fnr, 0, 1), np.clip(fpr, 0, 1)
+
+
+def _score_table(spec: CohortSpec) -> np.ndarray:
+    """score_separation of every intersection, of shape _shape."""
+    return _shifted_table(spec, spec.score_separation, spec.score_shifts)
+
+
+def _label_table(spec: CohortSpec) -> list:
+    """subject_label of every intersection, in flat (C) order."""
+    levels = spec.attribute_levels()
+    labels = [""]
+    for i, attribute in enumerate(spec.attributes):
+        prefix = spec.sep if i else ""
+        labels = [f"{label}{prefix}{attribute}{spec.kv_sep}{level}"
+                  for label in labels for level in levels[attribute]]
+    return labels
+
+
+def _observed_labels(flat: np.ndarray, labels: pd.Index) -> pd.Categorical:
+    """
+    subject_label column from flat intersection codes, with only the
+    intersections that occur as categories (in label table order).
+    """
+    observed, codes = np.unique(flat, return_inverse=True)
+    return pd.Categorical.from_codes(codes, categories=labels[observed])
+
+
+def expected_rates(spec: CohortSpec) -> pd.DataFrame:
+    """
+    Injected rates and expected size share of every intersection.
+
+    Returns
+    -------
+    pd.DataFrame
+        Indexed by subject_label, with one column per attribute and the
+        columns share, fnr, fpr and score_separation. Observed rates in a generated cohort
+        converge to these as groups grow.
+    """
+    shape = _shape(spec)
+    levels = spec.attribute_levels()
+    probs = spec.level_probabilities()
+    fnr, fpr = _rate_tables(spec)
+
+    share = np.ones(shape)
+    for axis, attribute in enumerate(spec.attributes):
+        view = [1] * len(shape)
+        view[axis] = shape[axis]
+        share = share * probs[attribute].reshape(view)
+
+    index = np.indices(shape).reshape(len(shape), -1)
+    frame = pd.DataFrame(
+        {attribute: np.asarray(levels[attribute], dtype=object)[index[axis]]
+         for axis, attribute in enumerate(spec.attributes)},
+        index=pd.Index(_label_table(spec), name="subject_label"),
+    )
+    frame["share"] = share.ravel()
+    frame["fnr"] = fnr.ravel()
+    frame["fpr"] = fpr.ravel()
+    frame["score_separation"] = _score_table(spec).ravel()
+    return frame
+
+
+def _generate_chunk(spec: CohortSpec, rng: np.random.Generator, start: int,
+                    n: int, fnr: np.ndarray, fpr: np.ndarray,
+                    separation: np.ndarray,
+                    labels: pd.Index) -> pd.DataFrame:
+    shape = _shape(spec)
+    probs = spec.level_probabilities()
+    levels = spec.attribute_levels()
+
+    codes = [rng.choice(len(probs[a]), size=n, p=probs[a])
+             for a in spec.attributes]
+    flat = np.ravel_multi_index(codes, shape) if n else \
+        np.zeros(0, dtype=np.intp)
+
+    y_true = (rng.random(n) < spec.prevalence).astype(np.int8)
+    u = rng.random(n)
+    # positives are missed with the group's FNR, negatives flagged with
+    # its FPR
+    y_pred = np.where(y_true == 1, u >= fnr.ravel()[flat],
+                      u < fpr.ravel()[flat]).astype(np.int8)
+
+    columns = {
+        a: pd.Categorical.from_codes(c, categories=levels[a])
+        for a, c in zip(spec.attributes, codes)
+    }
+    columns["subject_label"] = _observed_labels(flat, labels)
+    columns["y_pred"] = y_pred
+    columns["y_true"] = y_true
+
+    if spec.include_scores:
+        distance = 0.5 * rng.beta(separation.ravel()[flat], 1.0, size=n)
+        columns["y_score"] = np.where(y_pred == 1, 0.5 + distance,
+                                      0.5 - distance)
+
+    return pd.DataFrame(columns, index=pd.RangeIndex(start, start + n))
+
+
+def iter_cohort(spec: CohortSpec, *,
+                chunk_size: int = _DEFAULT_CHUNK_SIZE
+                ) -> Iterator[pd.DataFrame]:
+    """
+    Generate the cohort as a sequence of DataFrames.
+
+    Each chunk has at most chunk_size rows and a RangeIndex continuing from
+    the previous chunk. subject_label is categorical with only the
+    intersections present in the chunk as categories. Chunk k uses its own generator spawned from
+    spec.seed, so the output is reproducible for a given
+    (seed, chunk_size).
+
+    Parameters
+    ----------
+    spec:
+        Cohort description.
+    chunk_size:
+        Rows per chunk.
+
+    Yields
+    ------
+    pd.DataFrame
+        Columns: the protected attributes, subject_label, y_pred, y_true
+        and (if spec.include_scores) y_score.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+
+    fnr, fpr = _rate_tables(spec)
+    separation = _score_table(spec)
+    labels = pd.Index(_label_table(spec))
+    n_chunks = max(1, -(-spec.n_rows // chunk_size))
+    seeds = np.random.SeedSequence(spec.seed).spawn(n_chunks)
+
+    for k, seed in enumerate(seeds):
+        start = k * chunk_size
+        n = min(chunk_size, spec.n_rows - start)
+        yield _generate_chunk(spec, np.random.default_rng(seed), start, n,
+                              fnr, fpr, separation, labels)
+
+
+def make_cohort(spec: CohortSpec, *,
+                chunk_size: int = _DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+    """
+    Generate the whole cohort in memory.
+
+    Equivalent to concatenating iter_cohort(spec, chunk_size=chunk_size),
+    except that subject_label stays categorical with the intersections
+    observed anywhere in the cohort as categories.
+    """
+    cohort = pd.concat(
+        [chunk.drop(columns="subject_label")
+         for chunk in iter_cohort(spec, chunk_size=chunk_size)])
+    codes = [cohort[a].cat.codes.to_numpy() for a in spec.attributes]
+    flat = np.ravel_multi_index(codes, _shape(spec)) if len(cohort) else \
+        np.zeros(0, dtype=np.intp)
+    cohort.insert(len(spec.attributes), "subject_label",
+                  _observed_labels(flat, pd.Index(_label_table(spec))))
+    return cohort
+
+
+def write_cohort_parquet(
+    spec: CohortSpec,
+    path: Union[str, os.PathLike],
+    *,
+    chunk_size: int = _DEFAULT_CHUNK_SIZE,
+    compression: str = "snappy",
+) -> int:
+    """
+    Stream the cohort to a Parquet file, one row group per chunk.
+
+    Only one chunk is held in memory at a time. Requires pyarrow.
+
+    Parameters
+    ----------
+    spec:
+        Cohort description.
+    path:
+        Output file.
+    chunk_size:
+        Rows per chunk (and per Parquet row group).
+    compression:
+        Parquet compression codec.
+
+    Returns
+    -------
+    int
+        Number of rows written.
+
+    Raises
+    ------
+    ImportError
+        If pyarrow is not installed.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ImportError(
+            "write_cohort_parquet requires pyarrow "
+            "(pip install pyarrow)."
+        ) from exc
+
+    n_written = 0
+    writer = None
+    try:
+        for chunk in iter_cohort(spec, chunk_size=chunk_size):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(str(path), table.schema,
+                                          compression=compression)
+            else:
+                # subject_label categories differ between chunks, which can
+                # change the width of its dictionary indices
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            n_written += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_written
@@ -0,0 +1,593 @@
+"""
+fairness.utils.cache
+====================
+
+Content-addressed memoization of pipeline stages.
+
+`run_demo_pipeline` and friends recompute every data stage on each call:
+read the CSV, apply the fairness transforms, preprocess and split. When
+only the model changes these results are identical, so a `StageCache` can
+hold them:
+
+- the load stage is keyed by a hash of the file contents (or the URL)
+- every later stage is keyed by the key of its input stage plus the
+  identity of the work it does (transform code, closure and global values,
+  drop columns, split parameters, ...)
+
+Equal keys therefore mean equal inputs and equal work. Results live in an
+in-memory LRU and, if a directory is given, in pickle files on disk whose
+total size is bounded by evicting the least recently used files.
+
+Cached DataFrames are shared between runs; like the pipeline itself,
+treat them as read-only.
+
+The same store backs a result cache for the public functions of
+`fairness.metrics` and `fairness.single_metrics`. While a cache is set with
+`cached_results()` (or `set_result_cache()`), each call is keyed by the
+function, the package version and a content hash of every argument
+(`array_token` for labels, predictions and truths; repr for scalars such as
+group labels or natural_log), so re-auditing the same (model, cohort) pair
+returns the stored result without touching the data again. Only the
+outermost metric call is cached: the all_intersect_* call made inside a
+max_intersect_* call is not hashed a second time.
+
+Typical usage
+-------------
+>>> from fairness.utils.cache import StageCache
+>>> from fairness.utils.pipeline import run_demo_pipeline
+>>> cache = StageCache(directory=".fairness_cache")
+>>> first = run_demo_pipeline(..., cache=cache)
+>>> second = run_demo_pipeline(..., model=other_model, cache=cache)
+>>> cache.stats
+{'hits': 4, 'misses': 4}
+
+>>> from fairness import metrics
+>>> from fairness.utils.cache import cached_results
+>>> with cached_results(StageCache(directory=".metric_cache")):
+...     metrics.all_intersect_fnrs(labels_dict, y_pred, y_true)
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+import types
+import urllib.parse
+from collections import OrderedDict
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+import numpy as np
+
+import fairness
+from fairness.arrays import EvalArrays
+
+_HASH_CHUNK = 1 << 20
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def file_token(path: Union[str, os.PathLike]) -> str:
+    """
+    Content hash of a local file, or the URL itself for remote paths.
+
+    Parameters
+    ----------
+    path:
+        Local path or HTTP(S) URL.
+
+    Returns
+    -------
+    str
+        Hex digest of the file bytes, or "url:<path>" for URLs.
+    """
+    path_str = str(path)
+    if urllib.parse.urlparse(path_str).scheme in {"http", "https"}:
+        return f"url:{path_str}"
+
+    h = hashlib.blake2b(digest_size=16)
+    with open(path_str, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _code_token(code: types.CodeType) -> tuple:
+    consts = tuple(_code_token(c) if isinstance(c, types.CodeType)
+                   else repr(c) for c in code.co_consts)
+    return (code.co_name, _digest(code.co_code), consts, code.co_names)
+
+
+def _value_token(value: Any) -> Optional[str]:
+    if value is None or isinstance(value, (bool, int, float, complex, str,
+                                           bytes)):
+        return repr(value)
+    if callable(value) and not isinstance(value, type):
+        token = callable_token(value)
+        return None if token is None else repr(token)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_value_token(v) for v in value]
+        if None in items:
+            return None
+        if isinstance(value, (set, frozenset)):
+            items.sort()
+        return repr((type(value).__name__, tuple(items)))
+    if isinstance(value, Mapping):
+        items = [(_value_token(k), _value_token(v)) for k, v in value.items()]
+        if any(k is None or v is None for k, v in items):
+            return None
+        return repr(("mapping", tuple(sorted(items))))
+    if isinstance(value, np.ndarray) or hasattr(value, "__array__"):
+        # arrays, Series and DataFrames have truncated reprs
+        try:
+            token = _arg_token(value)
+        except (TypeError, ValueError, pickle.PicklingError):
+            return None
+        return None if token is None else repr(token)
+    text = repr(value)
+    # default object reprs contain the memory address, which says nothing
+    # about the contents, and "..." marks a truncated repr
+    return None if " at 0x" in text or "..." in text else text
+
+
+def _global_names(code: types.CodeType) -> set:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _global_names(const)
+    return names
+
+
+def callable_token(fn: Callable) -> Optional[tuple]:
+    """
+    Identity of a transform: its code plus the values it depends on.
+
+    Handles plain functions (including lambdas and closures such as those
+    built by age_group_transform), functools.partial and dataclass
+    callables such as ColumnTransform. Defaults, closure cells and the
+    module-level values the code reads (constants such as thresholds) are
+    part of the token; arrays and frames among them are hashed by content.
+
+    Only fn's own code is hashed, not the module-level helpers it calls;
+    clear the disk tier after editing such helpers.
+
+    Returns
+    -------
+    tuple or None
+        A hashable token, or None if fn cannot be identified by content
+        (then the stage is not cached).
+    """
+    if isinstance(fn, functools.partial):
+        func = callable_token(fn.func)
+        args = [_value_token(a) for a in fn.args]
+        kwargs = [(k, _value_token(v))
+                  for k, v in sorted(fn.keywords.items())]
+        if func is None or None in args or \
+                any(v is None for _, v in kwargs):
+            return None
+        return ("partial", func, tuple(args), tuple(kwargs))
+
+    if isinstance(fn, types.FunctionType):
+        parts = [_value_token(d) for d in fn.__defaults__ or ()]
+        parts += [_value_token(v)
+                  for _, v in sorted((fn.__kwdefaults__ or {}).items())]
+        parts += [_value_token(cell.cell_contents)
+                  for cell in fn.__closure__ or ()]
+        for name in sorted(_global_names(fn.__code__)):
+            if name not in fn.__globals__:
+                continue  # builtin or attribute name
+            value = fn.__globals__[name]
+            if isinstance(value, types.ModuleType) or callable(value):
+                continue
+            token = _value_token(value)
+            if token is None:
+                return None
+            parts.append((name, token))
+        if any(p is None for p in parts):
+            return None
+        return (fn.__module__, fn.__qualname__, _code_token(fn.__code__),
+                tuple(parts))
+
+    if hasattr(fn, "__dataclass_fields__"):
+        parts = []
+        for name in fn.__dataclass_fields__:
+            token = _value_token(getattr(fn, name))
+            if token is None:
+                return None
+            parts.append((name, token))
+        return (type(fn).__module__, type(fn).__qualname__, tuple(parts))
+
+    return None
+
+
+class StageCache:
+    """
+    In-memory LRU plus optional size-bounded disk store for stage results.
+
+    Parameters
+    ----------
+    max_items:
+        Maximum number of results kept in memory (least recently used
+        results are dropped first). 0 disables the memory tier.
+    directory:
+        Optional directory for the disk tier. Results are pickled there and
+        survive across processes.
+    max_disk_bytes:
+        Upper bound on the total size of the disk tier. After each write,
+        least recently used files are deleted until the bound holds.
+
+    Attributes
+    ----------
+    stats:
+        Dictionary with 'hits' and 'misses' counters.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 32,
+        *,
+        directory: Optional[Union[str, os.PathLike]] = None,
+        max_disk_bytes: int = 1 << 30,
+    ):
+        if max_items < 0:
+            raise ValueError("max_items must be >= 0")
+        if max_disk_bytes <= 0:
+            raise ValueError("max_disk_bytes must be > 0")
+
+        self.max_items = max_items
+        self.directory = Path(directory) if directory is not None else None
+        self.max_disk_bytes = max_disk_bytes
+        self.stats = {"hits": 0, "misses": 0}
+        self._memory: OrderedDict = OrderedDict()
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(stage: str, *parts: Any) -> Optional[str]:
+        """
+        Build a stage key from its parts.
+
+        Returns None if any part is None (an upstream stage or transform
+        that cannot be keyed), so nothing downstream of it is cached.
+        """
+        if any(p is None for p in parts):
+            return None
+        return _digest(repr((stage, parts)).encode())
+
+    def get_or_compute(self, key: Optional[str],
+                       compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached result for key, computing and storing it if
+        missing. A None key always computes and stores nothing.
+        """
+        if key is None:
+            return compute()
+
+        found, value = self._lookup(key)
+        if found:
+            self.stats["hits"] += 1
+            return value
+
+        self.stats["misses"] += 1
+        value = compute()
+        self._store(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Remove every result from memory and disk."""
+        self._memory.clear()
+        for path in self._disk_files():
+            path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    # -----------------------------------------------------------------
+    # Tiers
+    # -----------------------------------------------------------------
+
+    def _lookup(self, key: str) -> tuple:
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return True, self._memory[key]
+
+        if self.directory is not None:
+            path = self.directory / f"{key}.pkl"
+            try:
+                with open(path, "rb") as f:
+                    value = pickle.load(f)
+            except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+                return False, None
+            os.utime(path)  # mark as recently used
+            self._remember(key, value)
+            return True, value
+
+        return False, None
+
+    def _store(self, key: str, value: Any) -> None:
+        self._remember(key, value)
+        if self.directory is None:
+            return
+
+        path = self.directory / f"{key}.pkl"
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self._evict_disk()
+
+    def _remember(self, key: str, value: Any) -> None:
+        if self.max_items == 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _disk_files(self) -> list:
+        if self.directory is None:
+            return []
+        return list(self.directory.glob("*.pkl"))
+
+    def _evict_disk(self) -> None:
+        files = []
+        for path in self._disk_files():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda t: t[0]):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+# ---------------------------------------------------------------------
+# Metric result cache
+# ---------------------------------------------------------------------
+
+# Cache consulted by the metric functions, or None when disabled.
+_RESULT_CACHE: Optional[StageCache] = None
+
+# dtype kinds whose raw bytes identify the values (bool, numbers, fixed
+# width strings, datetimes)
+_BYTES_KINDS = set("biufcUSmM")
+
+
+class _CallState(threading.local):
+    # True while a cached call computes, so nested calls are not cached
+    active = False
+
+
+_CALL_STATE = _CallState()
+
+
+def array_token(values: Any) -> str:
+    """
+    Content hash of a sequence of labels or outcomes.
+
+    NumPy arrays, Series with a fixed-width dtype and lists or tuples whose
+    elements all share one type are hashed from their raw bytes.
+    Everything else (mixed-type sequences, object arrays, categorical
+    Series) is read as Python objects, never coerced to a common dtype,
+    then factorized and hashed from the integer codes, the type of every
+    element and the type-tagged unique values, so 1, 1.0, True and "1"
+    remain distinct.
+
+    Parameters
+    ----------
+    values:
+        List, tuple, NumPy array or pandas Series/Categorical.
+
+    Returns
+    -------
+    str
+        Hex digest including dtype and shape.
+    """
+    if isinstance(values, np.ndarray) or \
+            (hasattr(values, "dtype") and hasattr(values, "__array__")):
+        array = np.asarray(values)
+    else:
+        # np.asarray would turn [1, "x"] into the unicode array ["1", "x"]
+        if len(set(map(type, values))) > 1:
+            array = np.fromiter(values, dtype=object, count=len(values))
+        else:
+            array = np.asarray(values)
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{array.dtype.str}{array.shape}".encode())
+    if array.dtype.kind in _BYTES_KINDS:
+        h.update(np.ascontiguousarray(array).tobytes())
+    else:
+        import pandas as pd
+
+        flat = array.ravel()
+        # factorize merges equal values of different types (1, 1.0, True)
+        codes, uniques = pd.factorize(flat)
+        type_codes, types_ = pd.factorize(
+            np.fromiter(map(type, flat), dtype=object, count=len(flat)))
+        h.update(codes.tobytes())
+        h.update(type_codes.tobytes())
+        h.update(pickle.dumps(
+            ([t.__qualname__ for t in types_],
+             [(type(u).__qualname__, u) for u in uniques]),
+            protocol=4))
+    return h.hexdigest()
+
+
+def _eval_arrays_token(arrays: EvalArrays) -> str:
+    # EvalArrays and its arrays are read-only, so the token is computed
+    # once per instance
+    token = vars(arrays).get("_content_token")
+    if token is None:
+        parts = [array_token(arrays.y_true), array_token(arrays.y_pred)]
+        if arrays.subject_labels is not None:
+            parts.append(array_token(arrays.subject_labels))
+        for category, labels in (arrays.subject_labels_dict or {}).items():
+            parts.append((category, array_token(labels)))
+        token = _digest(repr(parts).encode())
+        object.__setattr__(arrays, "_content_token", token)
+    return token
+
+
+def _arg_token(value: Any) -> Optional[Any]:
+    """Token of one metric argument, or None if it cannot be hashed."""
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        return repr(value)
+    if isinstance(value, tuple) and not value:
+        return "()"
+    if isinstance(value, EvalArrays):
+        return ("EvalArrays", _eval_arrays_token(value))
+    if isinstance(value, Mapping):
+        items = []
+        for key in sorted(value, key=repr):
+            token = _arg_token(value[key])
+            if token is None:
+                return None
+            items.append((repr(key), token))
+        return ("mapping", tuple(items))
+    if hasattr(value, "columns") and hasattr(value, "dtypes"):
+        # DataFrame: one token per column
+        return ("frame", tuple((repr(c), array_token(value[c]))
+                               for c in value.columns))
+    if isinstance(value, (list, tuple, np.ndarray)) or \
+            hasattr(value, "__array__"):
+        return array_token(value)
+    return None
+
+
+def _result_key(fn: Callable, signature: inspect.Signature, args: tuple,
+                kwargs: dict) -> Optional[str]:
+    try:
+        bound = signature.bind(*args, **kwargs)
+    except TypeError:
+        return None  # let the call itself raise
+    bound.apply_defaults()
+
+    parts = []
+    for name, value in bound.arguments.items():
+        token = _arg_token(value)
+        if token is None:
+            return None
+        parts.append((name, token))
+    return StageCache.key("result", fairness.__version__, fn.__module__,
+                          fn.__qualname__, tuple(parts))
+
+
+def _fresh(value: Any) -> Any:
+    # callers may mutate returned dicts or frames; keep the stored one
+    return value.copy() if hasattr(value, "copy") else value
+
+
+def set_result_cache(cache: Optional[StageCache]) -> Optional[StageCache]:
+    """
+    Set the cache used by the metric functions for this process.
+
+    Parameters
+    ----------
+    cache:
+        A StageCache, or None to disable result caching.
+
+    Returns
+    -------
+    StageCache or None
+        The previously set cache.
+    """
+    global _RESULT_CACHE
+
+    previous, _RESULT_CACHE = _RESULT_CACHE, cache
+    return previous
+
+
+class cached_results:
+    """
+    Context manager caching metric results for its block.
+
+    Parameters
+    ----------
+    cache:
+        StageCache to use. Defaults to an in-memory cache of 256 results.
+
+    Yields
+    ------
+    StageCache
+        The cache in use (see its stats for hits and misses).
+
+    Notes
+    -----
+    StageCache is not thread-safe; do not share one between threads that
+    compute metrics concurrently.
+    """
+
+    def __init__(self, cache: Optional[StageCache] = None):
+        self.cache = cache if cache is not None else StageCache(256)
+        self._previous = None
+
+    def __enter__(self) -> StageCache:
+        self._previous = set_result_cache(self.cache)
+        return self.cache
+
+    def __exit__(self, *exc) -> bool:
+        set_result_cache(self._previous)
+        return False
+
+
+def cache_result(fn: Callable) -> Callable:
+    """
+    Decorator looking up fn's results in the result cache, if one is set.
+
+    Calls whose arguments cannot be hashed (e.g. arbitrary objects) and
+    calls made while another cached call is computing go straight to fn.
+    """
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        cache = _RESULT_CACHE
+        if cache is None or _CALL_STATE.active:
+            return fn(*args, **kwargs)
+
+        key = _result_key(fn, signature, args, kwargs)
+        if key is None:
+            return fn(*args, **kwargs)
+
+        _CALL_STATE.active = True
+        try:
+            value = cache.get_or_compute(key, lambda: fn(*args, **kwargs))
+        finally:
+            _CALL_STATE.active = False
+        return _fresh(value)
+
+    wrapper.__result_cached__ = True
+    return wrapper
+
+
+def cache_module(namespace: dict) -> None:
+    """
+    Wrap every public function defined in a module with cache_result.
+
+    Call at the end of a module as cache_module(globals()); see
+    fairness.profiling.instrument_module for which names are wrapped.
+    """
+    module = namespace["__name__"]
+    for attr, value in list(namespace.items()):
+        if attr.startswith("_") or not callable(value) \
+                or isinstance(value, type):
+            continue
+        if getattr(value, "__module__", None) != module:
+            continue
+        if getattr(value, "__result_cached__", False):
+            continue
+        namespace[attr] = cache_result(value)
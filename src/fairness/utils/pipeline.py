@@ -13,19 +13,32 @@ It exists to help quickly:
 5) train a simple classifier to produce y_pred
 6) build eval_df aligned to the test set (subject_label, y_pred, y_true)
 
+`cross_validate_fairness` runs the same data stages once and replaces the
+single split with repeated stratified K-fold, giving a mean and spread for
+every intersectional rate instead of one noisy test-set estimate.
+`run_model_comparison` prepares and splits the data once and fits several
+models on it, returning one fairness comparison table; `run_param_sweep`
+uses it to evaluate a hyperparameter grid and mark the fairness-accuracy
+Pareto front.
+
 The fairness toolkit remains model-agnostic; any model can be used externally.
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Callable, Optional, Sequence
+from typing import Any, Callable, Mapping, Optional, Sequence, Union
 
+import numpy as np
 import pandas as pd
 
+from fairness.arrays import RATE_FORMULAS, IncrementalCounts
 from fairness.data import load_csv
+from fairness import profiling
 from fairness.groups import make_eval_df
-from fairness.preprocess import SplitData, apply_transforms, make_train_test_split, preprocess_tabular
+from fairness.rates import disparity_table
+from fairness.preprocess import SparseFeatures, SplitData, SplitIndices, apply_transforms, make_train_test_split, preprocess_tabular
+from fairness.utils.cache import StageCache, callable_token, file_token
 
 
 @dataclass(frozen=True)
@@ -41,27 +54,248 @@ class PipelineResult:
         DataFrame after fairness-oriented transforms (e.g., age binning).
         This retains protected columns used to build group labels.
     df_model:
-        Model-ready numeric DataFrame (after one-hot encoding etc.).
+        Model-ready numeric DataFrame (after one-hot encoding etc.), or
+        SparseFeatures when the pipeline ran with sparse=True.
     split:
-        Train/test split container with X_train, X_test, y_train, y_test.
+        Train/test split container with X_train, X_test, y_train, y_test
+        (a SplitIndices, whose X_* properties are built on access, when
+        the pipeline ran with index_split=True or batch_size).
     model:
         Fitted model object (e.g., scikit-learn estimator).
     y_pred:
         Predictions for X_test (aligned with split.X_test and split.y_test).
     eval_df:
         Tidy evaluation DataFrame aligned row-by-row with the test set:
-        columns: subject_label, y_pred, y_true.
+        columns: subject_label, y_pred, y_true. None when the pipeline ran
+        with build_eval_df=False.
+    counts:
+        Intersectional confusion counts of the test set accumulated batch
+        by batch, when the pipeline ran with batch_size or
+        build_eval_df=False; otherwise None.
     """
 
     df_raw: pd.DataFrame
     df_fair: pd.DataFrame
-    df_model: pd.DataFrame
-    split: SplitData
+    df_model: Union[pd.DataFrame, SparseFeatures]
+    split: Union[SplitData, SplitIndices]
     model: Any
     y_pred: Any
-    eval_df: pd.DataFrame
+    eval_df: Optional[pd.DataFrame]
+    counts: Optional[IncrementalCounts] = None
+
+
+class LeanPipelineResult:
+    """
+    Outputs from the demo pipeline without the intermediate frames.
+
+    Returned by run_demo_pipeline(lean=True). Only df_fair (needed for
+    group labels), the split row positions, the model, y_pred and eval_df
+    are kept. The dropped outputs are rebuilt on request by load_raw(),
+    build_model_frame() and build_split() (from the StageCache if one was
+    used) and are not retained afterwards.
+
+    Attributes
+    ----------
+    df_fair, model, y_pred, eval_df, counts:
+        As in PipelineResult.
+    train_pos, test_pos:
+        Integer row positions of the training and test rows.
+    csv_path:
+        File the pipeline read.
+    source_token:
+        file_token(csv_path) when the pipeline ran; load_raw() refuses to
+        return the file if its contents have changed since.
+    """
+
+    def __init__(self, *, df_fair, model, y_pred, eval_df, train_pos,
+                 test_pos, csv_path, source_token, target_col, index_split,
+                 drop_from_X, sparse, cache=None, fair_key=None,
+                 counts=None):
+        self.df_fair = df_fair
+        self.model = model
+        self.y_pred = y_pred
+        self.eval_df = eval_df
+        self.counts = counts
+        self.train_pos = train_pos
+        self.test_pos = test_pos
+        self.csv_path = csv_path
+        self.source_token = source_token
+        self._target_col = target_col
+        self._index_split = index_split
+        self._drop_from_X = tuple(drop_from_X)
+        self._sparse = sparse
+        self._cache = cache
+        self._fair_key = fair_key
+
+    def load_raw(self) -> pd.DataFrame:
+        """
+        Re-read the raw DataFrame.
+
+        Raises
+        ------
+        FileNotFoundError
+            If csv_path no longer exists (and the load is not cached).
+        ValueError
+            If the file contents differ from those the pipeline read.
+        """
+        cache = self._cache
+        key = None if cache is None else cache.key("load", self.source_token)
+        return (cache or StageCache(max_items=0)).get_or_compute(
+            key, self._read_source)
+
+    def _read_source(self) -> pd.DataFrame:
+        if not self.source_token.startswith("url:"):
+            try:
+                token = file_token(self.csv_path)
+            except FileNotFoundError:
+                raise FileNotFoundError(
+                    f"{self.csv_path} was moved or deleted after the "
+                    "pipeline ran; df_raw cannot be rebuilt") from None
+            if token != self.source_token:
+                raise ValueError(
+                    f"{self.csv_path} has changed since the pipeline ran; "
+                    "df_raw would not match df_fair and y_pred")
+        return load_csv(self.csv_path)
+
+    def build_model_frame(self) -> Union[pd.DataFrame, SparseFeatures]:
+        """Re-run preprocess_tabular on df_fair."""
+        def compute():
+            return preprocess_tabular(self.df_fair,
+                                      drop_cols=list(self._drop_from_X),
+                                      sparse=self._sparse)
+        cache = self._cache
+        if cache is None:
+            return compute()
+        return cache.get_or_compute(
+            cache.key("preprocess", self._fair_key, self._drop_from_X,
+                      self._sparse),
+            compute)
+
+    def build_split(self) -> Union[SplitData, SplitIndices]:
+        """Rebuild the train/test split from the stored row positions."""
+        data = self.build_model_frame()
+        split = SplitIndices(
+            data=data,
+            feature_cols=[c for c in data.columns if c != self._target_col],
+            target_col=self._target_col,
+            train_pos=self.train_pos,
+            test_pos=self.test_pos,
+        )
+        if self._index_split:
+            return split
+        return SplitData(X_train=split.X_train, X_test=split.X_test,
+                         y_train=split.y_train, y_test=split.y_test)
+
+    def __repr__(self) -> str:
+        return (f"{type(self).__name__}(n_train={len(self.train_pos)}, "
+                f"n_test={len(self.test_pos)}, model={self.model!r})")
+
+
+def _model_input(X):
+    """Return the object passed to model.fit/predict for a feature matrix."""
+    if isinstance(X, SparseFeatures):
+        return X.matrix
+    return X
+
+
+def _map_in_order(fn, items, n_threads: int):
+    """
+    Yield fn(item) for each item in order, optionally on a thread pool.
+
+    At most 2 * n_threads items are in flight, so a lazy items iterator
+    is never materialized in full.
+    """
+    if n_threads <= 1:
+        for item in items:
+            yield fn(item)
+        return
+
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(fn, item))
+            if len(pending) >= 2 * n_threads:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _prepare_frames(
+    *,
+    csv_path: str,
+    protected_cols: Sequence[str],
+    fairness_transforms: Optional[Sequence[Callable[[pd.DataFrame], pd.DataFrame]]],
+    drop_from_X: Sequence[str],
+    sparse: bool,
+    cache: Optional[StageCache] = None,
+):
+    """
+    Load the CSV, apply fairness transforms and preprocess for modelling.
+
+    Returns (df_raw, df_fair, df_model, (fair_key, model_key)) where the
+    keys identify df_fair and df_model in the cache (None without a cache
+    or for unkeyable transforms).
+    """
+    keyed = cache is not None
+    if not keyed:
+        cache = StageCache(max_items=0)  # computes, stores nothing
 
+    raw_key = cache.key("load", file_token(csv_path)) if keyed else None
+    with profiling.span("pipeline.load") as span:
+        df_raw = cache.get_or_compute(raw_key, lambda: load_csv(csv_path))
+        span.set_rows(len(df_raw))
 
+    # fairness-oriented transforms (optional)
+    transforms = list(fairness_transforms or ())
+    fair_key = cache.key("transforms", raw_key,
+                         *[callable_token(t) for t in transforms]) \
+        if keyed else None
+    df_fair = df_raw
+    if transforms:
+        with profiling.span("pipeline.transforms", len(df_raw)):
+            df_fair = cache.get_or_compute(
+                fair_key, lambda: apply_transforms(df_raw, transforms))
+
+    missing = [c for c in protected_cols if c not in df_fair.columns]
+    if missing:
+        raise ValueError(f"Protected columns missing after transforms: {missing}")
+
+    # model-oriented preprocessing (one-hot etc.)
+    model_key = cache.key("preprocess", fair_key, tuple(drop_from_X), sparse)
+    with profiling.span("pipeline.preprocess", len(df_fair)):
+        df_model = cache.get_or_compute(
+            model_key, lambda: preprocess_tabular(
+                df_fair, drop_cols=drop_from_X, sparse=sparse))
+    return df_raw, df_fair, df_model, (fair_key, model_key)
+
+
+def _split(df_model, model_key, cache, **kwargs):
+    """make_train_test_split, memoized on the df_model key and kwargs."""
+    with profiling.span("pipeline.split", len(df_model)):
+        if cache is None:
+            return make_train_test_split(df_model, **kwargs)
+        key = cache.key("split", model_key, tuple(sorted(kwargs.items())))
+        return cache.get_or_compute(
+            key, lambda: make_train_test_split(df_model, **kwargs))
+
+
+def _default_model(sparse: bool = False):
+    """Scaled logistic regression used when no model is given."""
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    # centring would densify sparse input
+    return Pipeline([
+        ("scaler", StandardScaler(with_mean=not sparse)),
+        ("clf", LogisticRegression(max_iter=2000)),
+    ])
+
+
+@profiling.instrument(count_rows=False)
 def run_demo_pipeline(
     *,
     csv_path: str,
@@ -75,61 +309,156 @@ def run_demo_pipeline(
     model: Optional[Any] = None,
     model_fit_kwargs: Optional[dict] = None,
     predict_proba: bool = False,
-) -> PipelineResult:
-    """Run an end-to-end demo workflow and return aligned outputs."""
-    df_raw = load_csv(csv_path)
+    sparse: bool = False,
+    index_split: bool = False,
+    cache: Optional[StageCache] = None,
+    lean: bool = False,
+    batch_size: Optional[int] = None,
+    n_threads: int = 1,
+    build_eval_df: bool = True,
+) -> Union[PipelineResult, LeanPipelineResult]:
+    """
+    Run an end-to-end demo workflow and return aligned outputs.
 
-    # 1) fairness-oriented transforms (optional)
-    df_fair = df_raw
-    if fairness_transforms:
-        df_fair = apply_transforms(df_fair, fairness_transforms)
+    With sparse=True the one-hot features are kept as a SciPy CSR matrix
+    through the split and model fit, which suits sparse-friendly estimators
+    such as LogisticRegression on high-cardinality categoricals.
 
-    missing = [c for c in protected_cols if c not in df_fair.columns]
-    if missing:
-        raise ValueError(f"Protected columns missing after transforms: {missing}")
+    With index_split=True the split is a SplitIndices (row positions plus
+    lazy views) and eval_df gathers the protected columns by position,
+    so no test-set copy of df_fair is made.
+
+    With a StageCache (fairness.utils.cache), loading, transforms,
+    preprocessing and the split are memoized, so a repeat run with the same
+    file and data settings goes straight to model fitting. The model is
+    fitted every time.
+
+    With lean=True a LeanPipelineResult is returned: df_raw, df_model and
+    the split are dropped once the model is fitted and rebuilt on request
+    (load_raw(), build_model_frame(), build_split()), so the result holds
+    df_fair plus index arrays rather than several copies of the dataset.
+
+    With batch_size, the test rows are predicted batch_size rows at a time
+    (on n_threads threads if n_threads > 1; results keep test order), so
+    neither X_test nor the model's intermediate arrays are built for the
+    whole test set at once. Each batch's predictions are added to an
+    IncrementalCounts (result.counts) as they arrive; with
+    build_eval_df=False no eval_df is built at all and fairness metrics
+    come from result.counts (e.g. result.counts.max_diff("fnr")).
+    """
+    batched = batch_size is not None or not build_eval_df
+    if batched and predict_proba:
+        raise ValueError("batch_size and build_eval_df=False need class "
+                         "predictions (predict_proba=False) for the "
+                         "fairness counts")
+
+    # recorded before loading so a lean result can check what it re-reads
+    source_token = file_token(csv_path) if lean else None
 
-    # 2) model-oriented preprocessing (one-hot etc.)
-    df_model = preprocess_tabular(df_fair, drop_cols=drop_from_X)
+    # 1) + 2) load, fairness transforms and model preprocessing
+    df_raw, df_fair, df_model, (fair_key, model_key) = _prepare_frames(
+        csv_path=csv_path,
+        protected_cols=protected_cols,
+        fairness_transforms=fairness_transforms,
+        drop_from_X=drop_from_X,
+        sparse=sparse,
+        cache=cache,
+    )
 
     # 3) split for modelling (uses df_model)
-    split = make_train_test_split(
+    split = _split(
         df_model,
+        model_key,
+        cache,
         target_col=target_col,
         test_size=test_size,
         random_state=random_state,
         stratify=stratify,
+        return_indices=index_split or lean or batched,
     )
 
     # 4) fit model and predict
     if model is None:
-        from sklearn.linear_model import LogisticRegression
-        from sklearn.pipeline import Pipeline
-        from sklearn.preprocessing import StandardScaler
+        model = _default_model(sparse)
 
-        model = Pipeline([
-            ("scaler", StandardScaler()),
-            ("clf", LogisticRegression(max_iter=2000)),
-        ])
+    X_train = _model_input(split.X_train)
 
     fit_kwargs = model_fit_kwargs or {}
-    model.fit(split.X_train, split.y_train, **fit_kwargs)
+    with profiling.span("pipeline.fit", X_train.shape[0]):
+        model.fit(X_train, split.y_train, **fit_kwargs)
+    del X_train
 
-    if predict_proba:
-        if not hasattr(model, "predict_proba"):
-            raise ValueError("predict_proba=True but model has no predict_proba method")
-        y_pred = model.predict_proba(split.X_test)[:, 1]
-    else:
-        y_pred = model.predict(split.X_test)
+    if predict_proba and not hasattr(model, "predict_proba"):
+        raise ValueError("predict_proba=True but model has no predict_proba method")
+
+    def predict(X):
+        X = _model_input(X)
+        if predict_proba:
+            return model.predict_proba(X)[:, 1]
+        return model.predict(X)
+
+    with profiling.span("pipeline.predict", len(split.y_test)):
+        counts = None
+        if batched:
+            counts = IncrementalCounts(protected_cols)
+
+            def predict_batch(batch):
+                positions, X, y = batch
+                return positions, y, predict(X)
+
+            chunks = []
+            batches = split.iter_test_batches(
+                batch_size or len(split.test_pos) or 1)
+            for positions, y, pred in _map_in_order(predict_batch, batches,
+                                                    n_threads):
+                chunks.append(pred)
+                labels = {c: df_fair[c].iloc[positions].to_numpy()
+                          for c in protected_cols}
+                counts.update(y.to_numpy(), pred, labels)
+            y_pred = np.concatenate(chunks) if chunks else np.array([])
+        else:
+            y_pred = predict(split.X_test)
 
     # 5) build eval_df from df_fair (so protected cols like age_group still exist)
-    df_test = df_fair.loc[split.X_test.index]
+    if not build_eval_df:
+        eval_df = None
+    elif index_split or lean or batched:
+        # df_model rows are in df_fair order, so positions carry over
+        eval_df = make_eval_df(
+            df_test=df_fair,
+            protected=protected_cols,
+            y_pred=y_pred,
+            y_true=split.y_test.to_numpy(),
+            positions=split.test_pos,
+        )
+    else:
+        df_test = df_fair.loc[split.X_test.index]
 
-    eval_df = make_eval_df(
-        df_test=df_test,
-        protected=protected_cols,
-        y_pred=y_pred,
-        y_true=split.y_test.to_numpy(),
-    )
+        eval_df = make_eval_df(
+            df_test=df_test,
+            protected=protected_cols,
+            y_pred=y_pred,
+            y_true=split.y_test.to_numpy(),
+        )
+
+    if lean:
+        return LeanPipelineResult(
+            df_fair=df_fair,
+            model=model,
+            y_pred=y_pred,
+            eval_df=eval_df,
+            train_pos=split.train_pos,
+            test_pos=split.test_pos,
+            csv_path=csv_path,
+            source_token=source_token,
+            target_col=target_col,
+            index_split=index_split,
+            drop_from_X=drop_from_X,
+            sparse=sparse,
+            cache=cache,
+            fair_key=fair_key,
+            counts=counts,
+        )
 
     return PipelineResult(
         df_raw=df_raw,
@@ -139,4 +468,706 @@ def run_demo_pipeline(
         model=model,
         y_pred=y_pred,
         eval_df=eval_df,
+        counts=counts,
     )
+
+
+# ---------------------------------------------------------------------
+# Repeated cross-validated fairness evaluation
+# ---------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class CrossValResult:
+    """
+    Outputs from cross_validate_fairness.
+
+    Attributes
+    ----------
+    oof_predictions:
+        Array of shape (n_repeats, n_rows) with the out-of-fold prediction
+        of every row in each repeat (rows in df_fair order).
+    rates:
+        Long DataFrame with one row per repeat, metric and intersectional
+        group: columns repeat, metric, group, n, value.
+    summary:
+        Aggregate over repeats, indexed by (metric, group), with columns
+        n, mean, std, min, max. NaN repeats (empty denominators) are
+        skipped.
+    disparities:
+        Max-minus-min rate across intersectional groups for each repeat
+        (index) and metric (columns), as max_intersect_*_diff.
+    """
+
+    oof_predictions: np.ndarray
+    rates: pd.DataFrame
+    summary: pd.DataFrame
+    disparities: pd.DataFrame
+
+
+# Per-process state for fold fitting: the features, target and unfitted
+# model are sent once per worker instead of once per fold.
+_CV_STATE: dict = {}
+
+
+def _init_cv_worker(X, y, model) -> None:
+    _CV_STATE.update(X=X, y=y, model=model)
+
+
+def _take_rows(X, positions):
+    return X.iloc[positions] if hasattr(X, "iloc") else X[positions]
+
+
+def _fit_predict_fold(train_pos: np.ndarray,
+                      test_pos: np.ndarray) -> np.ndarray:
+    """Fit a fresh copy of the model on one fold and predict its test rows."""
+    from sklearn.base import clone
+
+    X, y = _CV_STATE["X"], _CV_STATE["y"]
+    model = clone(_CV_STATE["model"], safe=False)
+    model.fit(_take_rows(X, train_pos), y[train_pos])
+    return np.asarray(model.predict(_take_rows(X, test_pos)))
+
+
+def _features_and_target(df_model, target_col: str):
+    """Model input matrix and integer target array from df_model."""
+    if target_col not in df_model.columns:
+        raise ValueError(f"Target column '{target_col}' not found")
+
+    if isinstance(df_model, SparseFeatures):
+        y = df_model.target(target_col).to_numpy()
+        return df_model.drop([target_col]).matrix, y
+
+    return df_model.drop(columns=[target_col]), \
+        df_model[target_col].to_numpy()
+
+
+@profiling.instrument(count_rows=False)
+def cross_validate_fairness(
+    *,
+    csv_path: str,
+    target_col: str,
+    protected_cols: Sequence[str],
+    fairness_transforms: Optional[Sequence[Callable[[pd.DataFrame], pd.DataFrame]]] = None,
+    drop_from_X: Sequence[str] = (),
+    n_splits: int = 5,
+    n_repeats: int = 3,
+    random_state: int = 42,
+    model: Optional[Any] = None,
+    metrics: Sequence[str] = ("acc", "fnr", "fpr"),
+    n_jobs: Optional[int] = 1,
+    sparse: bool = False,
+    cache: Optional[StageCache] = None,
+) -> CrossValResult:
+    """
+    Repeated stratified K-fold evaluation of intersectional fairness.
+
+    The data stages of run_demo_pipeline run once. The rows are then split
+    into n_splits stratified folds, n_repeats times with different
+    shuffles; a fresh copy of the model is fitted on each training part and
+    predicts its held-out fold. Each repeat therefore gives one
+    out-of-fold prediction per row, on which the all_intersect_* rates are
+    computed over the whole dataset. Rates are then aggregated across
+    repeats.
+
+    Folds are generated up front from random_state and results are
+    collected in fold order, so the output does not depend on n_jobs
+    (for a deterministic model).
+
+    Parameters
+    ----------
+    csv_path, target_col, protected_cols, fairness_transforms, drop_from_X,
+    sparse, cache:
+        As for run_demo_pipeline.
+    n_splits:
+        Number of folds (K).
+    n_repeats:
+        Number of repeats with different fold shuffles (R).
+    random_state:
+        Seed for the fold shuffles.
+    model:
+        Unfitted estimator with fit/predict. It is cloned for every fold
+        (sklearn.base.clone, falling back to a deep copy). Defaults to the
+        run_demo_pipeline model.
+    metrics:
+        Rates to compute; any key of fairness.arrays.RATE_FORMULAS
+        (including rates added with fairness.rates.register_rate).
+    n_jobs:
+        Number of worker processes for fold fitting. None uses
+        os.cpu_count(); 1 fits in the current process.
+
+    Returns
+    -------
+    CrossValResult
+
+    Raises
+    ------
+    ValueError
+        If a metric is unknown or protected columns are missing.
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    from sklearn.model_selection import RepeatedStratifiedKFold
+
+    from fairness.arrays import EvalArrays, rate_from_counts
+
+    metrics = list(metrics)
+    unknown = [m for m in metrics if m not in RATE_FORMULAS]
+    if unknown:
+        raise ValueError(f"Unknown metrics: {unknown}. "
+                         f"Supported: {sorted(RATE_FORMULAS)}")
+
+    _, df_fair, df_model, _ = _prepare_frames(
+        csv_path=csv_path,
+        protected_cols=protected_cols,
+        fairness_transforms=fairness_transforms,
+        drop_from_X=drop_from_X,
+        sparse=sparse,
+        cache=cache,
+    )
+    X, y = _features_and_target(df_model, target_col)
+    if model is None:
+        model = _default_model(sparse)
+
+    cv = RepeatedStratifiedKFold(n_splits=n_splits, n_repeats=n_repeats,
+                                 random_state=random_state)
+    folds = list(cv.split(np.zeros(len(y)), y))
+
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, len(folds)))
+
+    if n_jobs == 1:
+        _init_cv_worker(X, y, model)
+        try:
+            fold_preds = [_fit_predict_fold(tr, te) for tr, te in folds]
+        finally:
+            _CV_STATE.clear()
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs,
+                                 initializer=_init_cv_worker,
+                                 initargs=(X, y, model)) as pool:
+            fold_preds = list(pool.map(_fit_predict_fold,
+                                       *zip(*folds)))
+
+    oof = np.empty((n_repeats, len(y)), dtype=np.asarray(fold_preds[0]).dtype)
+    for i, ((_, test_pos), pred) in enumerate(zip(folds, fold_preds)):
+        oof[i // n_splits, test_pos] = pred
+
+    labels_dict = {c: df_fair[c].to_numpy() for c in protected_cols}
+    rows = []
+    for repeat in range(n_repeats):
+        arrays = EvalArrays(y_true=y, y_pred=oof[repeat],
+                            subject_labels_dict=labels_dict)
+        # one count table per repeat serves every metric
+        combinations, counts = arrays.intersect_count_table()
+        groups = [" + ".join(str(g) for g in combo) for combo in combinations]
+        sizes = counts.sum(axis=1)
+        for metric in metrics:
+            values = rate_from_counts(metric, counts)
+            for group, n, value in zip(groups, sizes, values):
+                rows.append((repeat, metric, group, int(n), float(value)))
+
+    rates = pd.DataFrame(rows, columns=["repeat", "metric", "group", "n",
+                                        "value"])
+
+    summary = (
+        rates.groupby(["metric", "group"], sort=False)
+        .agg(n=("n", "first"), mean=("value", "mean"),
+             std=("value", "std"), min=("value", "min"),
+             max=("value", "max"))
+    )
+
+    def _max_diff(values: pd.Series) -> float:
+        return np.nan if values.isna().any() else values.max() - values.min()
+
+    disparities = (
+        rates.groupby(["repeat", "metric"], sort=False)["value"]
+        .agg(_max_diff)
+        .unstack("metric")[metrics]
+    )
+    disparities.columns.name = None
+
+    return CrossValResult(
+        oof_predictions=oof,
+        rates=rates,
+        summary=summary,
+        disparities=disparities,
+    )
+
+
+# ---------------------------------------------------------------------
+# Multi-model comparison on one prepared split
+# ---------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class ModelComparisonResult:
+    """
+    Outputs from run_model_comparison.
+
+    Attributes
+    ----------
+    df_fair:
+        DataFrame after fairness-oriented transforms.
+    split:
+        Index-only split shared by every model.
+    models:
+        Fitted models by name.
+    predictions:
+        Test-set predictions by name (aligned with split.test_pos).
+    comparison:
+        One row per model (index "model") with test accuracy, the
+        max_intersect_<metric>_diff of each requested metric and the fit
+        time in seconds.
+    protected_cols:
+        Protected columns used for the intersectional labels.
+    """
+
+    df_fair: pd.DataFrame
+    split: SplitIndices
+    models: dict
+    predictions: dict
+    comparison: pd.DataFrame
+    protected_cols: tuple
+
+    def eval_df(self, name: str) -> pd.DataFrame:
+        """Build the eval_df of one model (as PipelineResult.eval_df)."""
+        return make_eval_df(
+            df_test=self.df_fair,
+            protected=self.protected_cols,
+            y_pred=self.predictions[name],
+            y_true=self.split.y_test.to_numpy(),
+            positions=self.split.test_pos,
+        )
+
+
+# Per-process state for model fitting, see _init_model_worker.
+_MODEL_STATE: dict = {}
+
+
+def _attach_shared(name: str):
+    """Attach to an existing shared memory block without owning it."""
+    from multiprocessing import shared_memory
+
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 has no track argument
+        return shared_memory.SharedMemory(name=name)
+
+
+def _shareable(X) -> bool:
+    """True if X's columns can be mapped from shared memory as they are."""
+    return isinstance(X, pd.DataFrame) and X.columns.is_unique and all(
+        isinstance(dtype, np.dtype) and dtype.kind in "biuf"
+        for dtype in X.dtypes)
+
+
+def _share_frame(X: pd.DataFrame):
+    """
+    Copy X's columns into one shared memory block.
+
+    Each column keeps its dtype and gets its own 8-byte aligned segment.
+
+    Returns
+    -------
+    (shm, layout):
+        The block (owned by the caller) and the layout passed to
+        _init_model_worker: (block name, n_rows, [(column, dtype, offset)],
+        index).
+    """
+    from multiprocessing import shared_memory
+
+    n_rows = len(X)
+    columns, offset = [], 0
+    for col, dtype in X.dtypes.items():
+        columns.append((col, dtype.str, offset))
+        offset += -(-n_rows * dtype.itemsize // 8) * 8
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, offset))
+    for col, dtype, start in columns:
+        target = np.ndarray(n_rows, dtype=dtype, buffer=shm.buf,
+                            offset=start)
+        target[:] = X[col].to_numpy()
+        del target
+    return shm, (shm.name, n_rows, columns, X.index)
+
+
+def _init_model_worker(X, y, train_pos, test_pos, shared=None) -> None:
+    """
+    Store the split for this process.
+
+    If shared is given, X is None and the dense feature frame is attached
+    from shared memory with its original dtypes and index; shared is the
+    layout returned by _share_frame.
+    """
+    if shared is not None:
+        name, n_rows, columns, index = shared
+        shm = _attach_shared(name)
+        X = pd.DataFrame(
+            {col: np.ndarray(n_rows, dtype=dtype, buffer=shm.buf,
+                             offset=start)
+             for col, dtype, start in columns},
+            index=index, copy=False)
+        _MODEL_STATE["shm"] = shm
+    _MODEL_STATE.update(X=X, y=y, train_pos=train_pos, test_pos=test_pos)
+
+
+def _fit_named_model(name: str, model):
+    """Fit one model on the shared training rows and predict the test rows."""
+    import time
+
+    state = _MODEL_STATE
+    start = time.perf_counter()
+    model.fit(_take_rows(state["X"], state["train_pos"]),
+              state["y"][state["train_pos"]])
+    seconds = time.perf_counter() - start
+    y_pred = np.asarray(model.predict(_take_rows(state["X"],
+                                                 state["test_pos"])))
+    return name, model, y_pred, seconds
+
+
+def _model_names(models) -> dict:
+    """Normalise a list or dict of estimators to an ordered name -> model."""
+    if isinstance(models, Mapping):
+        named = dict(models)
+    else:
+        named = {}
+        for model in models:
+            base = type(model).__name__
+            name, i = base, 2
+            while name in named:
+                name, i = f"{base}_{i}", i + 1
+            named[name] = model
+    if not named:
+        raise ValueError("models must contain at least one estimator")
+    return named
+
+
+@profiling.instrument(count_rows=False)
+def run_model_comparison(
+    *,
+    csv_path: str,
+    target_col: str,
+    protected_cols: Sequence[str],
+    models: Union[Sequence[Any], Mapping[str, Any]],
+    fairness_transforms: Optional[Sequence[Callable[[pd.DataFrame], pd.DataFrame]]] = None,
+    drop_from_X: Sequence[str] = (),
+    test_size: float = 0.3,
+    random_state: int = 42,
+    stratify: bool = True,
+    sparse: bool = False,
+    metrics: Sequence[str] = ("acc", "fnr", "fpr"),
+    n_jobs: Optional[int] = 1,
+    cache: Optional[StageCache] = None,
+) -> ModelComparisonResult:
+    """
+    Fit several models on one prepared split and compare their fairness.
+
+    Loading, fairness transforms, preprocessing and splitting run once (as
+    in run_demo_pipeline with index_split=True). The models are then fitted
+    on the same training rows, concurrently when n_jobs > 1. With dense
+    features the feature matrix is placed in a shared memory block that
+    the worker processes map instead of receiving a copy each, keeping
+    every column's dtype and the row index, so models see the same input
+    as with n_jobs=1; sparse features (and frames with non-numeric
+    columns) are sent once per worker.
+
+    Parameters
+    ----------
+    csv_path, target_col, protected_cols, fairness_transforms, drop_from_X,
+    test_size, random_state, stratify, sparse, cache:
+        As for run_demo_pipeline.
+    models:
+        Unfitted estimators with fit/predict, as a dict name -> model or a
+        list (named by class, with a numeric suffix for repeats). Models
+        fitted in worker processes are returned as fitted copies.
+    metrics:
+        Rates whose max_intersect_<metric>_diff is reported; any key of
+        fairness.arrays.RATE_FORMULAS (including rates added with
+        fairness.rates.register_rate).
+    n_jobs:
+        Number of worker processes. None uses os.cpu_count(); 1 fits in
+        the current process.
+
+    Returns
+    -------
+    ModelComparisonResult
+
+    Raises
+    ------
+    ValueError
+        If models is empty, a metric is unknown or protected columns are
+        missing.
+    """
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    from fairness.arrays import EvalArrays
+
+    named = _model_names(models)
+    metrics = list(metrics)
+    unknown = [m for m in metrics if m not in RATE_FORMULAS]
+    if unknown:
+        raise ValueError(f"Unknown metrics: {unknown}. "
+                         f"Supported: {sorted(RATE_FORMULAS)}")
+
+    _, df_fair, df_model, (_, model_key) = _prepare_frames(
+        csv_path=csv_path,
+        protected_cols=protected_cols,
+        fairness_transforms=fairness_transforms,
+        drop_from_X=drop_from_X,
+        sparse=sparse,
+        cache=cache,
+    )
+    split = _split(
+        df_model,
+        model_key,
+        cache,
+        target_col=target_col,
+        test_size=test_size,
+        random_state=random_state,
+        stratify=stratify,
+        return_indices=True,
+    )
+    X, y = _features_and_target(df_model, target_col)
+
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, len(named)))
+
+    if n_jobs == 1:
+        _init_model_worker(X, y, split.train_pos, split.test_pos)
+        try:
+            outputs = [_fit_named_model(name, model)
+                       for name, model in named.items()]
+        finally:
+            _MODEL_STATE.clear()
+    else:
+        shm = None
+        initargs = (X, y, split.train_pos, split.test_pos)
+        try:
+            if _shareable(X):
+                shm, layout = _share_frame(X)
+                initargs = (None, y, split.train_pos, split.test_pos,
+                            layout)
+
+            with ProcessPoolExecutor(max_workers=n_jobs,
+                                     initializer=_init_model_worker,
+                                     initargs=initargs) as pool:
+                outputs = list(pool.map(_fit_named_model, named,
+                                        named.values()))
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+    labels_dict = {c: df_fair[c].to_numpy()[split.test_pos]
+                   for c in protected_cols}
+    y_test = y[split.test_pos]
+
+    rows, fitted, predictions = [], {}, {}
+    for name, model, y_pred, seconds in outputs:
+        fitted[name] = model
+        predictions[name] = y_pred
+        arrays = EvalArrays(y_true=y_test, y_pred=y_pred,
+                            subject_labels_dict=labels_dict)
+        row = {"model": name,
+               "accuracy": float(np.mean(arrays.y_true == arrays.y_pred))}
+        # every metric from one count table
+        max_diffs = disparity_table(arrays, metrics)["max_diff"]
+        for metric in metrics:
+            row[f"max_intersect_{metric}_diff"] = float(max_diffs[metric])
+        row["fit_seconds"] = seconds
+        rows.append(row)
+
+    comparison = pd.DataFrame(rows).set_index("model")
+
+    return ModelComparisonResult(
+        df_fair=df_fair,
+        split=split,
+        models=fitted,
+        predictions=predictions,
+        comparison=comparison,
+        protected_cols=tuple(protected_cols),
+    )
+
+
+# ---------------------------------------------------------------------
+# Hyperparameter sweep with a fairness-accuracy Pareto front
+# ---------------------------------------------------------------------
+
+
+def pareto_front(accuracy: Sequence[float],
+                 disparity: Sequence[float]) -> np.ndarray:
+    """
+    Mark configurations not dominated on (higher accuracy, lower disparity).
+
+    A point is dominated if another point has accuracy >= and disparity <=
+    with at least one strict. Points are sorted once by accuracy
+    (descending, ties by disparity ascending) and swept keeping the lowest
+    disparity seen so far, so the cost is O(n log n). Points with a NaN
+    value are never on the front.
+
+    Parameters
+    ----------
+    accuracy, disparity:
+        One value per configuration.
+
+    Returns
+    -------
+    np.ndarray
+        Boolean mask, True for configurations on the front. Exact
+        duplicates of a front point are also marked.
+    """
+    accuracy = np.asarray(accuracy, dtype=float)
+    disparity = np.asarray(disparity, dtype=float)
+    if accuracy.shape != disparity.shape:
+        raise ValueError("accuracy and disparity must have the same length.")
+
+    on_front = np.zeros(len(accuracy), dtype=bool)
+    valid = np.flatnonzero(~(np.isnan(accuracy) | np.isnan(disparity)))
+    order = valid[np.lexsort((disparity[valid], -accuracy[valid]))]
+
+    best = np.inf
+    last = None
+    for i in order:
+        point = (accuracy[i], disparity[i])
+        if disparity[i] < best or point == last:
+            on_front[i] = True
+            best = disparity[i]
+            last = point
+    return on_front
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    """
+    Outputs from run_param_sweep.
+
+    Attributes
+    ----------
+    results:
+        One row per configuration (index "config"): the grid parameters,
+        test accuracy, max_intersect_<metric>_diff for every metric, fit
+        time and a boolean "pareto" column.
+    pareto_metric:
+        Column the Pareto front was computed against accuracy for.
+    comparison:
+        The underlying ModelComparisonResult (fitted models and
+        predictions by config name).
+    """
+
+    results: pd.DataFrame
+    pareto_metric: str
+    comparison: ModelComparisonResult
+
+    @property
+    def pareto(self) -> pd.DataFrame:
+        """Configurations on the front, sorted by disparity."""
+        front = self.results[self.results["pareto"]]
+        return front.sort_values(self.pareto_metric)
+
+    def plot(self, **kwargs):
+        """Plot accuracy against pareto_metric (see plot_pareto_front)."""
+        from fairness.visualisation import plot_pareto_front
+
+        return plot_pareto_front(self.results, x=self.pareto_metric,
+                                 **kwargs)
+
+
+@profiling.instrument(count_rows=False)
+def run_param_sweep(
+    *,
+    csv_path: str,
+    target_col: str,
+    protected_cols: Sequence[str],
+    model: Any,
+    param_grid: Union[Mapping[str, Sequence], Sequence[Mapping[str, Sequence]]],
+    fairness_transforms: Optional[Sequence[Callable[[pd.DataFrame], pd.DataFrame]]] = None,
+    drop_from_X: Sequence[str] = (),
+    test_size: float = 0.3,
+    random_state: int = 42,
+    stratify: bool = True,
+    sparse: bool = False,
+    metrics: Sequence[str] = ("acc", "fnr", "fpr", "for", "fdr"),
+    pareto_metric: str = "fnr",
+    n_jobs: Optional[int] = 1,
+    cache: Optional[StageCache] = None,
+) -> SweepResult:
+    """
+    Evaluate a hyperparameter grid and find the fairness-accuracy front.
+
+    Every grid point is a clone of model with those parameters set. All
+    configurations are fitted on one prepared split via
+    run_model_comparison (data stages once, optionally memoized in cache;
+    fits spread over n_jobs processes), and each is scored on test
+    accuracy and the max_intersect_<metric>_diff of every metric.
+
+    Parameters
+    ----------
+    csv_path, target_col, protected_cols, fairness_transforms, drop_from_X,
+    test_size, random_state, stratify, sparse, n_jobs, cache:
+        As for run_model_comparison.
+    model:
+        Base estimator (scikit-learn API with get_params/set_params).
+    param_grid:
+        Dict of parameter name -> values, or a list of such dicts, as for
+        sklearn.model_selection.ParameterGrid. Nested parameters use the
+        "step__param" form.
+    metrics:
+        Rates whose intersectional max difference is recorded.
+    pareto_metric:
+        Rate (one of metrics) traded off against accuracy.
+
+    Returns
+    -------
+    SweepResult
+
+    Raises
+    ------
+    ValueError
+        If pareto_metric is not in metrics or the grid is empty.
+    """
+    from sklearn.base import clone
+    from sklearn.model_selection import ParameterGrid
+
+    metrics = list(metrics)
+    if pareto_metric not in metrics:
+        raise ValueError(f"pareto_metric '{pareto_metric}' must be one of "
+                         f"{metrics}")
+
+    grid = list(ParameterGrid(param_grid))
+    if not grid:
+        raise ValueError("param_grid is empty")
+
+    models = {f"config_{i}": clone(model).set_params(**params)
+              for i, params in enumerate(grid)}
+    comparison = run_model_comparison(
+        csv_path=csv_path,
+        target_col=target_col,
+        protected_cols=protected_cols,
+        models=models,
+        fairness_transforms=fairness_transforms,
+        drop_from_X=drop_from_X,
+        test_size=test_size,
+        random_state=random_state,
+        stratify=stratify,
+        sparse=sparse,
+        metrics=metrics,
+        n_jobs=n_jobs,
+        cache=cache,
+    )
+
+    # object dtype keeps parameter values such as None as-is
+    params = pd.DataFrame(grid, index=pd.Index(list(models), name="config"),
+                          dtype=object)
+    results = params.join(comparison.comparison.rename_axis("config"))
+
+    disparity_col = f"max_intersect_{pareto_metric}_diff"
+    results["pareto"] = pareto_front(results["accuracy"],
+                                     results[disparity_col])
+
+    return SweepResult(results=results, pareto_metric=disparity_col,
+                       comparison=comparison)
@@ -0,0 +1,209 @@
+"""
+fairness.utils.render
+=====================
+
+Headless batch rendering of fairness figures to files.
+
+Reporting jobs often produce hundreds of figures per model release. Rather
+than drawing them one by one through interactive pyplot state, describe
+each figure as a `PlotSpec` and hand the list to `render_figures`, which:
+
+1) renders every figure with the non-interactive Agg backend in worker
+   processes, or with interactive mode off in-process for n_jobs=1
+   (leaving the caller's backend, e.g. a notebook's inline one, alone)
+2) spreads the work over a process pool
+3) saves directly to PNG/SVG/PDF (chosen by the file extension)
+4) closes each figure as soon as it is saved, so pyplot does not
+   accumulate open figures
+5) returns a per-figure report including render time
+
+Like `fairness.utils.pipeline`, this is a convenience layer on top of
+`fairness.visualisation`, not part of the core metric API.
+
+Typical usage
+-------------
+>>> from fairness import metrics
+>>> from fairness.utils.render import PlotSpec, render_figures
+>>> specs = [
+...     PlotSpec("acc.png", "plot_group_metric",
+...              args=(metrics.group_acc, labels, y_pred, y_true)),
+...     PlotSpec("fnr.svg", "plot_intersectional_metric",
+...              args=(metrics.all_intersect_fnrs, labels_dict,
+...                    y_pred, y_true)),
+... ]
+>>> report = render_figures(specs, "figures/", n_jobs=4)
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Mapping, Optional, Sequence, Union
+
+import pandas as pd
+
+SUPPORTED_FORMATS = (".png", ".svg", ".pdf")
+
+
+@dataclass(frozen=True)
+class PlotSpec:
+    """
+    Description of one figure to render.
+
+    Attributes
+    ----------
+    filename:
+        Output path relative to the output directory. The extension selects
+        the format (.png, .svg or .pdf).
+    plot:
+        Name of a `fairness.visualisation` plotting function
+        (e.g. "plot_group_metric"), or any picklable callable returning a
+        Matplotlib Figure.
+    args, kwargs:
+        Arguments passed to the plotting function. They must be picklable
+        when n_jobs > 1.
+    savefig_kwargs:
+        Extra keyword arguments for Figure.savefig (e.g. {"dpi": 150}).
+    """
+
+    filename: str
+    plot: Union[str, Callable[..., Any]]
+    args: tuple = ()
+    kwargs: Mapping[str, Any] = field(default_factory=dict)
+    savefig_kwargs: Mapping[str, Any] = field(default_factory=dict)
+
+
+def _use_agg_backend() -> None:
+    """Switch Matplotlib to the non-interactive Agg backend."""
+    import matplotlib
+
+    matplotlib.use("Agg", force=True)
+
+
+def _resolve_plot(plot: Union[str, Callable[..., Any]]) -> Callable:
+    """Look up a plotting function by name in fairness.visualisation."""
+    if callable(plot):
+        return plot
+
+    from fairness import visualisation
+
+    fn = getattr(visualisation, plot, None)
+    if fn is None or not plot.startswith("plot_"):
+        raise ValueError(f"Unknown plotting function '{plot}'.")
+    return fn
+
+
+def _plot_name(plot: Union[str, Callable[..., Any]]) -> str:
+    return plot if isinstance(plot, str) else getattr(plot, "__name__",
+                                                      repr(plot))
+
+
+def _render_one(spec: PlotSpec, out_dir: str) -> dict:
+    """
+    Render and save a single figure, always closing it afterwards.
+
+    Returns a report row; errors are recorded rather than raised so one bad
+    spec does not abort the batch.
+    """
+    import matplotlib.pyplot as plt
+
+    path = Path(out_dir) / spec.filename
+    row = {
+        "filename": str(path),
+        "plot": _plot_name(spec.plot),
+        "seconds": float("nan"),
+        "error": None,
+    }
+
+    start = time.perf_counter()
+    fig = None
+    try:
+        fig = _resolve_plot(spec.plot)(*spec.args, **dict(spec.kwargs))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fig.savefig(path, **dict(spec.savefig_kwargs))
+    except Exception as exc:  # reported per figure
+        row["error"] = f"{type(exc).__name__}: {exc}"
+    finally:
+        if fig is not None:
+            plt.close(fig)
+        row["seconds"] = time.perf_counter() - start
+
+    return row
+
+
+def render_figures(
+    specs: Sequence[PlotSpec],
+    out_dir: Union[str, Path],
+    *,
+    n_jobs: Optional[int] = None,
+    raise_on_error: bool = False,
+) -> pd.DataFrame:
+    """
+    Render a batch of figures to files using the Agg backend.
+
+    Parameters
+    ----------
+    specs:
+        Figures to render.
+    out_dir:
+        Directory the spec filenames are relative to. Created if missing.
+    n_jobs:
+        Number of worker processes. None uses os.cpu_count(); 1 renders in
+        the current process with its current backend and interactive mode
+        off, so no windows open and the backend is not changed.
+    raise_on_error:
+        If True, raise a RuntimeError listing failed figures after the batch
+        completes. Otherwise failures are only reported in the result.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per spec, in input order, with columns filename, plot,
+        seconds (render + save wall time) and error (None on success).
+
+    Raises
+    ------
+    ValueError
+        If a filename has an unsupported extension.
+    RuntimeError
+        If raise_on_error=True and any figure failed.
+    """
+    specs = list(specs)
+    bad = [s.filename for s in specs
+           if Path(s.filename).suffix.lower() not in SUPPORTED_FORMATS]
+    if bad:
+        raise ValueError(
+            f"Unsupported output format for {bad}. "
+            f"Use one of {list(SUPPORTED_FORMATS)}."
+        )
+
+    out_dir = str(out_dir)
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, len(specs) or 1))
+
+    if n_jobs == 1:
+        import matplotlib.pyplot as plt
+
+        # switching backends would close the caller's open figures
+        with plt.ioff():
+            rows = [_render_one(spec, out_dir) for spec in specs]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs,
+                                 initializer=_use_agg_backend) as pool:
+            rows = list(pool.map(_render_one, specs,
+                                 [out_dir] * len(specs)))
+
+    report = pd.DataFrame(rows, columns=["filename", "plot", "seconds",
+                                         "error"])
+
+    if raise_on_error and report["error"].notna().any():
+        failed = report.loc[report["error"].notna(), "filename"].tolist()
+        raise RuntimeError(f"Failed to render: {failed}")
+
+    return report
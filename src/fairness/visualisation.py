@@ -3,8 +3,10 @@ Visualization helpers for fairness metrics.
 
 This module contains lightweight plotting utilities that sit on top of the
 `fairness.metrics` and `fairness.single_metrics` APIs. The functions do not
-compute metrics themselves; they only visualize metric outputs computed from
-group labels, predictions, and ground-truth labels.
+define metrics themselves; they only visualize metric outputs computed from
+group labels, predictions, and ground-truth labels. For the built-in rate
+metrics, values for all groups are computed from a single shared count
+table rather than one data scan per group.
 
 The typical workflow is:
 1) Prepare evaluation inputs (see `fairness.groups.make_eval_df` and
@@ -14,19 +16,44 @@ The typical workflow is:
 3) Use the plotting helpers here to visualize metric values across groups.
 
 All plotting helpers return a Matplotlib `Figure` so callers can further
-customize or save the plots as needed.
+customize or save the plots as needed. `matplotlib.pyplot` is imported on
+first use, so importing this module does not start a plotting backend.
 """
 
 from __future__ import annotations
 
-from typing import Callable, Iterable, Mapping, Optional, Sequence, Tuple
+from typing import (TYPE_CHECKING, Callable, Iterable, Mapping, Optional,
+                    Sequence, Tuple)
 import itertools
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
-from . import single_metrics
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
+
+from . import metrics, single_metrics
+from .arrays import RATE_FORMULAS, EvalArrays
+from .profiling import instrument_module
+
+def _metric_rate(metric_fn: object, kinds: Sequence[str]) -> Optional[tuple]:
+    """
+    (rate, kind) of a fairness.metrics group_<rate><kind> function.
+
+    Such functions can be evaluated for all groups from one shared count
+    table instead of one data scan per group (or pair). Returns None for
+    any other callable. Rates come from RATE_FORMULAS, so families of
+    registered rates are recognised too.
+    """
+    name = getattr(metric_fn, "__name__", "")
+    if not name.startswith("group_") or \
+            getattr(metrics, name, None) is not metric_fn:
+        return None
+    for kind in kinds:
+        rate = name[len("group_"):len(name) - len(kind)]
+        if name.endswith(kind) and rate in RATE_FORMULAS:
+            return rate, kind.lstrip("_")
+    return None
 
 
 def _to_list(values: Iterable) -> list:
@@ -148,6 +175,8 @@ def _bar_plot(
     if figsize is None:
         figsize = _default_figsize(len(labels), horizontal=horizontal)
 
+    import matplotlib.pyplot as plt
+
     fig, ax = plt.subplots(figsize=figsize)
     if horizontal:
         ax.barh(labels, values)
@@ -166,6 +195,62 @@ def _bar_plot(
     return fig
 
 
+def _shared_group_rates(
+    rate: str,
+    subject_labels: list,
+    predictions: list,
+    true_statuses: list,
+) -> Optional[dict]:
+    """
+    Compute a rate for every group from one shared count table.
+
+    Parameters
+    ----------
+    rate : str
+        Rate name understood by `fairness.metrics.all_group_rates`.
+    subject_labels, predictions, true_statuses : list
+        Aligned evaluation inputs.
+
+    Returns
+    -------
+    dict or None
+        Mapping group -> rate, or None if the inputs are not binary (the
+        caller then falls back to calling the metric function directly).
+    """
+    try:
+        arrays = EvalArrays(y_true=true_statuses, y_pred=predictions,
+                            subject_labels=subject_labels)
+    except (ValueError, TypeError):
+        return None
+    return metrics.all_group_rates(rate, arrays)
+
+
+def _pairwise_from_rates(
+    rates: Mapping,
+    group_pairs: Sequence[Tuple[object, object]],
+    kind: str,
+) -> list:
+    """
+    Evaluate group_*_diff / group_*_ratio for many pairs at once.
+
+    Mirrors the NaN handling of the pairwise functions in
+    `fairness.metrics`: NaN if either group is empty, and for ratios also if
+    either rate is 0. Ratios are returned as natural logs, matching the
+    metric functions' default.
+    """
+    a = np.array([rates.get(p[0], np.nan) for p in group_pairs], dtype=float)
+    b = np.array([rates.get(p[1], np.nan) for p in group_pairs], dtype=float)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if kind == "diff":
+            values = np.abs(a - b)
+        else:
+            valid = (a != 0) & (b != 0)
+            values = np.where(valid, np.log(np.maximum(a / b, b / a)),
+                              np.nan)
+    return values.tolist()
+
+
 def plot_group_metric(
     metric_fn: Callable[[object, list, list, list], float],
     subject_labels: Iterable,
@@ -185,6 +270,9 @@ def plot_group_metric(
     of subject labels, predictions, and true labels, and returns a scalar
     value for that group (e.g., `group_acc`, `group_fnr`, `group_fpr`).
 
+    For the built-in group_* rate functions all groups are evaluated from
+    one shared count table; other callables are called once per group.
+
     Parameters
     ----------
     metric_fn : callable
@@ -230,8 +318,16 @@ def plot_group_metric(
         groups = _unique_in_order(subject_labels)
     groups = list(groups)
 
-    values = [metric_fn(g, subject_labels,
-                        predictions, true_statuses) for g in groups]
+    shared = None
+    resolved = _metric_rate(metric_fn, [""])
+    if resolved is not None:
+        shared = _shared_group_rates(resolved[0], subject_labels,
+                                     predictions, true_statuses)
+    if shared is not None:
+        values = [shared.get(g, np.nan) for g in groups]
+    else:
+        values = [metric_fn(g, subject_labels,
+                            predictions, true_statuses) for g in groups]
     labels = [str(g) for g in groups]
 
     if sort:
@@ -333,7 +429,10 @@ def plot_pairwise_group_metric(
     Plot pairwise group metrics (group_*_diff, group_*_ratio).
 
     Pairwise metric functions compare two groups at a time and return a
-    scalar (e.g., difference or ratio of accuracies).
+    scalar (e.g., difference or ratio of accuracies). For the built-in
+    group_*_diff and group_*_ratio functions the per-group rates are
+    computed once and all pairs are derived from them; other callables are
+    called once per pair.
 
     Parameters
     ----------
@@ -385,12 +484,19 @@ def plot_pairwise_group_metric(
     if not group_pairs:
         raise ValueError("No group pairs provided to plot.")
 
-    labels = []
-    values = []
-    for a, b in group_pairs:
-        labels.append(f"{a} vs {b}")
-        values.append(metric_fn(a, b, subject_labels, predictions,
-                                true_statuses))
+    labels = [f"{a} vs {b}" for a, b in group_pairs]
+
+    shared = None
+    resolved = _metric_rate(metric_fn, ["_diff", "_ratio"])
+    if resolved is not None:
+        rate, kind = resolved
+        shared = _shared_group_rates(rate, subject_labels, predictions,
+                                     true_statuses)
+    if shared is not None:
+        values = _pairwise_from_rates(shared, group_pairs, kind)
+    else:
+        values = [metric_fn(a, b, subject_labels, predictions,
+                            true_statuses) for a, b in group_pairs]
 
     if sort:
         order = np.argsort(np.nan_to_num(values, nan=np.inf))
@@ -412,6 +518,228 @@ def plot_pairwise_group_metric(
     )
 
 
+def _resolve_rate(metric: object) -> str:
+    """
+    Map a rate name or a fairness.metrics group_* function to its rate name.
+
+    Raises
+    ------
+    ValueError
+        If the metric is not a registered rate.
+    """
+    if isinstance(metric, str) and metric in RATE_FORMULAS:
+        return metric
+    resolved = _metric_rate(metric, [""])
+    if resolved is not None:
+        return resolved[0]
+    raise ValueError(
+        f"Unsupported metric {metric!r}. Pass one of "
+        f"{sorted(RATE_FORMULAS)} or a fairness.metrics group_* function."
+    )
+
+
+def pairwise_metric_matrix(
+    metric: object,
+    subject_labels: Iterable,
+    predictions: Iterable,
+    true_statuses: Iterable,
+    *,
+    kind: str = "diff",
+    natural_log: bool = True,
+    groups: Optional[Sequence] = None,
+) -> pd.DataFrame:
+    """
+    Compute the full matrix of pairwise group differences or ratios.
+
+    Per-group rates are counted once; the G x G matrix is then derived by
+    broadcasting, so the cost is O(N + G^2) rather than one data scan per
+    pair.
+
+    Parameters
+    ----------
+    metric : str or callable
+        Rate name (any key of `fairness.arrays.RATE_FORMULAS`, e.g. 'fnr'
+        or 'f1') or the matching `fairness.metrics` group_* function.
+    subject_labels : Iterable
+        Group label for each sample.
+    predictions : Iterable
+        Predicted labels (0/1) aligned with `subject_labels`.
+    true_statuses : Iterable
+        Ground-truth labels (0/1) aligned with `subject_labels`.
+    kind : {"diff", "ratio"}, optional
+        "diff" gives |rate_a - rate_b| (as group_*_diff); "ratio" gives
+        max(rate_a / rate_b, rate_b / rate_a) (as group_*_ratio).
+    natural_log : bool, optional
+        If True and kind="ratio", return the natural log of the ratio.
+    groups : Sequence or None, optional
+        Subset/ordering of groups. If None, all unique labels in first-seen
+        order are used.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Symmetric matrix indexed and labelled by group. Entries are NaN
+        where either group is empty (or, for ratios, has a zero rate).
+
+    Raises
+    ------
+    ValueError
+        If the metric or kind is unsupported, or inputs differ in length.
+    """
+    if kind not in ("diff", "ratio"):
+        raise ValueError(f"kind must be 'diff' or 'ratio'. Got {kind!r}.")
+    rate = _resolve_rate(metric)
+
+    subject_labels = _to_list(subject_labels)
+    predictions = _to_list(predictions)
+    true_statuses = _to_list(true_statuses)
+    _require_equal_lengths(
+        subject_labels, predictions, true_statuses,
+        names=("subject_labels", "predictions", "true_statuses"),
+    )
+
+    rates = metrics.all_group_rates(rate, subject_labels, predictions,
+                                    true_statuses)
+    if groups is None:
+        groups = list(rates)
+    groups = list(groups)
+    r = np.array([rates.get(g, np.nan) for g in groups], dtype=float)
+
+    a, b = r[:, None], r[None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if kind == "diff":
+            matrix = np.abs(a - b)
+        else:
+            matrix = np.where((a != 0) & (b != 0),
+                              np.maximum(a / b, b / a), np.nan)
+            if natural_log:
+                matrix = np.log(matrix)
+
+    labels = [str(g) for g in groups]
+    return pd.DataFrame(matrix, index=labels, columns=labels)
+
+
+def top_disparity_pairs(matrix: pd.DataFrame, k: int = 10) -> pd.DataFrame:
+    """
+    Extract the k group pairs with the largest disparity from a matrix
+    produced by `pairwise_metric_matrix`.
+
+    Parameters
+    ----------
+    matrix : pandas.DataFrame
+        Symmetric pairwise matrix.
+    k : int, optional
+        Number of pairs to return.
+
+    Returns
+    -------
+    pandas.DataFrame
+        Columns group_a, group_b, value, sorted by value (descending).
+        Each unordered pair appears once; NaN entries are skipped.
+    """
+    values = matrix.to_numpy()
+    rows, cols = np.triu_indices(len(matrix), k=1)
+    upper = values[rows, cols]
+
+    keep = ~np.isnan(upper)
+    rows, cols, upper = rows[keep], cols[keep], upper[keep]
+
+    k = min(k, len(upper))
+    if k < len(upper):
+        top = np.argpartition(-upper, k - 1)[:k]
+    else:
+        top = np.arange(len(upper))
+    top = top[np.argsort(-upper[top], kind="stable")]
+
+    return pd.DataFrame({
+        "group_a": matrix.index.to_numpy()[rows[top]],
+        "group_b": matrix.columns.to_numpy()[cols[top]],
+        "value": upper[top],
+    })
+
+
+def plot_pairwise_heatmap(
+    metric: object,
+    subject_labels: Iterable,
+    predictions: Iterable,
+    true_statuses: Iterable,
+    *,
+    kind: str = "diff",
+    natural_log: bool = True,
+    groups: Optional[Sequence] = None,
+    title: Optional[str] = None,
+    figsize: Optional[Tuple[float, float]] = None,
+    cmap: str = "viridis",
+    max_tick_labels: int = 40,
+) -> plt.Figure:
+    """
+    Plot pairwise group disparities as a heatmap.
+
+    Unlike `plot_pairwise_group_metric`, which draws one bar per pair, the
+    whole matrix is rendered as a single image artist, so hundreds of groups
+    (tens of thousands of pairs) plot quickly. Use `top_disparity_pairs` on
+    `pairwise_metric_matrix` for a table of the worst pairs.
+
+    Parameters
+    ----------
+    metric : str or callable
+        Rate name or `fairness.metrics` group_* function.
+    subject_labels, predictions, true_statuses : Iterable
+        Aligned evaluation inputs.
+    kind : {"diff", "ratio"}, optional
+        Pairwise comparison to show.
+    natural_log : bool, optional
+        If True and kind="ratio", show the log ratio.
+    groups : Sequence or None, optional
+        Subset/ordering of groups.
+    title : str or None, optional
+        Plot title. Defaults to "<metric> <kind>".
+    figsize : tuple[float, float] or None, optional
+        Figure size in inches.
+    cmap : str, optional
+        Matplotlib colormap name.
+    max_tick_labels : int, optional
+        Group names are drawn as tick labels only up to this many groups.
+
+    Returns
+    -------
+    matplotlib.figure.Figure
+        The created Matplotlib figure.
+    """
+    matrix = pairwise_metric_matrix(
+        metric, subject_labels, predictions, true_statuses,
+        kind=kind, natural_log=natural_log, groups=groups,
+    )
+    n = len(matrix)
+
+    if figsize is None:
+        side = min(14.0, max(5.0, 0.3 * n))
+        figsize = (side + 1.5, side)
+
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=figsize)
+    image = ax.imshow(np.ma.masked_invalid(matrix.to_numpy()), cmap=cmap,
+                      interpolation="nearest", aspect="auto")
+    fig.colorbar(image, ax=ax, label=kind)
+
+    if n <= max_tick_labels:
+        ax.set_xticks(range(n))
+        ax.set_yticks(range(n))
+        ax.set_xticklabels(matrix.columns, rotation=90)
+        ax.set_yticklabels(matrix.index)
+    else:
+        ax.set_xlabel("group index")
+        ax.set_ylabel("group index")
+
+    if title is None:
+        title = f"{_resolve_rate(metric)} {kind}"
+    ax.set_title(title)
+
+    fig.tight_layout()
+    return fig
+
+
 def plot_intersectional_metric(
     metric_fn: Callable[[dict, list, list], dict],
     subject_labels_dict: Mapping[str, Sequence],
@@ -633,3 +961,66 @@ def plot_single_metrics(
         rotation=rotation,
         figsize=figsize,
     )
+
+
+def plot_pareto_front(
+    results: pd.DataFrame,
+    *,
+    x: str = "max_intersect_fnr_diff",
+    y: str = "accuracy",
+    front_col: str = "pareto",
+    title: Optional[str] = None,
+    figsize: Optional[Tuple[float, float]] = None,
+) -> plt.Figure:
+    """
+    Scatter configurations by disparity and accuracy, highlighting the front.
+
+    Parameters
+    ----------
+    results : pd.DataFrame
+        One row per configuration, e.g. SweepResult.results from
+        `fairness.utils.pipeline.run_param_sweep`.
+    x : str, optional
+        Disparity column (lower is better).
+    y : str, optional
+        Accuracy column (higher is better).
+    front_col : str, optional
+        Boolean column marking Pareto-optimal rows.
+    title : str or None, optional
+        Plot title.
+    figsize : tuple[float, float] or None, optional
+        Figure size in inches.
+
+    Returns
+    -------
+    matplotlib.figure.Figure
+        The created Matplotlib figure.
+    """
+    missing = [c for c in (x, y, front_col) if c not in results.columns]
+    if missing:
+        raise ValueError(f"Columns not found in results: {missing}")
+
+    import matplotlib.pyplot as plt
+
+    front = results[results[front_col].astype(bool)].sort_values(x)
+    rest = results[~results[front_col].astype(bool)]
+
+    fig, ax = plt.subplots(figsize=figsize or (7.0, 5.0))
+    ax.scatter(rest[x], rest[y], color="lightgrey", label="dominated")
+    ax.plot(front[x], front[y], marker="o", drawstyle="steps-post",
+            label="Pareto front")
+    for name, row in front.iterrows():
+        ax.annotate(str(name), (row[x], row[y]), fontsize=8,
+                    textcoords="offset points", xytext=(4, 4))
+
+    ax.set_xlabel(x)
+    ax.set_ylabel(y)
+    ax.set_title(title or "Fairness-accuracy trade-off")
+    ax.legend()
+
+    fig.tight_layout()
+    return fig
+
+
+# instrument the public functions above (no-op unless profiling is enabled)
+instrument_module(globals())
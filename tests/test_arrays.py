@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fairness import metrics
+from fairness.arrays import EvalArrays
+from fairness.single_metrics import (
+    calculate_AOD,
+    calculate_DI,
+    calculate_EOD,
+    calculate_TP_FN_FP_TN,
+    group_to_binary,
+)
+
+
+def _inputs():
+    subject_labels_dict = {
+        "Sex": ["M", "M", "F", "F", "M", "M", "F", "F", "M", "F"],
+        "age_group": ["young", "young", "young", "young", "older",
+                      "older", "older", "older", "young", "older"],
+    }
+    y_true = [1, 0, 0, 1, 1, 0, 0, 1, 1, 0]
+    y_pred = [1, 0, 1, 0, 1, 1, 1, 0, 0, 0]
+    subject_labels = subject_labels_dict["Sex"]
+    return subject_labels, subject_labels_dict, y_pred, y_true
+
+
+# -----------------------
+# validation at construction
+# -----------------------
+
+def test_eval_arrays_rejects_non_binary_and_length_mismatch():
+    with pytest.raises(ValueError, match="only"):
+        EvalArrays(y_true=[0, 2], y_pred=[0, 1])
+    with pytest.raises(ValueError, match="same length"):
+        EvalArrays(y_true=[0, 1], y_pred=[0])
+    with pytest.raises(ValueError, match="same length"):
+        EvalArrays(y_true=[0, 1], y_pred=[0, 1], subject_labels=["A"])
+
+
+def test_eval_arrays_accepts_booleans_and_counts():
+    arrays = EvalArrays(y_true=np.array([True, True, False, False]),
+                        y_pred=np.array([True, False, True, False]))
+    assert arrays.counts() == (1, 1, 1, 1)
+
+
+def test_eval_arrays_keeps_mixed_label_types():
+    arrays = EvalArrays(y_true=[1, 0], y_pred=[1, 0],
+                        subject_labels=["A", 1])
+    assert arrays.has_label(1)
+    assert arrays.group_mask(1).tolist() == [False, True]
+
+
+def test_eval_arrays_are_read_only_and_detached_from_inputs():
+    from fairness.utils.cache import cached_results
+
+    y_true = np.array([1, 0, 1, 0], dtype=np.int8)
+    labels = np.array(["A", "A", "B", "B"], dtype=object)
+    arrays = EvalArrays(y_true=y_true, y_pred=[1, 0, 0, 0],
+                        subject_labels=labels,
+                        subject_labels_dict={"sex": labels})
+    for values in (arrays.y_true, arrays.y_pred, arrays.cells,
+                   arrays.subject_labels, arrays.label_codes,
+                   arrays.subject_labels_dict["sex"],
+                   arrays.category_codes["sex"]):
+        with pytest.raises(ValueError, match="read-only"):
+            values[0] = values[1]
+
+    with cached_results():
+        before = metrics.group_fnr("B", arrays)
+        # the caller's buffers stay writable and are not shared
+        labels[:] = "A"
+        y_true[:] = 0
+        assert metrics.group_fnr("B", arrays) == before == 1.0
+
+
+# -----------------------
+# metrics fast path matches the list path
+# -----------------------
+
+@pytest.mark.parametrize("name", ["acc", "fnr", "fpr", "for", "fdr"])
+def test_metrics_accept_eval_arrays(name):
+    labels, labels_dict, y_pred, y_true = _inputs()
+    arrays = EvalArrays(y_true=y_true, y_pred=y_pred,
+                        subject_labels=labels,
+                        subject_labels_dict=labels_dict)
+
+    group_fn = getattr(metrics, f"group_{name}")
+    for group in ["M", "F", "absent"]:
+        expected = group_fn(group, labels, y_pred, y_true)
+        got = group_fn(group, arrays)
+        assert got == pytest.approx(expected, nan_ok=True)
+
+    all_fn = getattr(metrics, f"all_intersect_{name}s")
+    expected = all_fn(labels_dict, y_pred, y_true)
+    got = all_fn(arrays)
+    assert list(got) == list(expected)
+    assert np.allclose(list(got.values()), list(expected.values()),
+                       equal_nan=True)
+
+    max_fn = getattr(metrics, f"max_intersect_{name}_diff")
+    assert max_fn(arrays) == pytest.approx(
+        max_fn(labels_dict, y_pred, y_true), nan_ok=True)
+
+
+# -----------------------
+# single_metrics fast path matches the list path
+# -----------------------
+
+def test_single_metrics_accept_eval_arrays():
+    labels, _, y_pred, y_true = _inputs()
+    arrays = EvalArrays(y_true=y_true, y_pred=y_pred, subject_labels=labels)
+
+    assert calculate_TP_FN_FP_TN(arrays) == \
+        calculate_TP_FN_FP_TN(y_true, y_pred)
+    assert calculate_EOD(arrays, privileged_label="M") == pytest.approx(
+        calculate_EOD(y_true, y_pred, labels, "M"))
+    assert calculate_AOD(arrays, privileged_label="M") == pytest.approx(
+        calculate_AOD(y_true, y_pred, labels, "M"))
+    assert calculate_DI(arrays, privileged_label="M") == pytest.approx(
+        calculate_DI(y_pred, labels, "M"))
+    assert np.array_equal(group_to_binary(arrays, "M"),
+                          group_to_binary(labels, "M"))
+
+    with pytest.raises(ValueError):
+        calculate_EOD(arrays, privileged_label="X")
+
+
+def test_from_eval_df_builds_labels_dict():
+    labels, labels_dict, y_pred, y_true = _inputs()
+    eval_df = pd.DataFrame({"subject_label": labels, "y_pred": y_pred,
+                            "y_true": y_true})
+    arrays = EvalArrays.from_eval_df(eval_df,
+                                     protected_df=pd.DataFrame(labels_dict))
+
+    assert metrics.max_intersect_fnr_diff(arrays) == pytest.approx(
+        metrics.max_intersect_fnr_diff(labels_dict, y_pred, y_true))
+
+
+def test_incremental_counts_match_single_pass_counts():
+    from fairness.arrays import IncrementalCounts
+
+    _, labels_dict, y_pred, y_true = _inputs()
+    arrays = EvalArrays(y_true=y_true, y_pred=y_pred,
+                        subject_labels_dict=labels_dict)
+
+    counts = IncrementalCounts(["Sex", "age_group"])
+    for start in range(0, len(y_true), 3):
+        chunk = slice(start, start + 3)
+        counts.update(y_true[chunk], y_pred[chunk],
+                      {k: v[chunk] for k, v in labels_dict.items()})
+
+    combos, table = counts.intersect_count_table()
+    expected_combos, expected_table = arrays.intersect_count_table()
+    assert combos == expected_combos
+    assert np.array_equal(table, expected_table)
+    assert counts.n_rows == len(y_true)
+
+    assert counts.rates("fnr") == pytest.approx(
+        metrics.all_intersect_fnrs(arrays), nan_ok=True)
+    assert counts.max_diff("acc") == pytest.approx(
+        metrics.max_intersect_acc_diff(labels_dict, y_pred, y_true))
+    assert list(counts.to_frame().columns) == ["tp", "fn", "tn", "fp"]
@@ -0,0 +1,80 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fairness import metrics
+from fairness.cli import audit, main
+
+
+def _scored(n=200):
+    rng = np.random.default_rng(3)
+    return pd.DataFrame({
+        "Sex": rng.choice(["M", "F"], n),
+        "age_group": rng.choice(["younger", "older"], n),
+        "score": rng.random(n),
+        "y_true": rng.integers(0, 2, n),
+    }).assign(y_pred=lambda d: (d["score"] >= 0.5).astype(int))
+
+
+def test_main_writes_json_report_matching_metrics(tmp_path, capsys):
+    df = _scored()
+    csv_path = tmp_path / "scored.csv"
+    df.to_csv(csv_path, index=False)
+
+    code = main([str(csv_path), "--protected", "Sex", "age_group",
+                 "--pred", "y_pred", "--truth", "y_true",
+                 "--privileged", "Sex=M", "--workers", "1",
+                 "--output-dir", str(tmp_path / "out")])
+
+    assert code == 0
+    assert "intersection" in capsys.readouterr().out
+    report = json.loads((tmp_path / "out" / "audit.json").read_text())
+    assert report["n_rows"] == 200
+
+    labels = {"Sex": list(df["Sex"]), "age_group": list(df["age_group"])}
+    summary = {(r["scope"], r["metric"]): r for r in report["summary"]}
+    expected = metrics.max_intersect_fnr_diff(labels, list(df["y_pred"]),
+                                              list(df["y_true"]))
+    assert summary["intersection", "fnr"]["max_diff"] == \
+        pytest.approx(expected)
+
+    groups = {(r["attribute"], r["group"]): r for r in report["groups"]}
+    assert groups["Sex", "F"]["acc"] == pytest.approx(metrics.group_acc(
+        "F", labels["Sex"], list(df["y_pred"]), list(df["y_true"])))
+    assert len(report["intersections"]) == 4
+    assert report["single"][0]["privileged"] == "M"
+
+
+def test_audit_is_independent_of_workers_and_thresholds_scores():
+    df = _scored()
+    kwargs = dict(protected=["Sex", "age_group"], pred_col="score",
+                  truth_col="y_true", threshold=0.5)
+
+    serial = audit(df, **kwargs, n_jobs=1)
+    parallel = audit(df, **kwargs, n_jobs=3)
+    direct = audit(df, protected=["Sex", "age_group"], pred_col="y_pred",
+                   truth_col="y_true")
+
+    for name in ("groups", "intersections", "single", "summary"):
+        assert getattr(serial, name).equals(getattr(parallel, name))
+        assert getattr(serial, name).equals(getattr(direct, name))
+
+
+def test_main_parquet_output_and_errors(tmp_path):
+    pytest.importorskip("pyarrow")
+    parquet_path = tmp_path / "scored.parquet"
+    _scored().to_parquet(parquet_path)
+
+    main([str(parquet_path), "--protected", "Sex", "--pred", "y_pred",
+          "--truth", "y_true", "--format", "parquet", "--quiet",
+          "--output-dir", str(tmp_path / "out")])
+    groups = pd.read_parquet(tmp_path / "out" / "groups.parquet")
+    assert list(groups["group"]) == ["F", "M"]
+    assert not (tmp_path / "out" / "audit.json").exists()
+
+    with pytest.raises(SystemExit) as exc:
+        main([str(parquet_path), "--protected", "Missing",
+              "--pred", "y_pred", "--truth", "y_true"])
+    assert exc.value.code == 2
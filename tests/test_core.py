@@ -5,9 +5,12 @@ import pandas as pd
 import pytest
 
 from fairness.data import load_csv, load_features_and_target
-from fairness.preprocess import add_age_group, map_binary_column, \
-                                preprocess_tabular
-from fairness.groups import make_intersectional_labels
+from fairness.preprocess import TabularEncoder, add_age_group, \
+                                age_group_transform, apply_transforms, \
+                                binary_map_transform, map_binary_column, \
+                                make_train_test_split, preprocess_tabular, \
+                                run_transforms
+from fairness.groups import make_eval_df, make_intersectional_labels
 from fairness.metrics import group_acc, group_acc_diff, group_acc_ratio
 
 
@@ -140,3 +143,115 @@ def test_metrics_group_acc_diff_ratio_and_absent_group_nan():
     # absent group -> NaN
     acc_c = group_acc("C", subject_labels, y_pred, y_true)
     assert np.isnan(acc_c)
+
+
+def test_tabular_encoder_matches_preprocess_and_handles_unseen_levels():
+    train = pd.DataFrame(
+        {
+            "Age": [40, 70, 55],
+            "Sex": ["M", "F", "M"],
+            "ChestPainType": ["ATA", "NAP", "ASY"],
+        }
+    )
+    encoder = TabularEncoder(chunk_size=2)
+    encoded = encoder.fit_transform(train)
+    assert encoded.equals(preprocess_tabular(train))
+
+    # a batch with a single level and an unseen level keeps the layout
+    batch = pd.DataFrame({"Age": [60, 30], "Sex": ["M", "M"],
+                          "ChestPainType": ["TA", "NAP"]})
+    out = encoder.transform(batch)
+    assert list(out.columns) == encoder.feature_names_
+    assert out.loc[0, ["ChestPainType_ATA", "ChestPainType_NAP"]].sum() == 0
+    assert bool(out.loc[1, "ChestPainType_NAP"])
+
+    chunks = list(encoder.iter_transform(batch))
+    assert pd.concat(chunks).equals(out)
+
+    strict = TabularEncoder(handle_unknown="error").fit(train)
+    with pytest.raises(ValueError, match="Unknown levels"):
+        strict.transform(batch)
+
+
+def test_preprocess_tabular_sparse_matches_dense_and_splits():
+    df = pd.DataFrame(
+        {
+            "Age": [40, 70, 55, 61, 38, 49],
+            "Code": ["a", "b", "c", "a", "b", "d"],
+            "target": [0, 1, 0, 1, 0, 1],
+        }
+    )
+    dense = preprocess_tabular(df)
+    sparse = preprocess_tabular(df, sparse=True)
+
+    assert sparse.feature_names == list(dense.columns)
+    assert np.array_equal(sparse.matrix.toarray(),
+                          dense.to_numpy(dtype=float))
+
+    split_dense = make_train_test_split(dense, target_col="target",
+                                        test_size=0.5)
+    split_sparse = make_train_test_split(sparse, target_col="target",
+                                         test_size=0.5)
+    assert list(split_sparse.X_test.index) == list(split_dense.X_test.index)
+    assert split_sparse.y_test.tolist() == split_dense.y_test.tolist()
+    assert "target" not in split_sparse.X_train.feature_names
+
+
+def test_column_transforms_match_frame_transforms_without_mutating_input():
+    df = pd.DataFrame({"Age": [40, 70, 30], "Sex": ["M", "F", "M"]})
+    original = df.copy()
+
+    expected = map_binary_column(add_age_group(df), col="Sex",
+                                 mapping={"M": 1, "F": 0})
+    fused = apply_transforms(df, [
+        age_group_transform(),
+        binary_map_transform("Sex", {"M": 1, "F": 0}),
+    ])
+
+    assert fused.equals(expected)
+    assert df.equals(original)
+
+    result = run_transforms(df, [age_group_transform(),
+                                 binary_map_transform("Sex", {"M": 1,
+                                                              "F": 0})])
+    assert result.frame.equals(expected)
+    assert list(result.report["step"]) == ["age_group(Age)", "map(Sex)"]
+    assert (result.report["peak_bytes"] >= 0).all()
+
+
+def test_column_transform_plan_checked_before_running():
+    df = pd.DataFrame({"Age": [40, 70]})
+    with pytest.raises(ValueError, match="columns not found"):
+        apply_transforms(df, [age_group_transform(),
+                              binary_map_transform("Sex", {"M": 1})])
+
+
+def test_index_split_matches_copying_split_and_eval_df():
+    df = pd.DataFrame(
+        {
+            "Age": [40, 70, 55, 61, 38, 49, 52, 66],
+            "Sex": ["M", "F", "M", "F", "M", "F", "M", "F"],
+            "target": [0, 1, 0, 1, 0, 1, 0, 1],
+        },
+        index=list("abcdefgh"),
+    )
+    split = make_train_test_split(df, target_col="target", test_size=0.5)
+    index = make_train_test_split(df, target_col="target", test_size=0.5,
+                                  return_indices=True)
+
+    assert index.X_train.equals(split.X_train)
+    assert index.y_test.equals(split.y_test)
+    assert list(index.test_index) == list(split.X_test.index)
+    assert np.array_equal(index.X_test_array(dtype=object),
+                          split.X_test.to_numpy(dtype=object))
+    assert sorted(np.concatenate([index.train_pos, index.test_pos])) == \
+        list(range(len(df)))
+
+    y_pred = [1, 0, 1, 0]
+    expected = make_eval_df(df_test=df.loc[split.X_test.index],
+                            protected=["Sex"],
+                            y_pred=y_pred, y_true=split.y_test.to_numpy())
+    got = make_eval_df(df_test=df, protected=["Sex"], y_pred=y_pred,
+                       y_true=index.y_test.to_numpy(),
+                       positions=index.test_pos)
+    assert got.equals(expected)
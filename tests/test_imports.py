@@ -0,0 +1,63 @@
+import subprocess
+import sys
+
+# Generous budget for importing fairness.metrics on top of numpy; the
+# module itself should only cost a few milliseconds.
+IMPORT_BUDGET_SECONDS = 0.25
+
+HEAVY_MODULES = ("sklearn", "matplotlib", "pandas")
+
+
+def _run(code):
+    result = subprocess.run([sys.executable, "-c", code],
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+
+def test_import_fairness_metrics_is_light_and_fast():
+    out = _run(
+        "import time, sys\n"
+        "import numpy\n"
+        "start = time.perf_counter()\n"
+        "import fairness.metrics\n"
+        "print(time.perf_counter() - start)\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    elapsed, loaded = (out.splitlines() + [""])[:2]
+
+    assert loaded == ""
+    assert float(elapsed) < IMPORT_BUDGET_SECONDS
+
+
+def test_package_submodules_load_lazily():
+    out = _run(
+        "import sys\n"
+        "import fairness\n"
+        "before = 'fairness.visualisation' in sys.modules\n"
+        "fairness.visualisation\n"
+        "print(before, 'fairness.visualisation' in sys.modules,\n"
+        "      'matplotlib.pyplot' in sys.modules)"
+    )
+    assert out == "False True False"
+
+
+def test_preprocess_and_pipeline_defer_sklearn():
+    out = _run(
+        "import sys\n"
+        "import fairness.preprocess, fairness.utils.pipeline\n"
+        "print('sklearn' in sys.modules)"
+    )
+    assert out == "False"
+
+
+def test_version_comes_from_package_metadata():
+    out = _run(
+        "import importlib.metadata, fairness\n"
+        "try:\n"
+        "    expected = importlib.metadata.version("
+        "'intersectional-fairness-toolkit')\n"
+        "except importlib.metadata.PackageNotFoundError:\n"
+        "    expected = '0+unknown'\n"
+        "print(fairness.__version__ == expected)"
+    )
+    assert out == "True"
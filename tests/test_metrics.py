@@ -110,6 +110,15 @@ def test_metrics_group_acc_diff_ratio_and_absent_group_nan():
     assert np.isnan(acc_c)
 
 
+def test_group_metrics_reject_multiclass_outcomes():
+    # Outcomes are validated as binary once up front; a multiclass y_true
+    # used to give an exact-match accuracy and silently skewed error rates.
+    with pytest.raises(ValueError, match="only {0, 1}"):
+        group_acc("A", ["A", "A", "B"], [2, 1, 0], [2, 0, 0])
+    with pytest.raises(ValueError, match="only {0, 1}"):
+        group_fnr("A", ["A", "A", "B"], [1, 1, 0], [2, 1, 0])
+
+
 def test_max_intersect_acc_ratio_nan_if_any_zero_accuracy():
     subject_labels_dict = {
         "Sex":      ["M", "M", "M", "F"],
@@ -121,3 +130,57 @@ def test_max_intersect_acc_ratio_nan_if_any_zero_accuracy():
     assert np.isnan(max_intersect_acc_ratio(subject_labels_dict,
                                             y_pred, y_true,
                                             natural_log=True))
+
+
+def test_result_cache_returns_stored_results(tmp_path):
+    from fairness import metrics
+    from fairness.utils.cache import StageCache, array_token, cached_results
+
+    labels = {"sex": ["F", "M", "F", "M"], "age": ["y", "y", "o", "o"]}
+    y_true = [1, 1, 1, 1]
+    y_pred = [1, 0, 0, 1]
+    expected = metrics.all_intersect_fnrs(labels, y_pred, y_true)
+
+    with cached_results(StageCache(directory=tmp_path)) as cache:
+        first = metrics.all_intersect_fnrs(labels, y_pred, y_true)
+        first["mutated"] = 1.0
+        second = metrics.all_intersect_fnrs(subject_labels_dict=labels,
+                                            predictions=y_pred,
+                                            true_statuses=y_true)
+        # inner all_intersect_fnrs call is not looked up separately
+        metrics.max_intersect_fnr_diff(labels, y_pred, y_true)
+        # different truths, different key
+        metrics.all_intersect_fnrs(labels, y_pred, [0, 1, 1, 1])
+
+    assert second == expected
+    assert cache.stats == {"hits": 1, "misses": 3}
+
+    # the disk tier serves a fresh process-level cache
+    with cached_results(StageCache(0, directory=tmp_path)) as cache:
+        assert metrics.all_intersect_fnrs(labels, y_pred, y_true) == expected
+    assert cache.stats == {"hits": 1, "misses": 0}
+
+    assert array_token([1, 0]) != array_token(["1", "0"])
+    assert array_token([1, "a"]) != array_token(["1", "a"])
+
+
+def test_result_cache_keeps_mixed_type_labels_apart():
+    from fairness import metrics
+    from fairness.utils.cache import array_token, cached_results
+
+    long_label = "x" * 21
+    ints = [1, long_label, 1, long_label]
+    strs = ["1", long_label, "1", long_label]
+    y_true = [1, 0, 1, 0]
+    y_pred = [1, 0, 1, 0]
+    assert array_token(ints) != array_token(strs)
+    assert array_token([1, 1.0]) != array_token([1, 1])
+    assert array_token([True, 0]) != array_token([1, 0])
+    # homogeneous lists take the raw-bytes path, like the equivalent array
+    assert array_token(["M", "F"]) == array_token(np.array(["M", "F"]))
+
+    expected = metrics.group_acc("1", ints, y_pred, y_true)
+    assert np.isnan(expected)
+    with cached_results():
+        assert metrics.group_acc("1", strs, y_pred, y_true) == 1.0
+        assert np.isnan(metrics.group_acc("1", ints, y_pred, y_true))
@@ -0,0 +1,316 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fairness import metrics
+from fairness.utils.pipeline import cross_validate_fairness, \
+    run_demo_pipeline, run_model_comparison
+
+
+def _write_csv(tmp_path, n=120):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "Age": rng.integers(30, 80, n),
+            "Sex": rng.choice(["M", "F"], n),
+            "Chol": rng.normal(200, 30, n).round(1),
+            "ChestPain": rng.choice(["ATA", "NAP", "ASY"], n),
+        }
+    )
+    logit = 0.05 * (df["Age"] - 55) + (df["Sex"] == "M") - 0.2
+    df["target"] = (rng.random(n) < 1 / (1 + np.exp(-logit))).astype(int)
+    path = tmp_path / "cohort.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_cross_validate_fairness_independent_of_worker_count(tmp_path):
+    kwargs = dict(csv_path=_write_csv(tmp_path), target_col="target",
+                  protected_cols=["Sex"], n_splits=3, n_repeats=2)
+
+    serial = cross_validate_fairness(**kwargs, n_jobs=1)
+    parallel = cross_validate_fairness(**kwargs, n_jobs=2)
+
+    assert serial.oof_predictions.shape == (2, 120)
+    assert np.array_equal(serial.oof_predictions, parallel.oof_predictions)
+    assert serial.summary.equals(parallel.summary)
+
+    assert list(serial.summary.index.get_level_values("group").unique()) \
+        == ["F", "M"]
+    assert serial.summary["n"].sum() == 3 * 120
+    assert list(serial.disparities.columns) == ["acc", "fnr", "fpr"]
+    assert len(serial.rates) == 2 * 3 * 2
+
+
+def test_cross_validate_fairness_metrics_follow_rate_registry(tmp_path):
+    kwargs = dict(csv_path=_write_csv(tmp_path), target_col="target",
+                  protected_cols=["Sex"], n_splits=3, n_repeats=1)
+    with pytest.raises(ValueError, match="Unknown metrics.*'selection_rate'"):
+        cross_validate_fairness(**kwargs, metrics=["auc"])
+
+    result = cross_validate_fairness(**kwargs, metrics=["f1", "fnr"])
+    labels = pd.read_csv(kwargs["csv_path"])["Sex"].tolist()
+    y_true = pd.read_csv(kwargs["csv_path"])["target"].tolist()
+    for metric in ["f1", "fnr"]:
+        expected = getattr(metrics, f"all_intersect_{metric}s")(
+            {"Sex": labels}, result.oof_predictions[0].tolist(), y_true)
+        got = result.rates[result.rates["metric"] == metric]
+        assert dict(zip(got["group"], got["value"])) == \
+            pytest.approx(expected)
+
+
+def test_run_model_comparison_matches_single_model_pipeline(tmp_path):
+    from sklearn.tree import DecisionTreeClassifier
+
+    from fairness.utils.pipeline import _default_model
+
+    kwargs = dict(csv_path=_write_csv(tmp_path), target_col="target",
+                  protected_cols=["Sex"])
+    def models():
+        return [_default_model(),
+                DecisionTreeClassifier(max_depth=2, random_state=0),
+                DecisionTreeClassifier(max_depth=4, random_state=0)]
+
+    serial = run_model_comparison(**kwargs, models=models(), n_jobs=1)
+    parallel = run_model_comparison(**kwargs, models=models(), n_jobs=2)
+
+    assert list(serial.comparison.index) == [
+        "Pipeline", "DecisionTreeClassifier", "DecisionTreeClassifier_2"]
+    for name in serial.predictions:
+        assert np.array_equal(serial.predictions[name],
+                              parallel.predictions[name])
+
+    single = run_demo_pipeline(**kwargs)
+    assert serial.eval_df("Pipeline").equals(single.eval_df)
+    assert serial.comparison.loc["Pipeline", "accuracy"] == pytest.approx(
+        (single.eval_df["y_pred"] == single.eval_df["y_true"]).mean())
+
+    with pytest.raises(ValueError, match="at least one"):
+        run_model_comparison(**kwargs, models=[])
+    with pytest.raises(ValueError, match="'selection_rate'"):
+        run_model_comparison(**kwargs, models=models(), metrics=["auc"])
+
+    extra = run_model_comparison(**kwargs, models=models()[:1],
+                                 metrics=["f1", "fnr"])
+    eval_df = extra.eval_df("Pipeline")
+    assert extra.comparison.loc["Pipeline", "max_intersect_f1_diff"] == \
+        pytest.approx(metrics.max_intersect_f1_diff(
+            {"Sex": eval_df["subject_label"].tolist()},
+            eval_df["y_pred"].tolist(), eval_df["y_true"].tolist()))
+
+
+class _InputRecorder:
+    """Estimator that records the frame it is fitted on."""
+
+    def fit(self, X, y):
+        self.dtypes_ = X.dtypes.astype(str).tolist()
+        self.index_ = X.index.tolist()
+        self.threshold_ = float(X.iloc[:, 0].median())
+        return self
+
+    def predict(self, X):
+        return (X.iloc[:, 0] > self.threshold_).astype(int).to_numpy()
+
+
+def test_run_model_comparison_workers_see_serial_dtypes_and_index(tmp_path):
+    from fairness.utils.pipeline import _default_model
+
+    kwargs = dict(csv_path=_write_csv(tmp_path), target_col="target",
+                  protected_cols=["Sex"])
+    results = {
+        n_jobs: run_model_comparison(
+            **kwargs, n_jobs=n_jobs,
+            models={"recorder": _InputRecorder(), "logit": _default_model()})
+        for n_jobs in (1, 2)
+    }
+    serial, parallel = results[1], results[2]
+
+    recorded = serial.models["recorder"]
+    assert parallel.models["recorder"].dtypes_ == recorded.dtypes_
+    assert parallel.models["recorder"].index_ == recorded.index_
+    assert {"bool", "int64", "float64"} <= set(recorded.dtypes_)
+    for name in serial.predictions:
+        assert np.array_equal(serial.predictions[name],
+                              parallel.predictions[name])
+    assert serial.comparison.drop(columns="fit_seconds").equals(
+        parallel.comparison.drop(columns="fit_seconds"))
+
+
+def test_stage_cache_skips_data_stages_on_repeat_runs(tmp_path):
+    from fairness.preprocess import age_group_transform
+    from fairness.utils.cache import StageCache
+
+    kwargs = dict(csv_path=_write_csv(tmp_path), target_col="target",
+                  protected_cols=["Sex", "age_group"],
+                  drop_from_X=["age_group"])
+    cache = StageCache(directory=tmp_path / "cache")
+
+    first = run_demo_pipeline(**kwargs, cache=cache,
+                              fairness_transforms=[age_group_transform()])
+    assert cache.stats == {"hits": 0, "misses": 4}
+
+    # an equal transform built again hits every stage
+    second = run_demo_pipeline(**kwargs, cache=cache,
+                               fairness_transforms=[age_group_transform()])
+    assert cache.stats == {"hits": 4, "misses": 4}
+    assert second.eval_df.equals(first.eval_df)
+
+    # different transform parameters reuse only the load stage
+    run_demo_pipeline(**kwargs, cache=cache, fairness_transforms=[
+        age_group_transform(bins=(0, 60, 120))])
+    assert cache.stats == {"hits": 5, "misses": 7}
+
+    # a fresh memory tier is filled from disk
+    disk_only = StageCache(directory=tmp_path / "cache")
+    third = run_demo_pipeline(**kwargs, cache=disk_only,
+                              fairness_transforms=[age_group_transform()])
+    assert disk_only.stats == {"hits": 4, "misses": 0}
+    assert third.eval_df.equals(first.eval_df)
+
+
+def test_stage_cache_bounds_memory_and_disk(tmp_path):
+    from fairness.utils.cache import StageCache
+
+    cache = StageCache(max_items=2, directory=tmp_path, max_disk_bytes=2500)
+    for i in range(4):
+        cache.get_or_compute(f"k{i}", lambda i=i: bytes(1000) + bytes([i]))
+
+    assert len(cache) == 2
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.pkl")) <= 2500
+    assert cache.get_or_compute("k3", lambda: None) == bytes(1000) + b"\x03"
+
+    assert StageCache.key("load", "abc", None) is None
+
+
+def test_lean_pipeline_result_rebuilds_intermediate_frames(tmp_path):
+    kwargs = dict(csv_path=_write_csv(tmp_path), target_col="target",
+                  protected_cols=["Sex"])
+    full = run_demo_pipeline(**kwargs)
+    lean = run_demo_pipeline(**kwargs, lean=True)
+
+    held = [name for name, value in vars(lean).items()
+            if isinstance(value, pd.DataFrame)]
+    assert sorted(held) == ["df_fair", "eval_df"]
+
+    assert lean.eval_df.equals(full.eval_df)
+    assert lean.load_raw().equals(full.df_raw)
+    assert lean.build_model_frame().equals(full.df_model)
+    split = lean.build_split()
+    assert split.X_test.equals(full.split.X_test)
+    assert split.y_train.equals(full.split.y_train)
+
+    # the source file is checked before it is re-read
+    with open(kwargs["csv_path"], "a") as f:
+        f.write("50,M,200.0,ATA,0\n")
+    with pytest.raises(ValueError, match="changed"):
+        lean.load_raw()
+    os.remove(kwargs["csv_path"])
+    with pytest.raises(FileNotFoundError):
+        lean.load_raw()
+    assert lean.build_split().X_test.equals(full.split.X_test)
+
+
+def test_batched_prediction_streams_counts(tmp_path):
+    kwargs = dict(csv_path=_write_csv(tmp_path), target_col="target",
+                  protected_cols=["Sex"])
+    full = run_demo_pipeline(**kwargs)
+    batched = run_demo_pipeline(**kwargs, batch_size=7, n_threads=2)
+    streamed = run_demo_pipeline(**kwargs, batch_size=10,
+                                 build_eval_df=False)
+
+    assert batched.eval_df.equals(full.eval_df)
+    assert batched.split.X_test.equals(full.split.X_test)
+    assert streamed.eval_df is None
+    assert np.array_equal(streamed.y_pred, full.y_pred)
+
+    labels = full.df_fair.loc[full.eval_df.index, "Sex"].tolist()
+    for metric in ["acc", "fnr", "fpr"]:
+        assert streamed.counts.rates(metric) == pytest.approx(
+            metrics.all_group_rates(metric, labels,
+                                    full.eval_df["y_pred"].tolist(),
+                                    full.eval_df["y_true"].tolist()))
+
+    with pytest.raises(ValueError, match="class predictions"):
+        run_demo_pipeline(**kwargs, batch_size=10, predict_proba=True)
+
+
+def test_batched_run_never_builds_full_test_features(tmp_path, monkeypatch):
+    from fairness.preprocess import SplitIndices
+
+    sizes = []
+    features = SplitIndices._features
+
+    def record(self, positions):
+        sizes.append(len(positions))
+        return features(self, positions)
+
+    monkeypatch.setattr(SplitIndices, "_features", record)
+    result = run_demo_pipeline(csv_path=_write_csv(tmp_path),
+                               target_col="target", protected_cols=["Sex"],
+                               batch_size=7)
+
+    n_train, n_test = len(result.split.train_pos), len(result.split.test_pos)
+    assert isinstance(result.split, SplitIndices)
+    assert sizes[0] == n_train
+    assert max(sizes[1:]) <= 7 and sum(sizes[1:]) == n_test
+
+
+def test_pareto_front_marks_non_dominated_points():
+    from fairness.utils.pipeline import pareto_front
+
+    accuracy = [0.9, 0.8, 0.85, 0.9, 0.7, np.nan]
+    disparity = [0.3, 0.1, 0.2, 0.4, 0.1, 0.0]
+    assert pareto_front(accuracy, disparity).tolist() == [
+        True, True, True, False, False, False]
+
+
+def test_run_param_sweep_records_all_disparities(tmp_path):
+    from fairness.utils.pipeline import _default_model, run_param_sweep
+
+    sweep = run_param_sweep(
+        csv_path=_write_csv(tmp_path), target_col="target",
+        protected_cols=["Sex"], model=_default_model(),
+        param_grid={"clf__C": [0.01, 1.0],
+                    "clf__class_weight": [None, "balanced"]},
+    )
+
+    results = sweep.results
+    assert len(results) == 4
+    assert results["clf__class_weight"].tolist() == [None, "balanced"] * 2
+    for metric in ["acc", "fnr", "fpr", "for", "fdr"]:
+        assert f"max_intersect_{metric}_diff" in results
+    assert results["pareto"].any()
+    assert set(sweep.pareto.index) <= set(results.index)
+
+
+THRESHOLD = 0.5
+
+
+def test_callable_token_hashes_large_closures_and_globals():
+    from fairness.utils.cache import callable_token
+
+    def make(values):
+        return lambda df: df.assign(w=values[: len(df)])
+
+    a = np.zeros(5000)
+    b = a.copy()
+    b[2500] = 1.0
+    assert callable_token(make(a)) == callable_token(make(a.copy()))
+    assert callable_token(make(a)) != callable_token(make(b))
+    frame = pd.DataFrame({"x": np.arange(5000)})
+    assert callable_token(make(frame)) != callable_token(make(frame + 1))
+
+    def flag(df):
+        return df.assign(high=df["risk"] > THRESHOLD)
+
+    before = callable_token(flag)
+    globals()["THRESHOLD"] = 0.7
+    try:
+        assert callable_token(flag) != before
+    finally:
+        globals()["THRESHOLD"] = 0.5
+
+    # values that cannot be keyed disable caching
+    assert callable_token(make(object())) is None
@@ -0,0 +1,78 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from fairness import metrics, profiling
+from fairness.utils.pipeline import run_demo_pipeline
+
+
+def _labels(n=60):
+    rng = np.random.default_rng(0)
+    labels = {"sex": list(rng.choice(["F", "M"], n)),
+              "age": list(rng.choice(["young", "old"], n))}
+    return labels, list(rng.integers(0, 2, n)), list(rng.integers(0, 2, n))
+
+
+def test_instrumented_functions_record_nothing_when_disabled():
+    labels, y_pred, y_true = _labels()
+
+    with profiling.profile() as prof:
+        pass
+    metrics.max_intersect_fnr_diff(labels, y_pred, y_true)
+
+    assert not profiling.is_enabled()
+    assert prof.records == []
+    assert metrics.group_fnr.__name__ == "group_fnr"
+    assert metrics.group_fnr.__wrapped__.__module__ == "fairness.metrics"
+
+
+def test_profile_records_nested_calls_rows_and_memory():
+    labels, y_pred, y_true = _labels()
+
+    with profiling.profile(track_memory=True) as prof:
+        with profiling.span("audit"):
+            value = metrics.max_intersect_fnr_diff(labels, y_pred, y_true)
+            for group in ("F", "M"):
+                metrics.group_fnr(group, labels["sex"], y_pred, y_true)
+
+    assert value == metrics.max_intersect_fnr_diff(labels, y_pred, y_true)
+    table = prof.table()
+    assert table.loc["metrics.max_intersect_fnr_diff", "calls"] == 1
+    assert table.loc["metrics.group_fnr", "calls"] == 2
+    assert table.loc["metrics.max_intersect_fnr_diff", "rows"] == 60
+
+    outer = prof.records[-1]
+    assert outer["name"] == "audit"
+    assert outer["depth"] == 0
+    assert outer["self_seconds"] <= outer["seconds"]
+    assert {r["depth"] for r in prof.records[:-1]} == {1}
+    assert all(r["alloc_bytes"] >= 0 for r in prof.records)
+
+
+def test_chrome_trace_and_pipeline_stages(tmp_path):
+    rng = np.random.default_rng(1)
+    n = 80
+    df = pd.DataFrame({"Age": rng.integers(30, 80, n),
+                       "Sex": rng.choice(["M", "F"], n),
+                       "target": rng.integers(0, 2, n)})
+    csv_path = tmp_path / "cohort.csv"
+    df.to_csv(csv_path, index=False)
+
+    with profiling.profile() as prof:
+        run_demo_pipeline(csv_path=str(csv_path), target_col="target",
+                          protected_cols=["Sex"])
+
+    names = {r["name"] for r in prof.records}
+    assert {"pipeline.load", "pipeline.preprocess", "pipeline.split",
+            "pipeline.fit", "pipeline.predict", "groups.make_eval_df",
+            "utils.pipeline.run_demo_pipeline"} <= names
+    load = next(r for r in prof.records if r["name"] == "pipeline.load")
+    assert load["rows"] == n
+
+    path = tmp_path / "trace.json"
+    prof.to_chrome_trace(str(path))
+    events = json.loads(path.read_text())["traceEvents"]
+    assert len(events) == len(prof.records)
+    assert {e["ph"] for e in events} == {"X"}
+    assert "alloc_bytes" not in events[0]["args"]
@@ -0,0 +1,200 @@
+import numpy as np
+import pytest
+
+from fairness import metrics
+from fairness.arrays import RATE_FORMULAS, EvalArrays
+from fairness.rates import (RATE_DESCRIPTIONS, IntersectDisparity,
+                            bootstrap_rates, disparity_table, rate_table,
+                            register_rate, rollup_table)
+
+
+def _data(n=400):
+    rng = np.random.default_rng(7)
+    labels = {"sex": list(rng.choice(["F", "M"], n)),
+              "age": list(rng.choice(["young", "mid", "old"], n))}
+    return labels, list(rng.integers(0, 2, n)), list(rng.integers(0, 2, n))
+
+
+def test_generated_families_match_complementary_rates():
+    labels, y_pred, y_true = _data()
+    arrays = EvalArrays(y_true=y_true, y_pred=y_pred,
+                        subject_labels=labels["sex"],
+                        subject_labels_dict=labels)
+
+    for rate, complement in [("tpr", "fnr"), ("precision", "fdr"),
+                             ("npv", "for"), ("tnr", "fpr")]:
+        generated = getattr(metrics, f"all_intersect_{rate}s")(
+            labels, y_pred, y_true)
+        reference = getattr(metrics, f"all_intersect_{complement}s")(
+            labels, y_pred, y_true)
+        assert generated == pytest.approx(
+            {k: 1 - v for k, v in reference.items()})
+
+        max_diff = getattr(metrics, f"max_intersect_{rate}_diff")
+        assert max_diff(labels, y_pred, y_true) == pytest.approx(
+            getattr(metrics, f"max_intersect_{complement}_diff")(
+                labels, y_pred, y_true))
+        assert max_diff(arrays) == pytest.approx(
+            max_diff(labels, y_pred, y_true))
+
+    group_f1 = metrics.group_f1("F", labels["sex"], y_pred, y_true)
+    precision = metrics.group_precision("F", arrays)
+    recall = metrics.group_tpr("F", arrays)
+    assert group_f1 == pytest.approx(
+        2 * precision * recall / (precision + recall))
+    assert np.isnan(metrics.group_selection_rate("X", arrays))
+    assert np.isnan(metrics.group_selection_rate_diff("F", "X", arrays))
+    assert metrics.intersect_npv({"sex": "F", "age": "old"}, arrays) == \
+        pytest.approx(metrics.all_intersect_npvs(arrays)["old + F"])
+
+
+def test_tables_evaluate_many_rates_from_one_count_table():
+    labels, y_pred, y_true = _data()
+    arrays = EvalArrays(y_true=y_true, y_pred=y_pred,
+                        subject_labels=labels["sex"],
+                        subject_labels_dict=labels)
+
+    table = rate_table(arrays, ["fnr", "f1"])
+    assert list(table.columns) == ["age", "sex", "n", "fnr", "f1"]
+    assert table["n"].sum() == 400
+    assert list(table["fnr"]) == pytest.approx(
+        list(metrics.all_intersect_fnrs(labels, y_pred, y_true).values()))
+
+    groups = rate_table(arrays, ["acc"], level="group")
+    assert list(groups["group"]) == list(dict.fromkeys(labels["sex"]))
+
+    disparities = disparity_table(arrays)
+    assert list(disparities.index) == list(RATE_FORMULAS)
+    assert disparities.loc["fdr", "max_diff"] == pytest.approx(
+        metrics.max_intersect_fdr_diff(labels, y_pred, y_true))
+    assert disparities.loc["acc", "max_ratio"] == pytest.approx(
+        metrics.max_intersect_acc_ratio(labels, y_pred, y_true))
+
+    with pytest.raises(ValueError, match="level"):
+        rate_table(arrays, level="pairs")
+    with pytest.raises(ValueError, match="Unknown metrics"):
+        rate_table(arrays, ["auc"])
+
+
+def test_bootstrap_intervals_are_seeded_and_cover_estimates():
+    labels, y_pred, y_true = _data()
+    arrays = EvalArrays(y_true=y_true, y_pred=y_pred,
+                        subject_labels_dict=labels)
+
+    first = bootstrap_rates(arrays, ["fnr", "acc"], n_boot=300,
+                            random_state=3)
+    second = bootstrap_rates(arrays, ["fnr", "acc"], n_boot=300,
+                             random_state=3)
+    assert first.equals(second)
+    assert len(first) == 2 * (6 + 1)
+    assert (first["low"] <= first["high"]).all()
+
+    estimate, low, high = metrics.max_intersect_fnr_diff_bootstrap(
+        labels, y_pred, y_true, n_boot=300, random_state=3)
+    row = first[(first["group"] == "<max_diff>") & (first["metric"] == "fnr")]
+    assert estimate == pytest.approx(row["estimate"].item())
+    assert (low, high) == pytest.approx((row["low"].item(),
+                                         row["high"].item()))
+
+
+def test_register_rate_makes_metric_available_everywhere():
+    labels, y_pred, y_true = _data()
+    arrays = EvalArrays(y_true=y_true, y_pred=y_pred,
+                        subject_labels=labels["sex"],
+                        subject_labels_dict=labels)
+
+    register_rate("balanced_error",
+                  lambda tp, fn, tn, fp: (fn * (tn + fp) + fp * (tp + fn),
+                                          2 * (tp + fn) * (tn + fp)),
+                  "balanced error rate")
+    try:
+        groups = metrics.all_group_rates("balanced_error", arrays)
+        fnr = metrics.all_group_rates("fnr", arrays)
+        fpr = metrics.all_group_rates("fpr", arrays)
+        for group, value in groups.items():
+            assert value == pytest.approx((fnr[group] + fpr[group]) / 2)
+        assert "balanced_error" in rate_table(arrays).columns
+
+        with pytest.raises(ValueError, match="already registered"):
+            register_rate("balanced_error", lambda *c: c[:2], "again")
+    finally:
+        RATE_FORMULAS.pop("balanced_error", None)
+        RATE_DESCRIPTIONS.pop("balanced_error", None)
+
+    with pytest.raises(ValueError, match="identifier"):
+        register_rate("not valid", lambda *c: c[:2], "bad")
+
+
+def test_rollup_table_matches_all_intersect_for_every_subset():
+    labels, y_pred, y_true = _data()
+    labels["smoker"] = [None if i % 10 == 0 else bool(i % 3)
+                        for i in range(400)]
+    arrays = EvalArrays(y_true=y_true, y_pred=y_pred,
+                        subject_labels_dict=labels)
+
+    table = rollup_table(arrays, ["fnr", "acc"], min_size=0)
+
+    overall = table[table["size"] == 0]
+    assert overall["n"].item() == 400
+    assert overall["acc"].item() == pytest.approx(
+        np.mean(np.array(y_pred) == np.array(y_true)))
+
+    subsets = ["age", "sex", "smoker", "age + sex", "age + smoker",
+               "sex + smoker", "age + sex + smoker"]
+    assert list(table.loc[table["size"] > 0, "attributes"].unique()) == \
+        subsets
+    for attributes in subsets:
+        subset = attributes.split(" + ")
+        expected = metrics.all_intersect_fnrs(EvalArrays(
+            y_true=y_true, y_pred=y_pred,
+            subject_labels_dict={c: labels[c] for c in subset}))
+        rows = table[table["attributes"] == attributes]
+        assert list(rows["group"]) == list(expected)
+        assert np.allclose(rows["fnr"], list(expected.values()),
+                           equal_nan=True)
+
+    # rows with a missing smoker label still count for the other subsets
+    assert table.loc[table["attributes"] == "sex", "n"].sum() == 400
+    assert table.loc[table["attributes"] == "smoker", "n"].sum() == 360
+    assert table.loc[table["attributes"] == "sex", "smoker"].isna().all()
+
+
+def test_return_details_names_extreme_groups_and_ignore_nan():
+    labels, y_pred, y_true = _data()
+    rates = metrics.all_intersect_fnrs(labels, y_pred, y_true)
+
+    result = metrics.max_intersect_fnr_diff(labels, y_pred, y_true,
+                                            return_details=True)
+    assert isinstance(result, IntersectDisparity)
+    assert float(result) == metrics.max_intersect_fnr_diff(labels, y_pred,
+                                                           y_true)
+    assert result.max_group == max(rates, key=rates.get)
+    assert result.min_group == min(rates, key=rates.get)
+    assert result.max_rate == pytest.approx(rates[result.max_group])
+    sex, age = result.min_group.split(" + ")[::-1]
+    assert result.min_n == sum(s == sex and a == age for s, a in
+                               zip(labels["sex"], labels["age"]))
+    assert result.n_groups == len(rates) and result.undefined_groups == ()
+
+    ratio = metrics.max_intersect_tpr_ratio(labels, y_pred, y_true,
+                                            natural_log=False,
+                                            return_details=True)
+    assert ratio.value == pytest.approx(
+        metrics.max_intersect_tpr_ratio(labels, y_pred, y_true,
+                                        natural_log=False))
+
+    # An empty combination makes the default NaN; ignore_nan skips it.
+    labels["age"] = ["old" if s == "F" else a
+                     for s, a in zip(labels["sex"], labels["age"])]
+    assert np.isnan(metrics.max_intersect_fnr_diff(labels, y_pred, y_true))
+    result = metrics.max_intersect_fnr_diff(labels, y_pred, y_true,
+                                            ignore_nan=True,
+                                            return_details=True)
+    defined = {k: v for k, v in metrics.all_intersect_fnrs(
+        labels, y_pred, y_true).items() if not np.isnan(v)}
+    assert result.value == pytest.approx(
+        max(defined.values()) - min(defined.values()))
+    assert set(result.undefined_groups) == {"young + F", "mid + F"}
+    assert metrics.max_intersect_fnr_ratio(
+        labels, y_pred, y_true, ignore_nan=True) == pytest.approx(
+        np.log(max(defined.values()) / min(defined.values())))
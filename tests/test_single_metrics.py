@@ -1,4 +1,5 @@
 import numpy as np
+import pandas as pd
 import pytest
 from fairness.single_metrics import (
     group_to_binary,
@@ -6,7 +7,8 @@ from fairness.single_metrics import (
     calculate_TPR_TNR_FPR_FNR,
     calculate_EOD,
     calculate_AOD,
-    calculate_DI
+    calculate_DI,
+    calculate_single_metrics_batch,
 )
 
 # -----------------------------------------------------
@@ -159,3 +161,56 @@ def test_AOD_invalid_privileged_label():
             group_labels=["X", "Y"],
             privileged_label="Z"
         )
+
+
+def test_two_group_metrics_name_missing_arguments():
+    with pytest.raises(ValueError, match="y_pred is required"):
+        calculate_EOD([1, 0], group_labels=["A", "B"], privileged_label="A")
+    with pytest.raises(ValueError, match="group_labels is required"):
+        calculate_AOD([1, 0], [1, 0], privileged_label="A")
+    with pytest.raises(ValueError, match="privileged_label is required"):
+        calculate_EOD([1, 0, 1, 0], [1, 0, 1, 0], ["A", "A", "B", "B"])
+    with pytest.raises(ValueError, match="group_labels is required"):
+        calculate_DI([1, 0], privileged_label="A")
+
+
+# -----------------------------------------------------
+# 4. Batch evaluation across protected attributes
+# -----------------------------------------------------
+
+def test_single_metrics_batch_matches_individual_calls():
+    y_test = [1, 1, 0, 0, 1, 0, 1, 0]
+    y_pred = [1, 0, 0, 1, 1, 1, 1, 0]
+    protected = pd.DataFrame({
+        "Sex": ["M", "M", "M", "M", "F", "F", "F", "F"],
+        "age_group": ["older", "young", "older", "young",
+                      "older", "young", "older", "young"],
+    })
+    privileged = {"Sex": "M", "age_group": "older"}
+
+    out = calculate_single_metrics_batch(y_test, y_pred, protected,
+                                         privileged)
+
+    assert list(out.index) == ["Sex", "age_group"]
+    for col, label in privileged.items():
+        groups = protected[col].tolist()
+        assert out.loc[col, "EOD"] == pytest.approx(
+            calculate_EOD(y_test, y_pred, groups, label))
+        assert out.loc[col, "AOD"] == pytest.approx(
+            calculate_AOD(y_test, y_pred, groups, label))
+        assert out.loc[col, "DI"] == pytest.approx(
+            calculate_DI(y_pred, groups, label))
+
+
+def test_single_metrics_batch_invalid_inputs():
+    protected = pd.DataFrame({"Sex": ["M", "F"]})
+
+    with pytest.raises(ValueError):
+        calculate_single_metrics_batch([1, 2], [1, 0], protected,
+                                       {"Sex": "M"})
+    with pytest.raises(ValueError):
+        calculate_single_metrics_batch([1, 0], [1, 0], protected,
+                                       {"Sex": "X"})
+    with pytest.raises(ValueError):
+        calculate_single_metrics_batch([1, 0], [1, 0], protected,
+                                       {"Sex": "M"}, metrics=["XYZ"])
@@ -0,0 +1,82 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fairness.subgroups import find_subgroups
+
+
+def _data(n=4000, seed=0):
+    rng = np.random.default_rng(seed)
+    features = pd.DataFrame({
+        "sex": rng.choice(["F", "M"], n),
+        "site": rng.choice(["a", "b", "c"], n),
+        "smoker": rng.choice([True, False], n),
+        "age": rng.integers(20, 90, n),
+    })
+    y_true = rng.integers(0, 2, n)
+    # the model misses many positives among older women
+    p_miss = np.where((features["sex"] == "F") & (features["age"] >= 70),
+                      0.6, 0.15)
+    y_pred = np.where(y_true == 1, rng.random(n) >= p_miss,
+                      rng.random(n) < 0.1).astype(int)
+    return features, y_true, y_pred
+
+
+def test_find_subgroups_recovers_injected_subgroup():
+    features, y_true, y_pred = _data()
+
+    result = find_subgroups(y_true, y_pred, features, metric="fnr", k=3,
+                            max_depth=2, min_support=0.02)
+
+    top = result.subgroups.iloc[0]
+    assert dict(top["conditions"]).keys() == {"sex", "age"}
+    assert "sex=F" in top["subgroup"]
+    assert top["fnr"] == pytest.approx(top["fn"] / (top["fn"] + top["tp"]))
+    assert top["gap"] == pytest.approx(top["fnr"] - result.population_rate)
+    assert list(result.subgroups["score"]) == \
+        sorted(result.subgroups["score"], reverse=True)
+
+    worst_acc = find_subgroups(y_true, y_pred, features, metric="acc", k=1,
+                               max_depth=2)
+    assert worst_acc.subgroups["gap"].iloc[0] < 0
+
+
+def test_pruned_search_matches_exhaustive_search():
+    features, y_true, y_pred = _data(n=1500, seed=1)
+    features = features.drop(columns="age")
+    min_den = 15
+
+    result = find_subgroups(y_true, y_pred, features, metric="fpr", k=5,
+                            max_depth=3, beam_width=1000, min_support=1,
+                            min_denominator=min_den)
+
+    # brute force over every conjunction of distinct columns
+    scores = []
+    cols = list(features.columns)
+    for depth in (1, 2, 3):
+        for subset in itertools.combinations(cols, depth):
+            for levels in itertools.product(
+                    *(sorted(features[c].unique()) for c in subset)):
+                mask = np.logical_and.reduce(
+                    [features[c].to_numpy() == v
+                     for c, v in zip(subset, levels)])
+                negatives = mask & (y_true == 0)
+                if negatives.sum() < min_den:
+                    continue
+                fpr = y_pred[negatives].mean()
+                scores.append(fpr - np.mean(y_pred[y_true == 0]))
+    expected = sorted(scores, reverse=True)[:5]
+
+    assert list(result.subgroups["score"]) == pytest.approx(expected)
+
+
+def test_find_subgroups_validates_inputs():
+    features, y_true, y_pred = _data(n=100)
+    with pytest.raises(ValueError, match="Unknown metric"):
+        find_subgroups(y_true, y_pred, features, metric="auc")
+    with pytest.raises(ValueError, match="same length"):
+        find_subgroups(y_true[:50], y_pred[:50], features)
+    with pytest.raises(ValueError, match="direction"):
+        find_subgroups(y_true, y_pred, features, direction="up")
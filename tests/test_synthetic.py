@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fairness import metrics
+from fairness.arrays import EvalArrays
+from fairness.groups import make_intersectional_labels
+from fairness.synthetic import CohortSpec, expected_rates, iter_cohort, \
+    make_cohort, write_cohort_parquet
+
+
+def test_cohort_matches_eval_df_layout_and_labels():
+    spec = CohortSpec(n_rows=1_000, cardinalities={"sex": 2, "age": 3},
+                      levels={"sex": ["F", "M"]})
+    cohort = make_cohort(spec, chunk_size=300)
+
+    assert list(cohort.columns) == ["sex", "age", "subject_label", "y_pred",
+                                    "y_true", "y_score"]
+    assert list(cohort.index) == list(range(1_000))
+    assert cohort["subject_label"].astype(str).tolist() == \
+        make_intersectional_labels(cohort, ["sex", "age"])
+    assert ((cohort["y_score"] >= 0.5) == (cohort["y_pred"] == 1)).all()
+
+    chunks = list(iter_cohort(spec, chunk_size=300))
+    assert [len(c) for c in chunks] == [300, 300, 300, 100]
+    assert pd.concat(chunks).equals(cohort)
+
+
+def test_cohort_recovers_injected_disparities():
+    spec = CohortSpec(
+        n_rows=200_000, cardinalities={"sex": 2, "age": 2}, imbalance=1.0,
+        base_fnr=0.1, base_fpr=0.05, fnr_shifts={"sex": {"g1": 0.2}},
+        intersection_shifts={("g0", "g1"): (0.0, 0.3)},
+    )
+    cohort = make_cohort(spec)
+    expected = expected_rates(spec)
+
+    arrays = EvalArrays(y_true=cohort["y_true"].to_numpy(),
+                        y_pred=cohort["y_pred"].to_numpy(),
+                        subject_labels=cohort["subject_label"].to_numpy())
+    fnr = metrics.all_group_rates("fnr", arrays)
+    fpr = metrics.all_group_rates("fpr", arrays)
+
+    for label, row in expected.iterrows():
+        assert fnr[label] == pytest.approx(row["fnr"], abs=0.02)
+        assert fpr[label] == pytest.approx(row["fpr"], abs=0.02)
+
+    shares = cohort["subject_label"].value_counts(normalize=True)
+    assert np.allclose(shares[expected.index], expected["share"], atol=0.01)
+
+
+def test_cohort_spec_validates_shifts():
+    with pytest.raises(ValueError, match="Unknown levels"):
+        CohortSpec(n_rows=10, cardinalities={"sex": 2},
+                   fnr_shifts={"sex": {"X": 0.1}})
+    with pytest.raises(ValueError, match="must have 2 names"):
+        CohortSpec(n_rows=10, cardinalities={"sex": 2},
+                   levels={"sex": ["F"]})
+
+
+def test_cohort_spec_validates_intersection_shifts():
+    cards = {"a": 2, "b": 3}
+    with pytest.raises(ValueError, match="tuple of 2 levels"):
+        CohortSpec(n_rows=10, cardinalities=cards,
+                   intersection_shifts={("g1",): (0.3, 0)})
+    with pytest.raises(ValueError, match="Unknown level 'g5' for 'b'"):
+        CohortSpec(n_rows=10, cardinalities=cards,
+                   intersection_shifts={("g1", "g5"): (0.3, 0)})
+    with pytest.raises(ValueError, match="fnr_shift, fpr_shift"):
+        CohortSpec(n_rows=10, cardinalities=cards,
+                   intersection_shifts={("g1", "g2"): 0.3})
+
+    spec = CohortSpec(n_rows=10, cardinalities=cards,
+                      intersection_shifts={("g1", "g2"): (0.3, 0)})
+    rates = expected_rates(spec)
+    assert (rates["fnr"] > spec.base_fnr).sum() == 1
+
+
+def test_cohort_score_shifts_and_observed_labels():
+    spec = CohortSpec(n_rows=100_000, cardinalities={"sex": 2, "age": 40},
+                      imbalance=3.0, score_separation=1.0,
+                      score_shifts={"sex": {"g1": 5.0}})
+    cohort = make_cohort(spec, chunk_size=30_000)
+    expected = expected_rates(spec)
+
+    # mean |y_score - 0.5| is 0.5 * a / (a + 1) for separation a
+    distance = (cohort["y_score"] - 0.5).abs().groupby(
+        cohort["sex"], observed=True).mean()
+    assert distance["g0"] == pytest.approx(0.25, abs=0.01)
+    assert distance["g1"] == pytest.approx(0.5 * 6 / 7, abs=0.01)
+    assert ((cohort["y_score"] >= 0.5) == (cohort["y_pred"] == 1)).all()
+    assert set(expected["score_separation"]) == {1.0, 6.0}
+
+    observed = set(cohort["subject_label"].astype(str))
+    assert set(cohort["subject_label"].cat.categories) == observed
+    assert len(observed) < len(expected)
+    for chunk in iter_cohort(spec, chunk_size=30_000):
+        assert set(chunk["subject_label"].cat.categories) == \
+            set(chunk["subject_label"].astype(str))
+
+    with pytest.raises(ValueError, match="must be > 0 for every"):
+        CohortSpec(n_rows=10, cardinalities={"sex": 2},
+                   score_shifts={"sex": {"g1": -4.0}})
+
+
+def test_write_cohort_parquet_streams_chunks(tmp_path):
+    pytest.importorskip("pyarrow")
+
+    spec = CohortSpec(n_rows=2_500, include_scores=False)
+    path = tmp_path / "cohort.parquet"
+    assert write_cohort_parquet(spec, path, chunk_size=1_000) == 2_500
+
+    loaded = pd.read_parquet(path)
+    expected = make_cohort(spec, chunk_size=1_000).reset_index(drop=True)
+    assert loaded["y_pred"].tolist() == expected["y_pred"].tolist()
+    assert loaded["subject_label"].astype(str).tolist() == \
+        expected["subject_label"].astype(str).tolist()
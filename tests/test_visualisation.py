@@ -1,10 +1,13 @@
 import matplotlib
 
 import matplotlib.figure
+import matplotlib.pyplot as plt
 import pandas as pd
+import pytest
 
 from fairness import metrics
 from fairness import visualisation as vis
+from fairness.utils.render import PlotSpec, render_figures
 
 matplotlib.use("Agg")
 
@@ -127,3 +130,138 @@ def test_plot_single_metrics_invalid_name():
         assert "Unknown metric" in str(exc)
     else:
         raise AssertionError("Expected ValueError for unknown single metric")
+
+
+def _bar_values(fig, horizontal=False):
+    patches = fig.axes[0].patches
+    if horizontal:
+        values = [p.get_width() for p in patches]
+    else:
+        values = [p.get_height() for p in patches]
+    plt.close(fig)
+    return values
+
+
+def test_plot_group_metric_shared_counts_match_per_group_calls():
+    subject_labels, predictions, true_statuses, _ = _demo_inputs()
+    groups = vis._unique_in_order(subject_labels) + ["absent"]
+    for name in ("acc", "fnr", "fpr", "for", "fdr"):
+        fn = getattr(metrics, f"group_{name}")
+        fast = vis.plot_group_metric(fn, subject_labels, predictions,
+                                     true_statuses, groups=groups)
+        slow = vis.plot_group_metric(
+            lambda g, s, p, t: fn(g, s, p, t),
+            subject_labels, predictions, true_statuses, groups=groups,
+        )
+        assert _bar_values(fast) == pytest.approx(_bar_values(slow),
+                                                  nan_ok=True)
+
+
+def test_plot_pairwise_group_metric_shared_counts_match_pair_calls():
+    subject_labels, predictions, true_statuses, _ = _demo_inputs()
+    for fn in (metrics.group_fnr_diff, metrics.group_acc_ratio):
+        fast = vis.plot_pairwise_group_metric(fn, subject_labels,
+                                              predictions, true_statuses,
+                                              sort=False)
+        slow = vis.plot_pairwise_group_metric(
+            lambda a, b, s, p, t: fn(a, b, s, p, t),
+            subject_labels, predictions, true_statuses, sort=False,
+        )
+        assert _bar_values(fast, True) == pytest.approx(
+            _bar_values(slow, True), nan_ok=True)
+
+
+def test_pairwise_metric_matrix_matches_pairwise_functions():
+    subject_labels, predictions, true_statuses, _ = _demo_inputs()
+    matrix = vis.pairwise_metric_matrix(metrics.group_fpr, subject_labels,
+                                        predictions, true_statuses,
+                                        kind="diff")
+    a, b = matrix.index[0], matrix.index[2]
+    assert matrix.loc[a, b] == pytest.approx(
+        metrics.group_fpr_diff(a, b, subject_labels, predictions,
+                               true_statuses))
+
+    ratio = vis.pairwise_metric_matrix("acc", subject_labels, predictions,
+                                       true_statuses, kind="ratio")
+    assert ratio.loc[a, b] == pytest.approx(
+        metrics.group_acc_ratio(a, b, subject_labels, predictions,
+                                true_statuses), nan_ok=True)
+
+
+def test_top_disparity_pairs_and_heatmap():
+    subject_labels, predictions, true_statuses, _ = _demo_inputs()
+    matrix = vis.pairwise_metric_matrix("fnr", subject_labels, predictions,
+                                        true_statuses)
+    top = vis.top_disparity_pairs(matrix, k=2)
+    assert list(top.columns) == ["group_a", "group_b", "value"]
+    assert len(top) == 2
+    assert top["value"].is_monotonic_decreasing
+
+    fig = vis.plot_pairwise_heatmap("fnr", subject_labels, predictions,
+                                    true_statuses)
+    _assert_figure(fig)
+    assert len(fig.axes[0].images) == 1
+
+
+def test_render_figures_writes_files(tmp_path):
+    subject_labels, predictions, \
+        true_statuses, subject_labels_dict = _demo_inputs()
+    specs = [
+        PlotSpec("acc.png", "plot_group_metric",
+                 args=(metrics.group_acc, subject_labels, predictions,
+                       true_statuses)),
+        PlotSpec("nested/fnr.svg", "plot_intersectional_metric",
+                 args=(metrics.all_intersect_fnrs, subject_labels_dict,
+                       predictions, true_statuses)),
+        PlotSpec("bad.png", "plot_group_metric", args=(metrics.group_acc,)),
+    ]
+
+    for n_jobs in (1, 2):
+        out_dir = tmp_path / f"jobs_{n_jobs}"
+        report = render_figures(specs, out_dir, n_jobs=n_jobs)
+        assert list(report["filename"]) == [str(out_dir / s.filename)
+                                            for s in specs]
+        assert (out_dir / "acc.png").stat().st_size > 0
+        assert (out_dir / "nested" / "fnr.svg").stat().st_size > 0
+        assert report["error"].isna().tolist() == [True, True, False]
+        assert (report["seconds"] >= 0).all()
+
+    with pytest.raises(ValueError, match="Unsupported output format"):
+        render_figures([PlotSpec("x.jpg2", "plot_group_metric")], tmp_path)
+
+
+def test_render_figures_in_process_keeps_caller_backend(tmp_path):
+    import matplotlib.pyplot as plt
+
+    subject_labels, predictions, true_statuses, _ = _demo_inputs()
+    previous = plt.get_backend()
+    plt.switch_backend("svg")
+    try:
+        open_fig = plt.figure()
+        report = render_figures(
+            [PlotSpec("acc.png", "plot_group_metric",
+                      args=(metrics.group_acc, subject_labels, predictions,
+                            true_statuses))], tmp_path, n_jobs=1)
+        assert report["error"].isna().all()
+        assert plt.get_backend() == "svg"
+        assert plt.fignum_exists(open_fig.number)
+        plt.close(open_fig)
+    finally:
+        plt.switch_backend(previous)
+
+
+def test_plot_pareto_front_draws_front_line():
+    results = pd.DataFrame(
+        {"accuracy": [0.9, 0.8, 0.7], "max_intersect_fnr_diff": [0.3, 0.1,
+                                                                 0.2],
+         "pareto": [True, True, False]},
+        index=["a", "b", "c"],
+    )
+    fig = vis.plot_pareto_front(results)
+    assert isinstance(fig, matplotlib.figure.Figure)
+    line = fig.axes[0].lines[0]
+    assert list(line.get_xdata()) == [0.1, 0.3]
+    plt.close(fig)
+
+    with pytest.raises(ValueError, match="not found"):
+        vis.plot_pareto_front(results, x="missing")